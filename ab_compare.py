@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+A/B comparison of two builds or deployments of the API.
+Runs the same read workload (the public endpoints of payload_audit.py, or
+--endpoints) against target A (e.g. the current release) and target B (e.g. a
+candidate with a route.js refactor or a model change), interleaved: every
+round requests each endpoint once from both targets, in random order, so
+drift in the network, the database or the machine lands on both sides.
+
+Per endpoint it reports
+- functional parity: status codes and JSON bodies of A and B, with the first
+  differing paths; fields in --ignore-fields (timestamps by default) are left
+  out, and a body that already changes between rounds on A is flagged as
+  unstable rather than as a difference,
+- the latency change of B against A (median and p95) with a bootstrap
+  confidence interval that resamples whole rounds, keeping the pairing,
+- the bytes on the wire and the decoded body size of both.
+
+With --functional the backend_test.py checks are run against both targets as
+well and any check that passes on one but not the other is listed.
+
+Either target can be a local build started for the run: --a-command /
+--b-command with --a-dir / --b-dir as the working directory (e.g. a second
+checkout built with `yarn build`), see soak_test.LocalServer.
+
+Exits non-zero when a parity difference is found or an endpoint's median gets
+slower than --threshold with the whole confidence interval above zero.
+
+Usage:
+    python ab_compare.py --a https://release.example.com/api --b http://localhost:3000/api [--rounds 30]
+    python ab_compare.py --a http://127.0.0.1:3101/api --a-command "npx next start --port 3101" --a-dir ../release \\
+                         --b http://127.0.0.1:3102/api --b-command "npx next start --port 3102" --output ab.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from api_client import ApiClient, NO_RETRY
+from payload_audit import PUBLIC_ENDPOINTS, PayloadAuditor
+from perf_report import percentile, summarize
+from soak_test import LocalServer, ROOT
+
+DEFAULT_IGNORE_FIELDS = "timestamp"
+MAX_DIFFS = 5
+
+
+@dataclass
+class Target:
+    label: str
+    base_url: str
+    command: Optional[str] = None
+    directory: str = ROOT
+
+    @property
+    def site_url(self) -> str:
+        """The target without its /api suffix, as GalleryThemeAPITester expects it"""
+        return self.base_url[:-len("/api")] if self.base_url.endswith("/api") else self.base_url
+
+
+def strip_fields(value: Any, ignore: frozenset) -> Any:
+    if isinstance(value, dict):
+        return {k: strip_fields(v, ignore) for k, v in value.items() if k not in ignore}
+    if isinstance(value, list):
+        return [strip_fields(v, ignore) for v in value]
+    return value
+
+
+def json_diff(a: Any, b: Any, path: str = "$", out: Optional[List[Dict]] = None) -> List[Dict]:
+    """Paths where two JSON values differ, depth first, stopping after MAX_DIFFS"""
+    out = [] if out is None else out
+    if len(out) >= MAX_DIFFS:
+        return out
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(a.keys() | b.keys()):
+            if key not in a or key not in b:
+                out.append({"path": f"{path}.{key}", "a": a.get(key, "<missing>"), "b": b.get(key, "<missing>")})
+            else:
+                json_diff(a[key], b[key], f"{path}.{key}", out)
+            if len(out) >= MAX_DIFFS:
+                break
+    elif isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            out.append({"path": f"{path}.length", "a": len(a), "b": len(b)})
+        for i, (x, y) in enumerate(zip(a, b)):
+            json_diff(x, y, f"{path}[{i}]", out)
+            if len(out) >= MAX_DIFFS:
+                break
+    elif a != b:
+        out.append({"path": path, "a": a, "b": b})
+    return out
+
+
+def paired_bootstrap(a: List[float], b: List[float], statistic: Callable[[List[float]], float], alpha: float,
+                     iterations: int = 2000, seed: int = 1) -> Tuple[float, float]:
+    """(1 - alpha) CI for statistic(b) / statistic(a) - 1, resampling rounds so A and B stay paired"""
+    rng = random.Random(seed)
+    n = len(a)
+    changes = []
+    for _ in range(iterations):
+        rounds = rng.choices(range(n), k=n)
+        base = statistic([a[i] for i in rounds])
+        if base > 0:
+            changes.append(statistic([b[i] for i in rounds]) / base - 1)
+    return percentile(changes, 100 * alpha / 2), percentile(changes, 100 * (1 - alpha / 2))
+
+
+def _p95(values: List[float]) -> float:
+    return percentile(values, 95)
+
+
+class ABComparison:
+    def __init__(self, a: ApiClient, b: ApiClient, rounds: int, ignore_fields: frozenset, seed: Optional[int] = None):
+        self.clients = {"a": a, "b": b}
+        self.rounds = rounds
+        self.ignore = ignore_fields
+        self.rng = random.Random(seed)
+
+    def resolve(self, endpoints: Dict[str, str]) -> Dict[str, str]:
+        """Concrete paths from A, so both targets are asked for the same slug"""
+        auditor = PayloadAuditor(self.clients["a"], brotli=False)
+        paths = {}
+        for name, template in endpoints.items():
+            path = auditor.resolve(template)
+            if path is None:
+                print(f"  ⏭️  {name}: nothing published on A to resolve the slug")
+            else:
+                paths[name] = path
+        return paths
+
+    def fetch(self, side: str, path: str) -> Dict:
+        response = self.clients[side].get(path)
+        timing = response.extensions["timing"]
+        try:
+            body = strip_fields(response.json(), self.ignore)
+        except ValueError:
+            body = response.text
+        return {"status": response.status_code, "ms": timing.total_ms, "wire": timing.response_bytes,
+                "bytes": len(response.content), "body": body}
+
+    def run(self, paths: Dict[str, str]) -> Dict[str, Dict]:
+        samples = {name: {"a": [], "b": []} for name in paths}
+        errors = {name: 0 for name in paths}
+        for path in paths.values():
+            for side in ("a", "b"):
+                try:
+                    self.clients[side].get(path)
+                except httpx.HTTPError:
+                    pass
+        for r in range(self.rounds):
+            names = list(paths)
+            self.rng.shuffle(names)
+            for name in names:
+                order = ["a", "b"] if self.rng.random() < 0.5 else ["b", "a"]
+                try:
+                    pair = {side: self.fetch(side, paths[name]) for side in order}
+                except httpx.HTTPError:
+                    # Drop the whole round for this endpoint so the samples stay paired
+                    errors[name] += 1
+                    continue
+                for side in ("a", "b"):
+                    samples[name][side].append(pair[side])
+            if (r + 1) % max(1, self.rounds // 5) == 0:
+                print(f"  🔁 Round {r + 1}/{self.rounds}")
+        return {name: self.analyze(paths[name], samples[name], errors[name]) for name in paths}
+
+    def analyze(self, path: str, samples: Dict[str, List[Dict]], errors: int) -> Dict:
+        a, b = samples["a"], samples["b"]
+        if not a:
+            return {"path": path, "error": f"all {errors} round(s) failed"}
+        statuses = {side: sorted({s["status"] for s in samples[side]}) for side in ("a", "b")}
+        diffs = json_diff(a[0]["body"], b[0]["body"])
+        if statuses["a"] != statuses["b"]:
+            parity = "status differs"
+        elif not diffs:
+            parity = "identical"
+        elif json_diff(a[0]["body"], a[-1]["body"]):
+            parity = "unstable"
+        else:
+            parity = "differs"
+        return {
+            "path": path,
+            "rounds": len(a),
+            "errors": errors,
+            "status": statuses,
+            "parity": parity,
+            "diffs": diffs if parity in ("differs", "unstable") else [],
+            "latency_ms": {side: summarize([s["ms"] for s in samples[side]]) for side in ("a", "b")},
+            "wire_bytes": {side: statistics.mean(s["wire"] for s in samples[side]) for side in ("a", "b")},
+            "body_bytes": {side: statistics.mean(s["bytes"] for s in samples[side]) for side in ("a", "b")},
+            "_ms": {side: [s["ms"] for s in samples[side]] for side in ("a", "b")},
+        }
+
+
+def add_deltas(results: Dict[str, Dict], alpha: float, threshold: float, min_rounds: int):
+    for result in results.values():
+        if "error" in result:
+            continue
+        a, b = result.pop("_ms").values()
+        latency = result["latency_ms"]
+        change = latency["b"]["p50"] / latency["a"]["p50"] - 1 if latency["a"]["p50"] else 0.0
+        result["median_change"] = change
+        result["p95_change"] = latency["b"]["p95"] / latency["a"]["p95"] - 1 if latency["a"]["p95"] else 0.0
+        wire = result["wire_bytes"]
+        result["wire_change"] = wire["b"] / wire["a"] - 1 if wire["a"] else 0.0
+        if len(a) < min_rounds:
+            result["median_ci"] = result["p95_ci"] = None
+            result["verdict"] = "insufficient data"
+            continue
+        result["median_ci"] = paired_bootstrap(a, b, statistics.median, alpha)
+        result["p95_ci"] = paired_bootstrap(a, b, _p95, alpha)
+        low, high = result["median_ci"]
+        if low > 0:
+            result["verdict"] = "slower" if change > threshold else "slightly slower"
+        elif high < 0:
+            result["verdict"] = "faster" if change < -threshold else "slightly faster"
+        else:
+            result["verdict"] = "no difference"
+
+
+def functional_parity(targets: List[Target]) -> Dict[str, Dict[str, bool]]:
+    """Run the backend_test.py checks on each target; returns the checks whose outcome differs"""
+    from backend_test import GalleryThemeAPITester
+
+    outcomes = {}
+    for target in targets:
+        print(f"\n🧪 Functional checks against {target.label} ({target.site_url})")
+        tester = GalleryThemeAPITester(base_url=target.site_url)
+        try:
+            tester.run_all_tests()
+        finally:
+            tester.client.close()
+        outcomes[target.label] = {r["test"]: r["success"] for r in tester.summary.results()}
+    a, b = (outcomes[t.label] for t in targets)
+    return {test: {targets[0].label: a.get(test), targets[1].label: b.get(test)}
+            for test in sorted(a.keys() | b.keys()) if a.get(test) != b.get(test)}
+
+
+def print_report(results: Dict[str, Dict], targets: List[Target], alpha: float,
+                 functional: Optional[Dict[str, Dict[str, bool]]]):
+    a, b = (t.label for t in targets)
+    print("\n" + "=" * 110)
+    print(f"🆎 A/B COMPARISON — A = {a} ({targets[0].base_url}), B = {b} ({targets[1].base_url})")
+    print("=" * 110)
+    print(f"{'Endpoint':<32}{'A p50':>9}{'B p50':>9}{'Δ median':>10}  {f'{1 - alpha:.0%} CI':<18}"
+          f"{'A KB':>8}{'B KB':>8}{'Δ wire':>8}  parity")
+    icons = {"slower": "🐢", "slightly slower": "↗️ ", "faster": "🚀", "slightly faster": "↘️ ",
+             "no difference": "  ", "insufficient data": "⚪"}
+    for name, r in results.items():
+        if "error" in r:
+            print(f"❌ {name:<30} {r['error']}")
+            continue
+        latency, wire = r["latency_ms"], r["wire_bytes"]
+        ci = f"[{r['median_ci'][0]:+.1%}, {r['median_ci'][1]:+.1%}]" if r["median_ci"] else "—"
+        parity = "✅" if r["parity"] == "identical" else f"❗ {r['parity']}"
+        print(f"{icons[r['verdict']]}{name:<30}{latency['a']['p50']:>9.1f}{latency['b']['p50']:>9.1f}"
+              f"{r['median_change']:>+10.1%}  {ci:<18}{wire['a'] / 1024:>8.1f}{wire['b'] / 1024:>8.1f}"
+              f"{r['wire_change']:>+8.1%}  {parity}")
+
+    for name, r in results.items():
+        for diff in r.get("diffs", []):
+            print(f"  ↳ {name} {diff['path']}: A={json.dumps(diff['a'])[:60]}  B={json.dumps(diff['b'])[:60]}")
+    if functional is not None:
+        if functional:
+            print(f"\n❗ {len(functional)} functional check(s) differ between {a} and {b}:")
+            for test, outcome in functional.items():
+                print(f"  {test}: " + ", ".join(f"{label} {'pass' if ok else 'fail' if ok is not None else '—'}"
+                                               for label, ok in outcome.items()))
+        else:
+            print(f"\n✅ Functional checks agree between {a} and {b}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two builds or deployments of the API")
+    for side, label in (("a", "release"), ("b", "candidate")):
+        parser.add_argument(f"--{side}", required=True, help=f"API base URL of target {side.upper()}")
+        parser.add_argument(f"--{side}-label", default=label)
+        parser.add_argument(f"--{side}-command", help=f"Start target {side.upper()} with this command for the run")
+        parser.add_argument(f"--{side}-dir", default=ROOT, help=f"Working directory for --{side}-command")
+    parser.add_argument("--endpoints", help="Comma-separated endpoints instead of the public read endpoints")
+    parser.add_argument("--rounds", type=int, default=30, help="Interleaved rounds per endpoint")
+    parser.add_argument("--ignore-fields", default=DEFAULT_IGNORE_FIELDS,
+                        help="Comma-separated JSON keys left out of the parity diff")
+    parser.add_argument("--alpha", type=float, default=0.05, help="1 - confidence level of the intervals")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Median slowdown of B that fails the run when its CI is above zero")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Fewer rounds are reported but not judged")
+    parser.add_argument("--functional", action="store_true", help="Also compare the backend_test.py checks")
+    parser.add_argument("--seed", type=int, help="Seed for the interleaving order")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--startup-timeout", type=float, default=180)
+    parser.add_argument("--output", help="Write the comparison as JSON to this path")
+    args = parser.parse_args()
+
+    targets = [Target(getattr(args, f"{side}_label"), getattr(args, side).rstrip("/"),
+                      getattr(args, f"{side}_command"), os.path.abspath(getattr(args, f"{side}_dir")))
+               for side in ("a", "b")]
+    if args.endpoints:
+        endpoints = {f"GET /api/{e}": e for e in (e.strip().strip("/") for e in args.endpoints.split(",")) if e}
+    else:
+        endpoints = PUBLIC_ENDPOINTS
+    ignore = frozenset(f.strip() for f in args.ignore_fields.split(",") if f.strip())
+
+    print("🆎 A/B COMPARISON")
+    print("=" * 70)
+    servers = []
+    clients = []
+    try:
+        for target in targets:
+            if target.command:
+                log_path = os.path.join(ROOT, "test_reports", f"ab_{target.label}_server.log")
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+                server = LocalServer(target.command, target.base_url, log_path, args.startup_timeout,
+                                     cwd=target.directory)
+                servers.append(server)
+                server.start()
+            clients.append(ApiClient(target.base_url, timeout=args.timeout, retry=NO_RETRY))
+
+        comparison = ABComparison(*clients, args.rounds, ignore, args.seed)
+        paths = comparison.resolve(endpoints)
+        print(f"{len(paths)} endpoint(s) × {args.rounds} interleaved rounds")
+        results = comparison.run(paths)
+        add_deltas(results, args.alpha, args.threshold, args.min_rounds)
+        functional = functional_parity(targets) if args.functional else None
+    except (RuntimeError, httpx.HTTPError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        for client in clients:
+            client.close()
+        for server in servers:
+            server.stop()
+
+    print_report(results, targets, args.alpha, functional)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"targets": {t.label: t.base_url for t in targets}, "rounds": args.rounds,
+                       "endpoints": results, "functional_differences": functional}, f, indent=2)
+        print(f"📝 Comparison written to {args.output}")
+
+    mismatched = [name for name, r in results.items() if r.get("parity") in ("differs", "status differs")]
+    slower = [name for name, r in results.items() if r.get("verdict") == "slower"]
+    if mismatched:
+        print(f"\n🚨 Parity differences: {', '.join(mismatched)}")
+    if slower:
+        print(f"🚨 {targets[1].label} is slower than {targets[0].label} past {args.threshold:.0%}: {', '.join(slower)}")
+    return 1 if mismatched or slower or functional or any("error" in r for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
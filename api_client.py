@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the IGK Events API verification scripts.
+Keeps connections alive in a pool (sync and async), optionally speaks HTTP/2,
+retries 5xx responses and timeouts with jittered exponential backoff, and
+counts how many TCP/TLS handshakes connection reuse saved. Every response
+carries a RequestTiming (DNS, connect, TLS, time-to-first-byte, total, byte
+counts and headers) in response.extensions["timing"]. An optional HttpCache
+answers repeated GETs from memory while they are fresh and revalidates them
+with If-None-Match / If-Modified-Since once they are not.
+
+The default origin can be overridden with IGK_BASE_URL, e.g. to route every
+script through a local cassette or shaping proxy.
+
+Requires httpx; HTTP/2 additionally needs the h2 package (pip install httpx[http2]).
+"""
+
+import asyncio
+import importlib.util
+import ipaddress
+import os
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_BASE_URL = os.environ.get("IGK_BASE_URL", "https://igk-event-preview.preview.emergentagent.com").rstrip("/")
+DEFAULT_API_BASE = f"{DEFAULT_BASE_URL}/api"
+ADMIN_PASSWORD = "admin123"
+ADMIN_HEADERS = {"Content-Type": "application/json", "x-admin-password": ADMIN_PASSWORD}
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+@dataclass
+class RetryPolicy:
+    """Retry/backoff settings. POST is not retried by default so creates are never duplicated."""
+    max_retries: int = 2
+    backoff_base: float = 0.25
+    backoff_max: float = 4.0
+    jitter: float = 0.5
+    retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+    retry_methods: Tuple[str, ...] = IDEMPOTENT_METHODS
+    retry_timeouts: bool = True
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (0-based), reduced by up to `jitter` of itself"""
+        backoff = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return backoff * (1 - self.jitter * random.random())
+
+    def should_retry_status(self, method: str, status_code: int, attempt: int) -> bool:
+        return (attempt < self.max_retries and method in self.retry_methods
+                and status_code in self.retry_statuses)
+
+    def should_retry_error(self, method: str, error: Exception, attempt: int) -> bool:
+        if attempt >= self.max_retries or method not in self.retry_methods:
+            return False
+        if isinstance(error, httpx.TimeoutException):
+            return self.retry_timeouts
+        return isinstance(error, httpx.NetworkError)
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+@dataclass
+class ConnectionStats:
+    """Connection reuse counters, fed by httpcore's trace extension"""
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    retries: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    @property
+    def reused_connections(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+    @property
+    def handshakes_saved(self) -> int:
+        """TCP (and TLS, over https) handshakes a connection-per-request client would have paid"""
+        return self.reused_connections
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "handshakes_saved": self.handshakes_saved,
+            "retries": self.retries,
+        }
+
+    def summary(self) -> str:
+        return (f"🔌 Connections: {self.requests} requests over {self.new_connections} connections "
+                f"({self.reused_connections} reused, {self.handshakes_saved} handshakes saved, "
+                f"{self.retries} retries)")
+
+
+@dataclass
+class RequestTiming:
+    """Timing and size breakdown of one request; phases a reused connection skips are 0"""
+    method: str
+    url: str
+    status_code: int
+    started_at: float
+    dns_ms: float
+    connect_ms: float
+    tls_ms: float
+    ttfb_ms: float
+    total_ms: float
+    request_bytes: int
+    response_bytes: int
+    response_headers: Dict[str, str]
+    reused_connection: bool
+    http_version: str
+    attempts: int = 1
+    cache: str = ""  # "hit", "revalidated" or "miss" when the client has an HttpCache
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class RequestTrace:
+    """Collects httpcore trace events for one request attempt"""
+
+    def __init__(self, stats: ConnectionStats):
+        self.stats = stats
+        self.events: Dict[str, float] = {}
+        self.dns_s = 0.0
+
+    def record(self, event_name: str, info: Dict[str, Any]):
+        self.events[event_name] = time.perf_counter()
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.increment("new_connections")
+        elif event_name == "connection.start_tls.complete":
+            self.stats.increment("tls_handshakes")
+
+    # httpcore hands the trace the kwargs it is about to pass to connect_tcp. Resolving the
+    # host here and swapping in the address separates DNS time from TCP connect time;
+    # TLS still verifies against the hostname, which httpcore passes to start_tls separately.
+    def _needs_resolving(self, event_name: str, info: Dict[str, Any]) -> bool:
+        host = info.get("host") if event_name == "connection.connect_tcp.started" else None
+        return bool(host) and not _is_ip(host)
+
+    def _resolved(self, info: Dict[str, Any], addresses: List, start: float):
+        self.dns_s = time.perf_counter() - start
+        if addresses:
+            info["host"] = addresses[0][4][0]
+
+    def __call__(self, event_name: str, info: Dict[str, Any]):
+        if self._needs_resolving(event_name, info):
+            start = time.perf_counter()
+            try:
+                addresses = socket.getaddrinfo(info["host"], info.get("port"), type=socket.SOCK_STREAM)
+            except OSError:
+                addresses = []  # let httpcore raise its own ConnectError
+            self._resolved(info, addresses, start)
+        self.record(event_name, info)
+
+    async def atrace(self, event_name: str, info: Dict[str, Any]):
+        if self._needs_resolving(event_name, info):
+            start = time.perf_counter()
+            try:
+                addresses = await asyncio.get_running_loop().getaddrinfo(
+                    info["host"], info.get("port"), type=socket.SOCK_STREAM)
+            except OSError:
+                addresses = []
+            self._resolved(info, addresses, start)
+        self.record(event_name, info)
+
+    def _phase_ms(self, name: str) -> float:
+        started = self.events.get(f"connection.{name}.started")
+        completed = self.events.get(f"connection.{name}.complete")
+        if started is None or completed is None:
+            return 0.0
+        return (completed - started) * 1000
+
+    def timing(self, method: str, url: str, response: httpx.Response,
+               started_at: float, start: float, attempts: int) -> RequestTiming:
+        end = time.perf_counter()
+        first_byte = (self.events.get("http11.receive_response_headers.complete")
+                      or self.events.get("http2.receive_response_headers.complete")
+                      or end)
+        return RequestTiming(
+            method=method,
+            url=url,
+            status_code=response.status_code,
+            started_at=started_at,
+            dns_ms=self.dns_s * 1000,
+            connect_ms=self._phase_ms("connect_tcp"),
+            tls_ms=self._phase_ms("start_tls"),
+            ttfb_ms=(first_byte - start) * 1000,
+            total_ms=(end - start) * 1000,
+            request_bytes=int(response.request.headers.get("content-length", 0)),
+            response_bytes=response.num_bytes_downloaded,
+            response_headers=dict(response.headers),
+            reused_connection="connection.connect_tcp.complete" not in self.events,
+            http_version=response.http_version,
+            attempts=attempts,
+        )
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """'public, max-age=60' -> {'public': None, 'max-age': '60'}"""
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: httpx.Headers) -> Optional[float]:
+    """Seconds a private cache may reuse a response without revalidating; None if not stated"""
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-cache" in directives:
+        return 0.0
+    if directives.get("max-age"):
+        try:
+            return max(0.0, float(directives["max-age"]))
+        except ValueError:
+            return 0.0
+    if "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"])
+            date = parsedate_to_datetime(headers["date"]) if "date" in headers else None
+        except (TypeError, ValueError):
+            return 0.0  # an invalid Expires means "already expired"
+        now = date.timestamp() if date else time.time()
+        return max(0.0, expires.timestamp() - now)
+    return None
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: List[Tuple[str, str]]
+    content: bytes
+    wire_bytes: int
+    stored_at: float
+    lifetime_s: float
+    vary: Dict[str, str]
+
+    @property
+    def etag(self) -> Optional[str]:
+        return httpx.Headers(self.headers).get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return httpx.Headers(self.headers).get("last-modified")
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.stored_at < self.lifetime_s
+
+    def validators(self) -> Dict[str, str]:
+        conditional = {}
+        if self.etag:
+            conditional["If-None-Match"] = self.etag
+        if self.last_modified:
+            conditional["If-Modified-Since"] = self.last_modified
+        return conditional
+
+    def response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status_code, headers=self.headers, content=self.content, request=request)
+
+
+@dataclass
+class CacheStats:
+    """What the client cache answered: hits need no request, revalidations cost a 304"""
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    uncacheable: int = 0
+    bytes_saved: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def summary(self) -> str:
+        return (f"🗄️  Cache: {self.hits} hits, {self.revalidated} revalidated (304), {self.misses} misses, "
+                f"{self.uncacheable} uncacheable, {self.bytes_saved:,} bytes saved")
+
+
+class HttpCache:
+    """
+    In-memory private cache for GET responses (the RFC 9111 subset the API needs):
+    honours no-store, no-cache, max-age, Expires and Vary, keeps the ETag and
+    Last-Modified validators, and evicts the least recently used entry beyond
+    `max_entries`. Share one instance between clients to share the entries.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: Any = None) -> str:
+        return str(httpx.URL(url, params=params)) if params else url
+
+    def lookup(self, key: str, request_headers: httpx.Headers) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if any(request_headers.get(name, "") != value for name, value in entry.vary.items()):
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def hit(self, entry: CacheEntry):
+        self.stats.increment("hits")
+        self.stats.increment("bytes_saved", entry.wire_bytes)
+
+    def update(self, key: str, entry: Optional[CacheEntry], request_headers: httpx.Headers,
+               response: httpx.Response) -> Tuple[httpx.Response, str]:
+        """Fold a network response into the cache; returns the response to hand back and the outcome"""
+        if response.status_code == 304 and entry is not None:
+            # The 304 carries fresh metadata; the body stays the stored one
+            headers = httpx.Headers(entry.headers)
+            for name in ("cache-control", "expires", "date", "etag", "last-modified"):
+                if name in response.headers:
+                    headers[name] = response.headers[name]
+            entry.headers = headers.multi_items()
+            entry.stored_at = time.monotonic()
+            entry.lifetime_s = freshness_lifetime(headers) or 0.0
+            self.stats.increment("revalidated")
+            self.stats.increment("bytes_saved", max(0, entry.wire_bytes - response.num_bytes_downloaded))
+            return entry.response(response.request), "revalidated"
+        if self._store(key, request_headers, response):
+            self.stats.increment("misses")
+            return response, "miss"
+        self.stats.increment("uncacheable")
+        return response, "miss"
+
+    def _store(self, key: str, request_headers: httpx.Headers, response: httpx.Response) -> bool:
+        directives = parse_cache_control(response.headers.get("cache-control", ""))
+        vary = [name.strip().lower() for name in response.headers.get("vary", "").split(",") if name.strip()]
+        lifetime = freshness_lifetime(response.headers)
+        has_validator = "etag" in response.headers or "last-modified" in response.headers
+        if (response.status_code != 200 or "no-store" in directives or "*" in vary
+                or not (lifetime or has_validator)):
+            with self._lock:
+                self._entries.pop(key, None)
+            return False
+        # The body is stored decoded, so the encoding headers no longer describe it
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        entry = CacheEntry(
+            url=key,
+            status_code=response.status_code,
+            headers=headers,
+            content=response.content,
+            wire_bytes=response.num_bytes_downloaded or len(response.content),
+            stored_at=time.monotonic(),
+            lifetime_s=lifetime or 0.0,
+            vary={name: request_headers.get(name, "") for name in vary},
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _http2_available(http2: bool) -> bool:
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("⚠️  HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+        return False
+    return http2
+
+
+class _BaseClient:
+    def __init__(self, base_url: str = DEFAULT_API_BASE, timeout: float = 30,
+                 headers: Optional[Dict[str, str]] = None, http2: bool = False,
+                 retry: Optional[RetryPolicy] = None, max_connections: int = 20,
+                 cache: Optional[HttpCache] = None, transport: Any = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.cache = cache
+        self.stats = ConnectionStats()
+        self.listeners: List[Callable[[RequestTiming], None]] = []
+        self.http2 = _http2_available(http2)
+        self._client_kwargs = dict(
+            headers=headers or {},
+            timeout=timeout,
+            # requests followed redirects by default and the scripts were written against that
+            follow_redirects=True,
+            http2=self.http2,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+        if transport is not None:
+            # e.g. httpx.MockTransport in the unit tests
+            self._client_kwargs["transport"] = transport
+
+    def url_for(self, endpoint: str) -> str:
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def add_listener(self, listener: Callable[[RequestTiming], None]):
+        """Call `listener` with the RequestTiming of every completed request"""
+        self.listeners.append(listener)
+
+    def _cached(self, method: str, url: str, kwargs: Dict[str, Any]) -> Tuple[Optional[str], Optional[CacheEntry]]:
+        """Cache key and stored entry for a GET; a stale entry's validators are added to the request headers"""
+        if self.cache is None or method != "GET":
+            return None, None
+        key = self.cache.key(url, kwargs.get("params"))
+        headers = httpx.Headers(self._client.headers)
+        headers.update(kwargs.get("headers") or {})
+        entry = self.cache.lookup(key, headers)
+        if entry is not None and not entry.is_fresh():
+            kwargs["headers"] = {**entry.validators(), **(kwargs.get("headers") or {})}
+        return key, entry
+
+    def _from_cache(self, method: str, url: str, entry: CacheEntry,
+                    started_at: float, start: float) -> httpx.Response:
+        """Answer a fresh entry without touching the network"""
+        self.cache.hit(entry)
+        response = entry.response(httpx.Request(method, url))
+        timing = RequestTrace(self.stats).timing(method, url, response, started_at, start, attempts=0)
+        timing.cache = "hit"
+        return self._notify(response, timing)
+
+    def _finish(self, trace: RequestTrace, method: str, url: str, response: httpx.Response,
+                started_at: float, start: float, attempts: int,
+                cache_key: Optional[str] = None, entry: Optional[CacheEntry] = None) -> httpx.Response:
+        timing = trace.timing(method, url, response, started_at, start, attempts)
+        if cache_key is not None:
+            response, timing.cache = self.cache.update(cache_key, entry, response.request.headers, response)
+        return self._notify(response, timing)
+
+    def _notify(self, response: httpx.Response, timing: RequestTiming) -> httpx.Response:
+        response.extensions["timing"] = timing
+        for listener in self.listeners:
+            listener(timing)
+        return response
+
+    def _rewind(self, files: Optional[Dict]):
+        """Reset file objects so a retried multipart body is sent in full"""
+        for value in (files or {}).values():
+            fileobj = value[1] if isinstance(value, tuple) else value
+            if hasattr(fileobj, "seek"):
+                fileobj.seek(0)
+
+
+class ApiClient(_BaseClient):
+    """Blocking client over one keep-alive connection pool; safe to share across threads"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = httpx.Client(**self._client_kwargs)
+
+    def request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying per the retry policy; raises httpx errors once retries run out"""
+        method = method.upper()
+        url = self.url_for(endpoint)
+        cache_key, entry = self._cached(method, url, kwargs)
+        if entry is not None and entry.is_fresh():
+            return self._from_cache(method, url, entry, time.time(), time.perf_counter())
+        attempt = 0
+        while True:
+            trace = RequestTrace(self.stats)
+            self._rewind(kwargs.get("files"))
+            self.stats.increment("requests")
+            started_at, start = time.time(), time.perf_counter()
+            try:
+                response = self._client.request(method, url, extensions={"trace": trace}, **kwargs)
+            except httpx.HTTPError as e:
+                if not self.retry.should_retry_error(method, e, attempt):
+                    raise
+            else:
+                if not self.retry.should_retry_status(method, response.status_code, attempt):
+                    return self._finish(trace, method, url, response, started_at, start, attempt + 1,
+                                        cache_key, entry)
+                response.close()
+            self.stats.increment("retries")
+            time.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    def get(self, endpoint: str, **kwargs) -> httpx.Response:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> httpx.Response:
+        return self.request("POST", endpoint, **kwargs)
+
+    def put(self, endpoint: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", endpoint, **kwargs)
+
+    def delete(self, endpoint: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncApiClient(_BaseClient):
+    """Asyncio counterpart of ApiClient sharing the same retry policy and statistics"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = httpx.AsyncClient(**self._client_kwargs)
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying per the retry policy; raises httpx errors once retries run out"""
+        method = method.upper()
+        url = self.url_for(endpoint)
+        cache_key, entry = self._cached(method, url, kwargs)
+        if entry is not None and entry.is_fresh():
+            return self._from_cache(method, url, entry, time.time(), time.perf_counter())
+        attempt = 0
+        while True:
+            trace = RequestTrace(self.stats)
+            self._rewind(kwargs.get("files"))
+            self.stats.increment("requests")
+            started_at, start = time.time(), time.perf_counter()
+            try:
+                response = await self._client.request(method, url, extensions={"trace": trace.atrace}, **kwargs)
+            except httpx.HTTPError as e:
+                if not self.retry.should_retry_error(method, e, attempt):
+                    raise
+            else:
+                if not self.retry.should_retry_status(method, response.status_code, attempt):
+                    return self._finish(trace, method, url, response, started_at, start, attempt + 1,
+                                        cache_key, entry)
+                await response.aclose()
+            self.stats.increment("retries")
+            await asyncio.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    async def get(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", endpoint, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", endpoint, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Asyncio test runner with a dependency graph.
+Tests declare which other tests they need to run after, and independent
+tests run concurrently up to a configurable limit.
+"""
+
+import asyncio
+import contextvars
+import time
+from typing import Callable, Dict, List, Tuple
+
+# Name of the test currently executing; asyncio.to_thread carries it into worker threads
+current_test: contextvars.ContextVar = contextvars.ContextVar("current_test", default=None)
+
+
+def depends_on(*test_names: str):
+    """Declare the tests (by method name) that must finish before this one"""
+    def decorator(func):
+        func.depends_on = tuple(getattr(func, "depends_on", ())) + test_names
+        return func
+    return decorator
+
+
+class AsyncTestRunner:
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tests: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self.labels: Dict[str, str] = {}
+        self.durations: Dict[str, float] = {}
+        self.errors: Dict[str, Exception] = {}
+
+    def add(self, func: Callable, label: str = None, depends_on: Tuple[str, ...] = ()):
+        """Register a test; dependencies come from @depends_on plus any extra ones given here"""
+        name = func.__name__
+        deps = tuple(getattr(func, "depends_on", ())) + tuple(depends_on)
+        self.tests[name] = (func, deps)
+        self.labels[name] = label or name
+
+    def execution_order(self) -> List[str]:
+        """Registration order, except that a test is moved after any dependency registered later than it"""
+        for name, (_, deps) in self.tests.items():
+            missing = [d for d in deps if d not in self.tests]
+            if missing:
+                raise ValueError(f"Test '{name}' depends on unregistered test(s): {', '.join(missing)}")
+
+        order = []
+        done = set()
+        pending = list(self.tests)
+        while pending:
+            # Always take the earliest-registered test whose dependencies are done
+            name = next((n for n in pending if all(d in done for d in self.tests[n][1])), None)
+            if name is None:
+                raise ValueError(f"Dependency cycle between tests: {', '.join(pending)}")
+            order.append(name)
+            done.add(name)
+            pending.remove(name)
+        return order
+
+    async def _run_test(self, name: str, tasks: Dict[str, asyncio.Task], semaphore: asyncio.Semaphore):
+        func, deps = self.tests[name]
+        if deps:
+            await asyncio.gather(*(tasks[d] for d in deps))
+
+        async with semaphore:
+            print(f"\n--- Testing: {self.labels[name]} ---")
+            current_test.set(name)
+            start = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    await func()
+                else:
+                    await asyncio.to_thread(func)
+            except Exception as e:
+                # Dependents still run; they check for missing state themselves
+                self.errors[name] = e
+                print(f"💥 {self.labels[name]}: Error - {str(e)}")
+            finally:
+                self.durations[name] = time.perf_counter() - start
+
+    async def run(self):
+        """Run every registered test, respecting dependencies and the concurrency limit"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+        for name in self.execution_order():
+            tasks[name] = asyncio.ensure_future(self._run_test(name, tasks, semaphore))
+            if self.max_concurrency == 1:
+                # Sequential: finish each test before the next is scheduled, so nothing overtakes a dependent
+                await tasks[name]
+        await asyncio.gather(*tasks.values())
+        return self.durations
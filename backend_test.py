@@ -4,38 +4,94 @@ Backend API Testing Script for IGK Events Gallery Theme System
 Tests all gallery theme and photo management endpoints.
 """
 
-import requests
+import httpx
 import json
 import uuid
 import os
 import sys
+import asyncio
+import argparse
+import shutil
+import time
 from typing import Dict, Any
 import io
 from PIL import Image
 import tempfile
 
-class GalleryThemeAPITester:
+from async_runner import AsyncTestRunner, current_test, depends_on
+from api_client import ApiClient, DEFAULT_BASE_URL
+from perf_report import PerfRecorder, REPORT_DIR
+from perf_compare import compare_reports, print_comparison
+
+DEFAULT_LOAD_SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "load_scenarios.json")
+
+class ResultSummary:
+    """Running pass/fail tally; grows with the number of distinct checks, not with repeats"""
+    
     def __init__(self):
-        self.base_url = "https://igk-event-preview.preview.emergentagent.com"
+        self.total = 0
+        self.passed = 0
+        self.checks: Dict[str, Dict[str, Any]] = {}
+    
+    @property
+    def failed(self) -> int:
+        return self.total - self.passed
+    
+    def add(self, result: Dict[str, Any]):
+        self.total += 1
+        self.passed += result["success"]
+        check = self.checks.setdefault(result["test"], {
+            "test": result["test"], "test_func": result["test_func"], "runs": 0, "failures": 0,
+            "success": True, "message": result["message"]})
+        check["runs"] += 1
+        if not result["success"]:
+            check["failures"] += 1
+            check["success"] = False
+            check["message"] = result["message"]
+    
+    def results(self):
+        """One result per distinct check; a check that failed in any repeat counts as failed"""
+        return list(self.checks.values())
+
+class GalleryThemeAPITester:
+    def __init__(self, sink=None, base_url: str = DEFAULT_BASE_URL):
+        self.base_url = base_url.rstrip("/")
         self.api_base = f"{self.base_url}/api"
         self.admin_password = "admin123"
         self.headers = {
             "Content-Type": "application/json",
             "x-admin-password": self.admin_password
         }
-        self.test_results = []
+        self.sink = sink
+        self.summary = ResultSummary()
+        self.created_theme_id = None
+        self.created_photo_id = None
+        self.client = ApiClient(self.api_base, timeout=30)
+        self.perf = PerfRecorder(current_test, sink)
+        self.client.add_listener(self.perf.record)
+        self.test_durations = {}
+        
+    def reset_run_state(self):
+        """Forget the IDs an earlier repeat created, so a failed create cannot leave its dependents on stale IDs"""
         self.created_theme_id = None
         self.created_photo_id = None
+
+    def add_durations(self, durations: Dict[str, float]):
+        """Accumulate per-test wall time across repeats; the JUnit report shows each test's total"""
+        for test, seconds in durations.items():
+            self.test_durations[test] = self.test_durations.get(test, 0.0) + seconds
         
     def log_result(self, test_name: str, success: bool, message: str, response_data: Any = None):
-        """Log test results"""
+        """Tally the result and stream it to the sink; the response body is only printed, never kept"""
         result = {
             "test": test_name,
             "success": success,
             "message": message,
-            "data": response_data
+            "test_func": current_test.get()
         }
-        self.test_results.append(result)
+        self.summary.add(result)
+        if self.sink is not None:
+            self.sink.write_result(result)
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status}: {test_name} - {message}")
         if response_data and not success:
@@ -43,42 +99,44 @@ class GalleryThemeAPITester:
 
     def make_request(self, method: str, endpoint: str, data: Dict = None, files: Dict = None, headers: Dict = None) -> Dict:
         """Make HTTP request with error handling"""
-        url = f"{self.api_base}/{endpoint}"
         request_headers = headers or self.headers.copy()
         
         try:
             if method == "GET":
-                response = requests.get(url, headers=request_headers, timeout=30)
+                response = self.client.get(endpoint, headers=request_headers)
             elif method == "POST":
                 if files:
                     # Remove Content-Type for multipart requests
                     if "Content-Type" in request_headers:
                         del request_headers["Content-Type"]
-                    response = requests.post(url, data=data, files=files, headers=request_headers, timeout=30)
+                    response = self.client.post(endpoint, data=data, files=files, headers=request_headers)
                 else:
-                    response = requests.post(url, json=data, headers=request_headers, timeout=30)
+                    response = self.client.post(endpoint, json=data, headers=request_headers)
             elif method == "PUT":
-                response = requests.put(url, json=data, headers=request_headers, timeout=30)
+                response = self.client.put(endpoint, json=data, headers=request_headers)
             elif method == "DELETE":
-                response = requests.delete(url, headers=request_headers, timeout=30)
+                response = self.client.delete(endpoint, headers=request_headers)
             else:
                 return {"error": f"Unsupported method: {method}", "status_code": 400}
                 
+            timing = response.extensions["timing"].as_dict()
             try:
                 return {
                     "status_code": response.status_code,
                     "data": response.json(),
-                    "headers": dict(response.headers)
+                    "headers": dict(response.headers),
+                    "timing": timing
                 }
             except:
                 return {
                     "status_code": response.status_code,
                     "data": response.text,
-                    "headers": dict(response.headers)
+                    "headers": dict(response.headers),
+                    "timing": timing
                 }
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return {"error": "Request timeout", "status_code": 408}
-        except requests.exceptions.ConnectionError:
+        except httpx.NetworkError:
             return {"error": "Connection error", "status_code": 503}
         except Exception as e:
             return {"error": str(e), "status_code": 500}
@@ -186,6 +244,7 @@ class GalleryThemeAPITester:
                 response.get("data")
             )
 
+    @depends_on("test_admin_gallery_themes_create")
     def test_admin_gallery_theme_update(self):
         """Test PUT /api/admin/gallery/themes/[id] - Update theme"""
         if not self.created_theme_id:
@@ -220,6 +279,7 @@ class GalleryThemeAPITester:
                 response.get("data")
             )
 
+    @depends_on("test_admin_gallery_themes_create")
     def test_admin_gallery_photos_get(self):
         """Test GET /api/admin/gallery/photos?themeId=[id] - Fetch photos for a theme"""
         if not self.created_theme_id:
@@ -271,6 +331,7 @@ class GalleryThemeAPITester:
                 response.get("data")
             )
 
+    @depends_on("test_admin_gallery_themes_create")
     def test_admin_gallery_photos_create(self):
         """Test POST /api/admin/gallery/photos - Add photo to theme"""
         if not self.created_theme_id:
@@ -334,6 +395,7 @@ class GalleryThemeAPITester:
                 response.get("data")
             )
 
+    @depends_on("test_admin_gallery_photos_create")
     def test_admin_gallery_photo_delete(self):
         """Test DELETE /api/admin/gallery/photos/[id] - Delete photo"""
         if not self.created_photo_id:
@@ -363,6 +425,12 @@ class GalleryThemeAPITester:
                 response.get("data")
             )
 
+    @depends_on(
+        "test_admin_gallery_theme_update",
+        "test_admin_gallery_photos_get",
+        "test_admin_gallery_photos_create",
+        "test_admin_gallery_photo_delete",
+    )
     def test_admin_gallery_theme_delete(self):
         """Test DELETE /api/admin/gallery/themes/[id] - Delete theme"""
         if not self.created_theme_id:
@@ -451,49 +519,36 @@ class GalleryThemeAPITester:
                 None
             )
 
-    def run_comprehensive_test_scenario(self):
+    def run_comprehensive_test_scenario(self, max_concurrency: int = 8):
         """Run comprehensive test scenario"""
         print("🚀 Starting Gallery Theme API Comprehensive Test Scenario")
         print("=" * 70)
         
+        runner = AsyncTestRunner(max_concurrency)
         # Step 1: Create a new theme
-        print("\n📝 STEP 1: Creating a new theme...")
-        self.test_admin_gallery_themes_create()
-        
+        runner.add(self.test_admin_gallery_themes_create, "📝 STEP 1: Creating a new theme")
         # Step 2: Verify it appears in public themes (if published)
-        print("\n🔍 STEP 2: Checking if theme appears in public themes...")
-        self.test_public_gallery_themes_get()
-        
+        runner.add(self.test_public_gallery_themes_get, "🔍 STEP 2: Checking if theme appears in public themes",
+                   depends_on=("test_admin_gallery_themes_create",))
         # Step 3: Add a photo to the theme
-        print("\n📸 STEP 3: Adding photo to theme...")
-        self.test_admin_gallery_photos_create()
-        
+        runner.add(self.test_admin_gallery_photos_create, "📸 STEP 3: Adding photo to theme")
         # Step 4: Verify photos appear when fetching theme
-        print("\n🔎 STEP 4: Fetching photos for theme...")
-        self.test_admin_gallery_photos_get()
-        
-        # Step 5: Test theme by slug (if theme has proper slug)
-        print("\n🌐 STEP 5: Testing theme access by slug...")
-        if self.created_theme_id:
-            # Would need to get the slug, for now test the known one
-            pass
-        self.test_public_gallery_theme_by_slug()
-        
+        runner.add(self.test_admin_gallery_photos_get, "🔎 STEP 4: Fetching photos for theme",
+                   depends_on=("test_admin_gallery_photos_create",))
+        # Step 5: Test theme by slug (the known seeded slug; new themes are independent of it)
+        runner.add(self.test_public_gallery_theme_by_slug, "🌐 STEP 5: Testing theme access by slug")
         # Step 6: Test file upload
-        print("\n📤 STEP 6: Testing file upload...")
-        self.test_file_upload()
-        
+        runner.add(self.test_file_upload, "📤 STEP 6: Testing file upload")
         # Step 7: Test update theme
-        print("\n✏️ STEP 7: Testing theme update...")
-        self.test_admin_gallery_theme_update()
-        
+        runner.add(self.test_admin_gallery_theme_update, "✏️ STEP 7: Testing theme update")
         # Step 8: Clean up - delete photo and theme
-        print("\n🗑️ STEP 8: Cleaning up (delete photo and theme)...")
-        self.test_admin_gallery_photo_delete()
-        self.test_admin_gallery_theme_delete()
+        runner.add(self.test_admin_gallery_photo_delete, "🗑️ STEP 8: Cleaning up (delete photo)")
+        runner.add(self.test_admin_gallery_theme_delete, "🗑️ STEP 8: Cleaning up (delete theme)")
+        
+        self.add_durations(asyncio.run(runner.run()))
 
-    def run_all_tests(self):
-        """Run all individual API tests"""
+    def run_all_tests(self, max_concurrency: int = 8):
+        """Run all individual API tests, concurrently where their dependencies allow"""
         print("🧪 Running All Gallery Theme API Tests")
         print("=" * 50)
         
@@ -510,9 +565,10 @@ class GalleryThemeAPITester:
             ("File Upload", self.test_file_upload)
         ]
         
+        runner = AsyncTestRunner(max_concurrency)
         for test_name, test_func in tests:
-            print(f"\n--- Testing: {test_name} ---")
-            test_func()
+            runner.add(test_func, test_name)
+        self.add_durations(asyncio.run(runner.run()))
 
     def print_summary(self):
         """Print test summary"""
@@ -520,9 +576,9 @@ class GalleryThemeAPITester:
         print("📊 TEST SUMMARY")
         print("=" * 70)
         
-        total_tests = len(self.test_results)
-        passed_tests = len([r for r in self.test_results if r["success"]])
-        failed_tests = total_tests - passed_tests
+        total_tests = self.summary.total
+        passed_tests = self.summary.passed
+        failed_tests = self.summary.failed
         
         print(f"Total Tests: {total_tests}")
         print(f"✅ Passed: {passed_tests}")
@@ -531,40 +587,222 @@ class GalleryThemeAPITester:
         
         if failed_tests > 0:
             print(f"\n🚨 FAILED TESTS:")
-            for result in self.test_results:
-                if not result["success"]:
-                    print(f"  • {result['test']}: {result['message']}")
+            for check in self.summary.results():
+                if not check["success"]:
+                    repeats = f" ({check['failures']} of {check['runs']} runs)" if check["runs"] > 1 else ""
+                    print(f"  • {check['test']}: {check['message']}{repeats}")
         
         print("\n📋 API ENDPOINT STATUS:")
         endpoint_status = {}
-        for result in self.test_results:
-            endpoint = result["test"].split(" - ")[0]
-            endpoint_status[endpoint] = "✅" if result["success"] else "❌"
+        for check in self.summary.results():
+            endpoint = check["test"].split(" - ")[0]
+            endpoint_status[endpoint] = "✅" if check["success"] else "❌"
         
         for endpoint, status in endpoint_status.items():
             print(f"  {status} {endpoint}")
+        
+        self.perf.print_endpoint_table()
+        print(f"\n{self.client.stats.summary()}")
+
+    def write_reports(self, report_dir: str = REPORT_DIR, mode: str = "all"):
+        """Write the JSON perf report and JUnit XML for this run; returns their paths"""
+        metadata = {
+            "base_url": self.base_url,
+            "mode": mode,
+            "connections": self.client.stats.as_dict(),
+        }
+        if self.sink is not None:
+            metadata["sink"] = self.sink.describe()
+        paths = self.perf.write_reports(self.summary.results(), report_dir, metadata, self.test_durations)
+        print(f"📝 Reports written to {', '.join(paths)}")
+        return paths
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gallery Theme API tests")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL,
+                        help="Site root to test, without /api (defaults to $IGK_BASE_URL or the preview deployment)")
+    parser.add_argument("--scenario", action="store_true",
+                        help="Run the comprehensive create/verify/cleanup scenario")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Maximum number of checks in flight at once (1 = sequential)")
+    parser.add_argument("--report-dir", default=REPORT_DIR,
+                        help="Directory for the JSON perf report and JUnit XML")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Run the checks this many times to collect latency samples")
+    parser.add_argument("--sink", choices=("ndjson", "ndjson.gz", "parquet"),
+                        help="Stream results and request timings to rotating chunk files instead of memory")
+    parser.add_argument("--sink-dir", default=os.path.join(REPORT_DIR, "stream"),
+                        help="Directory for the --sink chunks")
+    parser.add_argument("--sink-rotate", type=int, default=500_000,
+                        help="Records per chunk file before the sink rotates to a new one")
+    
+    gate = parser.add_argument_group("performance gate")
+    gate.add_argument("--baseline",
+                      help="Baseline perf_report.json; fail the run when an endpoint regresses against it")
+    gate.add_argument("--update-baseline", action="store_true",
+                      help="Copy this run's report to --baseline when all gates pass")
+    gate.add_argument("--threshold", type=float, default=0.10,
+                      help="Relative p95 increase that counts as a regression (0.10 = 10%%)")
+    gate.add_argument("--alpha", type=float, default=0.05, help="Significance level for the gate")
+    gate.add_argument("--method", choices=("mannwhitney", "bootstrap"), default="mannwhitney",
+                      help="Statistical test applied per endpoint")
+    gate.add_argument("--min-samples", type=int, default=5,
+                      help="Endpoints with fewer samples are reported but not gated")
+    
+    load = parser.add_argument_group("load mode")
+    load.add_argument("--load", action="store_true",
+                      help="Generate load from a weighted scenario file instead of running checks")
+    load.add_argument("--load-scenario", default=DEFAULT_LOAD_SCENARIO,
+                      help="Scenario file with the weighted traffic mix")
+    load.add_argument("--rate", type=float,
+                      help="Open loop: target requests per second")
+    load.add_argument("--users", type=int, default=10,
+                      help="Closed loop: number of virtual users (ignored when --rate is set)")
+    load.add_argument("--duration", type=float, default=60,
+                      help="Seconds to generate load for")
+    load.add_argument("--poisson", action="store_true",
+                      help="Open loop: use Poisson arrivals instead of a fixed interval")
+    load.add_argument("--max-connections", type=int, default=100,
+                      help="Connection pool size for load generation")
+    load.add_argument("--load-report", help="Write the load report as JSON to this path")
+    load.add_argument("--max-error-rate", type=float, default=0.01,
+                      help="Exit non-zero when the overall error rate exceeds this fraction")
+    
+    cache = parser.add_argument_group("cache audit")
+    cache.add_argument("--cache-audit", action="store_true",
+                       help="Audit HTTP caching of the public read endpoints instead of running checks")
+    cache.add_argument("--cache-repeats", type=int, default=10,
+                       help="Requests per endpoint and pass in the cache audit")
+    cache.add_argument("--cache-report", help="Write the cacheability report as JSON to this path")
+    
+    payload = parser.add_argument_group("payload audit")
+    payload.add_argument("--payload-audit", action="store_true",
+                         help="Audit response sizes and compression of the public endpoints instead of running checks")
+    payload.add_argument("--payload-budget-kb", type=float,
+                         help="Fail when an endpoint sends more than this many KB over the wire")
+    payload.add_argument("--payload-report", help="Write the payload report as JSON to this path")
+    
+    burst = parser.add_argument_group("write burst")
+    burst.add_argument("--write-burst", action="store_true",
+                       help="Burst concurrent, partly duplicate writes at orders/newsletter/contacts/partners "
+                            "instead of running checks")
+    burst.add_argument("--burst-submissions", type=int, default=4000,
+                       help="Unique submissions in the burst, before duplicates")
+    burst.add_argument("--burst-concurrency", type=int, default=200, help="Burst requests in flight at once")
+    burst.add_argument("--burst-verify", choices=("db", "api"), default="api",
+                       help="Check for duplicates, lost orders and overselling in MongoDB or via the admin API")
+    burst.add_argument("--burst-report", help="Write the write-burst report as JSON to this path")
+    args = parser.parse_args(argv)
+    args.base_url = args.base_url.rstrip("/")
+    return args
+
+def run_load_mode(args) -> int:
+    """Run the load generator and return the number of failed gates"""
+    from load_generator import run_load
+    
+    report = run_load(
+        args.load_scenario,
+        base_url=f"{args.base_url}/api",
+        rate=args.rate,
+        users=args.users,
+        duration_s=args.duration,
+        poisson=args.poisson,
+        headers={"Content-Type": "application/json"},
+        report_path=args.load_report,
+        max_connections=args.max_connections,
+    )
+    error_rate = report.totals().as_dict(report.elapsed_s)["error_rate"]
+    if error_rate > args.max_error_rate:
+        print(f"\n🚨 Error rate {error_rate:.2%} exceeds the allowed {args.max_error_rate:.2%}")
+        return 1
+    return 0
+
+def run_cache_audit_mode(args) -> int:
+    """Run the HTTP caching audit; fails only when an endpoint could not be fetched"""
+    from cache_audit import run_cache_audit
+    
+    results = run_cache_audit(f"{args.base_url}/api", args.cache_repeats, args.cache_report)
+    return 1 if any("error" in r for r in results.values()) else 0
+
+def run_payload_audit_mode(args) -> int:
+    """Run the payload size audit; fails when an endpoint errors or exceeds the size budget"""
+    from payload_audit import over_budget, run_payload_audit
+    
+    results, _ = run_payload_audit(f"{args.base_url}/api", report_path=args.payload_report,
+                                   budget_kb=args.payload_budget_kb)
+    failed = [name for name, r in results.items() if "error" in r] + over_budget(results, args.payload_budget_kb)
+    return 1 if failed else 0
+
+def run_write_burst_mode(args) -> int:
+    """Run the write burst; fails when any post-burst database check finds a violation"""
+    from write_burst_test import run_write_burst
+    
+    report = run_write_burst(f"{args.base_url}/api", args.burst_submissions,
+                             concurrency=args.burst_concurrency, verify=args.burst_verify,
+                             report_path=args.burst_report)
+    return 1 if report["violations"] else 0
 
 def main():
     """Main function to run tests"""
-    if len(sys.argv) > 1 and sys.argv[1] == "--scenario":
-        print("Running comprehensive test scenario...")
-        tester = GalleryThemeAPITester()
-        tester.run_comprehensive_test_scenario()
-    else:
-        print("Running all API tests individually...")
-        tester = GalleryThemeAPITester()
-        tester.run_all_tests()
+    args = parse_args()
+    if args.load:
+        return run_load_mode(args)
+    if args.cache_audit:
+        return run_cache_audit_mode(args)
+    if args.payload_audit:
+        return run_payload_audit_mode(args)
+    if args.write_burst:
+        return run_write_burst_mode(args)
+    
+    sink = None
+    if args.sink:
+        from result_sink import open_sink
+        sink = open_sink(args.sink, args.sink_dir, time.strftime("run-%Y%m%d-%H%M%S"), args.sink_rotate)
+    
+    tester = GalleryThemeAPITester(sink, args.base_url)
+    for _ in range(max(1, args.repeat)):
+        tester.reset_run_state()
+        if args.scenario:
+            print("Running comprehensive test scenario...")
+            tester.run_comprehensive_test_scenario(args.concurrency)
+        else:
+            print("Running all API tests individually...")
+            tester.run_all_tests(args.concurrency)
     
     tester.print_summary()
+    report_path, _ = tester.write_reports(args.report_dir, "scenario" if args.scenario else "all")
+    tester.client.close()
+    if sink is not None:
+        sink.close()
+        print(f"🗃️  Streamed {sink.counts.get('results', 0)} results and {sink.counts.get('requests', 0)} "
+              f"request timings to {len(sink.paths)} chunk(s) in {args.sink_dir}")
+    
+    return gate_exit_code(tester, args, report_path)
+
+def gate_exit_code(tester, args, report_path: str) -> int:
+    """Exit status for CI: 1 when any functional check failed or any endpoint regressed"""
+    failed_count = tester.summary.failed
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline):
+        comparisons = compare_reports(args.baseline, report_path, args.threshold, args.alpha,
+                                      args.method, args.min_samples)
+        print_comparison(comparisons, args.threshold)
+        regressions = [c for c in comparisons if c.regressed]
+    elif args.baseline:
+        print(f"\n⚠️  Baseline {args.baseline} not found; skipping the performance gate")
     
-    # Exit with error code if any tests failed
-    failed_count = len([r for r in tester.test_results if not r["success"]])
-    return failed_count
+    if failed_count:
+        print(f"\n🚨 Functional gate failed: {failed_count} check(s) failed")
+    if regressions:
+        print(f"🚨 Performance gate failed: {', '.join(c.endpoint for c in regressions)}")
+    if not failed_count and not regressions and args.baseline and args.update_baseline:
+        shutil.copyfile(report_path, args.baseline)
+        print(f"📌 Baseline updated: {args.baseline}")
+    return 1 if failed_count or regressions else 0
 
 if __name__ == "__main__":
     try:
-        exit_code = main()
-        sys.exit(min(exit_code, 1))  # Cap at 1 for shell compatibility
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n\nTest execution interrupted by user.")
         sys.exit(1)
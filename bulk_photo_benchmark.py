@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the gallery bulk photo and reorder endpoints.
+Sweeps batch sizes through POST /api/admin/gallery/themes/[id]/photos
+(GalleryPhoto.bulkCreate) and reorder sizes through POST .../reorder
+(GalleryPhoto.reorder), fits latency = a * N^b to flag super-linear growth,
+and recommends the batch size with the best photo throughput for import tooling.
+
+Usage:
+    python bulk_photo_benchmark.py [--batch-sizes 1,10,100,1000,5000] [--reorder-sizes 10,100,1000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import uuid
+from typing import Dict, List
+
+from api_client import ADMIN_HEADERS, ApiClient, DEFAULT_API_BASE, NO_RETRY
+from perf_report import fit_power_law, summarize
+
+SUPER_LINEAR_EXPONENT = 1.15
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+class BulkPhotoBenchmark:
+    def __init__(self, client: ApiClient, repeats: int = 3):
+        self.client = client
+        self.repeats = repeats
+        self.theme_ids: List[str] = []
+
+    def create_theme(self) -> str:
+        response = self.client.post("admin/gallery/themes", json={
+            "name": f"Bulk Benchmark {uuid.uuid4().hex[:8]}",
+            "description": "Temporary theme for the bulk photo benchmark",
+            "status": "draft",
+        })
+        response.raise_for_status()
+        theme_id = response.json()["theme"]["id"]
+        self.theme_ids.append(theme_id)
+        return theme_id
+
+    def photo_batch(self, size: int) -> List[Dict]:
+        return [
+            {"imageUrl": f"https://example.com/benchmark/{uuid.uuid4().hex}.jpg", "caption": f"Benchmark photo {i}"}
+            for i in range(size)
+        ]
+
+    def time_bulk_create(self, size: int) -> List[float]:
+        """Latencies (ms) of `repeats` bulk creates of `size` photos, each into a fresh theme"""
+        latencies = []
+        for _ in range(self.repeats):
+            theme_id = self.create_theme()
+            response = self.client.post(f"admin/gallery/themes/{theme_id}/photos",
+                                        json={"photos": self.photo_batch(size)})
+            if response.status_code != 201:
+                raise RuntimeError(f"Bulk create of {size} photos failed with status {response.status_code}")
+            latencies.append(response.extensions["timing"].total_ms)
+            self.delete_theme(theme_id)
+        return latencies
+
+    def time_reorder(self, size: int) -> List[float]:
+        """Latencies (ms) of reordering `size` photos, shuffled differently each repeat"""
+        theme_id = self.create_theme()
+        response = self.client.post(f"admin/gallery/themes/{theme_id}/photos",
+                                    json={"photos": self.photo_batch(size)})
+        response.raise_for_status()
+        photo_ids = [p["id"] for p in response.json()["photos"]]
+
+        latencies = []
+        for _ in range(self.repeats):
+            random.shuffle(photo_ids)
+            response = self.client.post(f"admin/gallery/themes/{theme_id}/reorder", json={"photoIds": photo_ids})
+            if response.status_code != 200:
+                raise RuntimeError(f"Reorder of {size} photos failed with status {response.status_code}")
+            latencies.append(response.extensions["timing"].total_ms)
+        self.delete_theme(theme_id)
+        return latencies
+
+    def delete_theme(self, theme_id: str):
+        self.client.delete(f"admin/gallery/themes/{theme_id}")
+        if theme_id in self.theme_ids:
+            self.theme_ids.remove(theme_id)
+
+    def cleanup(self):
+        for theme_id in list(self.theme_ids):
+            try:
+                self.delete_theme(theme_id)
+            except Exception as e:
+                print(f"🧹 Cleanup of theme {theme_id} failed: {e}")
+
+    def sweep(self, sizes: List[int], timer) -> Dict[int, Dict[str, float]]:
+        results = {}
+        for size in sizes:
+            latencies = timer(size)
+            stats = summarize(latencies)
+            stats["photos_per_s"] = size / (stats["p50"] / 1000) if stats["p50"] else 0.0
+            stats["ms_per_photo"] = stats["p50"] / size
+            results[size] = stats
+            print(f"  N={size:<6} p50={stats['p50']:>9.1f} ms  p95={stats['p95']:>9.1f} ms  "
+                  f"{stats['ms_per_photo']:>7.3f} ms/photo  {stats['photos_per_s']:>9.0f} photos/s")
+        return results
+
+
+def analyze(name: str, results: Dict[int, Dict[str, float]]) -> Dict:
+    """Fit the whole sweep, plus the largest two sizes alone since fixed per-request overhead
+    flattens the overall exponent at small N"""
+    sizes = sorted(results)
+    a, b, r2 = fit_power_law(sizes, [results[n]["p50"] for n in sizes])
+    _, tail_b, _ = fit_power_law(sizes[-2:], [results[n]["p50"] for n in sizes[-2:]])
+    super_linear = max(b, tail_b) > SUPER_LINEAR_EXPONENT
+    icon = "❌" if super_linear else "✅"
+    print(f"  {icon} {name}: latency ≈ {a:.2f} · N^{b:.2f} (R²={r2:.3f}), largest-N exponent {tail_b:.2f}"
+          + (" — super-linear growth" if super_linear else ""))
+    return {"a": a, "exponent": b, "r_squared": r2, "tail_exponent": tail_b, "super_linear": super_linear}
+
+
+def best_batch_size(results: Dict[int, Dict[str, float]], latency_budget_ms: float) -> int:
+    """Batch size with the highest photo throughput whose p95 stays inside the latency budget"""
+    within_budget = [n for n, s in results.items() if s["p95"] <= latency_budget_ms]
+    candidates = within_budget or [min(results)]
+    return max(candidates, key=lambda n: results[n]["photos_per_s"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk photo create / reorder scaling benchmark")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--batch-sizes", type=parse_sizes, default=[1, 10, 100, 1000, 5000])
+    parser.add_argument("--reorder-sizes", type=parse_sizes, default=[10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=3, help="Measurements per size")
+    parser.add_argument("--latency-budget", type=float, default=10_000,
+                        help="Max acceptable p95 (ms) for a recommended batch size")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    client = ApiClient(args.base_url, timeout=args.timeout, headers=ADMIN_HEADERS, retry=NO_RETRY)
+    benchmark = BulkPhotoBenchmark(client, args.repeats)
+    print("📸 BULK PHOTO BENCHMARK")
+    print("=" * 70)
+    try:
+        print("\n➕ POST /api/admin/gallery/themes/[id]/photos")
+        bulk = benchmark.sweep(args.batch_sizes, benchmark.time_bulk_create)
+        print("\n🔀 POST /api/admin/gallery/themes/[id]/reorder")
+        reorder = benchmark.sweep(args.reorder_sizes, benchmark.time_reorder)
+    finally:
+        benchmark.cleanup()
+        client.close()
+
+    print("\n📐 COMPLEXITY FIT:")
+    bulk_fit = analyze("bulk create", bulk)
+    reorder_fit = analyze("reorder", reorder)
+    best = best_batch_size(bulk, args.latency_budget)
+    print(f"\n🏆 Recommended import batch size: {best} photos "
+          f"({bulk[best]['photos_per_s']:.0f} photos/s, p95 {bulk[best]['p95']:.0f} ms)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "bulk_create": {"results": bulk, "fit": bulk_fit},
+                "reorder": {"results": reorder, "fit": reorder_fit},
+                "recommended_batch_size": best,
+            }, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+    return 1 if bulk_fit["super_linear"] or reorder_fit["super_linear"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
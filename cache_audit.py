@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+HTTP caching audit for the public read endpoints.
+Checks each endpoint for ETag, Last-Modified, Cache-Control, Expires and Vary,
+replays it with If-None-Match / If-Modified-Since and measures the bytes and
+latency the 304s save, then repeats it through an ApiClient with an HttpCache
+to measure what a client-side cache saves. The per-endpoint report says
+whether the response is the same for every caller and stable between
+requests, i.e. whether a CDN could serve it instead of MongoDB, and which
+headers the route would need for that.
+
+When an endpoint sends no validators the 304 savings are estimated: the full
+body is counted as saved and the latency of GET /api/health (a minimal
+response through the same stack) stands in for the 304's.
+
+Usage:
+    python cache_audit.py [--base-url http://localhost:3000/api] [--repeats 10] [--output cache_report.json]
+    python backend_test.py --cache-audit
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Dict, List, Optional
+
+import httpx
+
+from api_client import ApiClient, DEFAULT_API_BASE, HttpCache, NO_RETRY, parse_cache_control
+from perf_report import summarize
+
+PUBLIC_ENDPOINTS = {
+    "GET /api/gallery/themes": "gallery/themes",
+    "GET /api/gallery/themes/[slug]": "gallery/themes/{slug}",
+    "GET /api/events": "events",
+    "GET /api/brands": "brands",
+    "GET /api/team": "team",
+    "GET /api/settings": "settings",
+}
+# Headers that make a response per-caller, so a shared cache must not reuse it
+PER_CALLER_VARY = ("cookie", "authorization", "x-admin-password")
+CDN_CACHE_CONTROL = "public, max-age=0, s-maxage=60, stale-while-revalidate=300"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def body_hash(response: httpx.Response) -> str:
+    return hashlib.sha256(response.content).hexdigest()[:16]
+
+
+class CacheAuditor:
+    def __init__(self, base_url: str = DEFAULT_API_BASE, repeats: int = 10, timeout: float = 30):
+        self.base_url = base_url
+        self.repeats = repeats
+        self.timeout = timeout
+        self.client = ApiClient(base_url, timeout=timeout, retry=NO_RETRY)
+        self.floor_ms = 0.0
+
+    def resolve(self, path: str) -> Optional[str]:
+        """Fill in the {slug} of a detail endpoint from the first published theme"""
+        if "{slug}" not in path:
+            return path
+        themes = self.client.get("gallery/themes").json().get("themes") or []
+        if not themes:
+            return None
+        return path.format(slug=themes[0]["slug"])
+
+    def measure_floor(self):
+        latencies = [self.client.get("health").extensions["timing"].total_ms for _ in range(self.repeats)]
+        self.floor_ms = summarize(latencies)["p50"]
+
+    def _replay(self, client: ApiClient, path: str, headers: Optional[Dict[str, str]] = None) -> Dict:
+        latencies, sizes, statuses, hashes, validators = [], [], [], set(), set()
+        response = None
+        for _ in range(self.repeats):
+            response = client.get(path, headers=headers)
+            timing = response.extensions["timing"]
+            latencies.append(timing.total_ms)
+            sizes.append(timing.response_bytes)
+            statuses.append(response.status_code)
+            if response.status_code == 200:
+                hashes.add(body_hash(response))
+            validators.add((response.headers.get("etag"), response.headers.get("last-modified")))
+        return {
+            "latency_ms": summarize(latencies),
+            "bytes_per_request": sum(sizes) / len(sizes),
+            "statuses": statuses,
+            "body_hashes": hashes,
+            "validators": validators,
+            "last": response,
+        }
+
+    def audit(self, path: str) -> Dict:
+        full = self._replay(self.client, path)
+        last = full["last"]
+        if last.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {last.status_code}")
+        headers = last.headers
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        vary = [v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()]
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+
+        conditional = None
+        if etag or last_modified:
+            conditional_headers = {"If-None-Match": etag} if etag else {"If-Modified-Since": last_modified}
+            conditional = self._replay(self.client, path, conditional_headers)
+
+        cache = HttpCache()
+        cached_client = ApiClient(self.base_url, timeout=self.timeout, retry=NO_RETRY, cache=cache)
+        try:
+            cached = self._replay(cached_client, path)
+        finally:
+            cached_client.close()
+
+        stable = len(full["body_hashes"]) == 1
+        shared = ("private" not in directives and "no-store" not in directives
+                  and "set-cookie" not in headers and not any(v in PER_CALLER_VARY for v in vary))
+        issues = []
+        if not etag and not last_modified:
+            issues.append("no validator (ETag or Last-Modified)")
+        if "cache-control" not in headers and "expires" not in headers:
+            issues.append("no Cache-Control")
+        if "no-store" in directives:
+            issues.append("Cache-Control: no-store")
+        if stable and len(full["validators"]) > 1:
+            issues.append("validators change although the body does not")
+        if conditional is not None and 304 not in conditional["statuses"]:
+            issues.append(f"{'If-None-Match' if etag else 'If-Modified-Since'} never answered 304")
+        if not stable:
+            issues.append(f"body changed between identical requests ({len(full['body_hashes'])} versions)")
+
+        full_bytes = full["bytes_per_request"]
+        full_p50 = full["latency_ms"]["p50"]
+        if conditional is not None:
+            revalidation = {
+                "measured": True,
+                "not_modified_rate": conditional["statuses"].count(304) / len(conditional["statuses"]),
+                "bytes_per_request": conditional["bytes_per_request"],
+                "latency_ms": conditional["latency_ms"],
+                "bytes_saved_per_request": max(0.0, full_bytes - conditional["bytes_per_request"]),
+                "latency_saved_ms": full_p50 - conditional["latency_ms"]["p50"],
+            }
+        else:
+            revalidation = {
+                "measured": False,
+                "bytes_saved_per_request": full_bytes if stable else 0.0,
+                "latency_saved_ms": max(0.0, full_p50 - self.floor_ms) if stable else 0.0,
+            }
+
+        return {
+            "path": path,
+            "headers": {name: headers.get(name) for name in
+                        ("cache-control", "etag", "last-modified", "expires", "vary", "age")},
+            "weak_etag": bool(etag and etag.startswith("W/")),
+            "full": {"latency_ms": full["latency_ms"], "bytes_per_request": full_bytes},
+            "revalidation": revalidation,
+            "client_cache": {
+                **cache.stats.as_dict(),
+                "latency_ms": cached["latency_ms"],
+                "latency_saved_ms": full_p50 - cached["latency_ms"]["p50"],
+            },
+            "stable": stable,
+            "shared": shared,
+            "cdn_candidate": stable and shared,
+            "issues": issues,
+            "recommended_cache_control": CDN_CACHE_CONTROL if stable and shared else PRIVATE_CACHE_CONTROL,
+        }
+
+    def run(self, endpoints: Dict[str, str]) -> Dict[str, Dict]:
+        self.measure_floor()
+        results = {}
+        for name, template in endpoints.items():
+            path = self.resolve(template)
+            if path is None:
+                print(f"  ⏭️  {name}: no published theme to resolve the slug")
+                continue
+            try:
+                results[name] = self.audit(path)
+            except (httpx.HTTPError, RuntimeError) as e:
+                print(f"  ❌ {name}: {e}")
+                results[name] = {"path": path, "error": str(e)}
+                continue
+            result = results[name]
+            revalidation = result["revalidation"]
+            print(f"  {'✅' if not result['issues'] else '⚠️ '} {name:<32} "
+                  f"{result['full']['bytes_per_request']:>9,.0f} B  p50 {result['full']['latency_ms']['p50']:>7.1f} ms  "
+                  f"304 saves {revalidation['bytes_saved_per_request']:>9,.0f} B / "
+                  f"{revalidation['latency_saved_ms']:>6.1f} ms{'' if revalidation['measured'] else ' (est.)'}")
+        return results
+
+    def close(self):
+        self.client.close()
+
+
+def print_report(results: Dict[str, Dict], floor_ms: float):
+    print("\n" + "=" * 70)
+    print("🗄️  CACHEABILITY REPORT")
+    print("=" * 70)
+    print(f"(304 estimates use GET /api/health, p50 {floor_ms:.1f} ms, as the cost of an empty response)")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"\n❌ {name}: {result['error']}")
+            continue
+        headers = result["headers"]
+        cache = result["client_cache"]
+        print(f"\n{'🌐' if result['cdn_candidate'] else '🔒'} {name}  ({result['path']})")
+        print(f"   Cache-Control: {headers['cache-control'] or '—'}   ETag: {headers['etag'] or '—'}"
+              f"{' (weak)' if result['weak_etag'] else ''}   Last-Modified: {headers['last-modified'] or '—'}"
+              f"   Vary: {headers['vary'] or '—'}")
+        print(f"   Client cache: {cache['hits']} hits, {cache['revalidated']} revalidated, "
+              f"{cache['bytes_saved']:,} B and {cache['latency_saved_ms']:.1f} ms p50 saved")
+        for issue in result["issues"]:
+            print(f"   ⚠️  {issue}")
+        if result["cdn_candidate"]:
+            print(f"   🌐 CDN candidate: same body for every caller; send "
+                  f"'Cache-Control: {result['recommended_cache_control']}' plus an ETag")
+        else:
+            reason = "changes between requests" if not result["stable"] else "varies per caller"
+            print(f"   🔒 Not CDN-cacheable ({reason}); '{result['recommended_cache_control']}' plus an ETag "
+                  f"still saves the body on repeat views")
+
+    audited = [r for r in results.values() if "error" not in r]
+    candidates = [r for r in audited if r["cdn_candidate"]]
+    print(f"\n📊 {len(candidates)}/{len(audited)} endpoints could be served from a CDN")
+
+
+def report_json(results: Dict[str, Dict], floor_ms: float) -> Dict:
+    return {"floor_ms": floor_ms, "endpoints": results}
+
+
+def run_cache_audit(base_url: str = DEFAULT_API_BASE, repeats: int = 10, report_path: Optional[str] = None,
+                    timeout: float = 30) -> Dict[str, Dict]:
+    """Audit PUBLIC_ENDPOINTS, print the cacheability report and optionally write it as JSON"""
+    print("🗄️  HTTP CACHING AUDIT")
+    print("=" * 70)
+    auditor = CacheAuditor(base_url, repeats, timeout)
+    try:
+        results = auditor.run(PUBLIC_ENDPOINTS)
+    finally:
+        auditor.close()
+    print_report(results, auditor.floor_ms)
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report_json(results, auditor.floor_ms), f, indent=2)
+        print(f"📝 Report written to {report_path}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="HTTP caching audit for the public read endpoints")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--repeats", type=int, default=10, help="Requests per endpoint and pass")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run_cache_audit(args.base_url, args.repeats, args.output, args.timeout)
+    return 1 if any("error" in r for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Record/replay cassettes and an offline stand-in API server.
+`record` runs a pass-through proxy (shaping_proxy with no rules) in front of
+the real API and writes every exchange, with its time-to-first-byte and total
+time, into a cassette: a single SQLite file holding the interactions indexed
+by request key plus zlib-compressed response bodies stored once per distinct
+content. Request headers are not stored, so the admin password never lands
+on disk.
+
+`replay` serves a cassette from a local asyncio server, optionally with the
+recorded latency (scaled by --latency-scale). A request is looked up by
+method, path, query and normalised body first, then without the body
+(multipart boundaries and generated names differ between runs) and, with
+--match template, by endpoint template. Repeats of one key are answered in
+recorded order, the last answer repeating once they run out. Anything not
+on the cassette gets a 404 and is listed when the server stops.
+
+The scripts pick the origin up from IGK_BASE_URL, so any of them can be
+recorded once and then run offline:
+
+Usage:
+    python cassette.py record --upstream https://igk-event-preview.preview.emergentagent.com --cassette harness.cassette
+    IGK_BASE_URL=http://127.0.0.1:8900 python backend_test.py
+    python cassette.py replay --cassette harness.cassette [--latency] [--latency-scale 0.5]
+    python cassette.py info --cassette harness.cassette
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+from api_client import DEFAULT_BASE_URL
+from perf_report import endpoint_template
+from shaping_proxy import DEFAULT_PORT, HOP_BY_HOP, ShapingProfile, ShapingProxy, read_request_head
+
+MATCH_LEVELS = ("exact", "loose", "template")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS bodies (sha TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    exact_key TEXT NOT NULL,
+    loose_key TEXT NOT NULL,
+    template TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body_sha TEXT NOT NULL,
+    ttfb_ms REAL NOT NULL,
+    total_ms REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interactions_exact ON interactions (exact_key, id);
+CREATE INDEX IF NOT EXISTS interactions_loose ON interactions (loose_key, id);
+CREATE INDEX IF NOT EXISTS interactions_template ON interactions (template, id);
+"""
+
+
+def request_keys(method: str, target: str, body: bytes) -> Dict[str, str]:
+    """Lookup keys of a request, most specific first: exact (with body), loose (without), template"""
+    parts = urlsplit(target)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    normalised = parts.path + (f"?{query}" if query else "")
+    loose = f"{method} {normalised}"
+    try:
+        # JSON bodies are compared by content, not by key order or whitespace
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else "-"
+    return {"exact": f"{loose} #{digest}", "loose": loose, "template": endpoint_template(method, normalised)}
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.pending = 0
+        self._orders: Dict[Tuple[str, str], List[int]] = {}
+        self._cursors: Dict[Tuple[str, str], int] = {}
+
+    def set_meta(self, **values):
+        self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in values.items()])
+        self.db.commit()
+
+    def meta(self) -> Dict[str, str]:
+        return dict(self.db.execute("SELECT key, value FROM meta"))
+
+    def record(self, method: str, target: str, request_headers, request_body: bytes, response: httpx.Response,
+               response_body: bytes, ttfb_ms: float, total_ms: float):
+        """ShapingProxy recorder hook: store one exchange (the body is kept as received, still encoded)"""
+        keys = request_keys(method, target, request_body)
+        sha = hashlib.sha256(response_body).hexdigest()
+        self.db.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?)", (sha, zlib.compress(response_body, 6)))
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in response.headers.raw
+                   if name.decode("latin-1").lower() not in HOP_BY_HOP | {"content-length"}]
+        self.db.execute(
+            "INSERT INTO interactions (exact_key, loose_key, template, status, reason, headers, body_sha, "
+            "ttfb_ms, total_ms, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (keys["exact"], keys["loose"], keys["template"], response.status_code, response.reason_phrase,
+             json.dumps(headers), sha, ttfb_ms, total_ms, time.time()))
+        self.pending += 1
+        if self.pending >= 50:
+            self.db.commit()
+            self.pending = 0
+
+    def lookup(self, method: str, target: str, body: bytes, match: str = "loose") -> Tuple[Optional[sqlite3.Row], str]:
+        """Next recorded answer for a request and the level it matched at ('miss' if none)"""
+        keys = request_keys(method, target, body)
+        for level in MATCH_LEVELS[:MATCH_LEVELS.index(match) + 1]:
+            slot = (level, keys[level])
+            ids = self._orders.get(slot)
+            if ids is None:
+                ids = self._orders[slot] = [row[0] for row in self.db.execute(
+                    f"SELECT id FROM interactions WHERE {level if level == 'template' else level + '_key'} = ? "
+                    f"ORDER BY id", (keys[level],))]
+            if not ids:
+                continue
+            cursor = self._cursors.get(slot, 0)
+            self._cursors[slot] = min(cursor + 1, len(ids) - 1)
+            row = self.db.execute("SELECT status, reason, headers, body_sha, ttfb_ms, total_ms FROM interactions "
+                                  "WHERE id = ?", (ids[cursor],)).fetchone()
+            return row, level
+        return None, "miss"
+
+    def body(self, sha: str) -> bytes:
+        return zlib.decompress(self.db.execute("SELECT data FROM bodies WHERE sha = ?", (sha,)).fetchone()[0])
+
+    def summary(self) -> List[Tuple]:
+        return list(self.db.execute(
+            "SELECT template, COUNT(*), COUNT(DISTINCT body_sha), AVG(ttfb_ms), AVG(total_ms) "
+            "FROM interactions GROUP BY template ORDER BY COUNT(*) DESC"))
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+async def read_full_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    return await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+class StandInServer:
+    """Answers requests from a cassette; no network access needed"""
+
+    def __init__(self, cassette: Cassette, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 match: str = "loose", latency_scale: float = 0.0):
+        self.cassette = cassette
+        self.host = host
+        self.port = port
+        self.match = match
+        self.latency_scale = latency_scale
+        self.served = {level: 0 for level in MATCH_LEVELS}
+        self.misses: Dict[str, int] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                method, target, version, headers = await read_request_head(reader)
+                lower = {name.lower(): value for name, value in headers}
+                body = await read_full_body(reader, lower)
+                await self._answer(writer, method, target, body)
+                if lower.get("connection", "").lower() == "close" or version != "HTTP/1.1":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if not writer.is_closing():
+                writer.close()
+
+    async def _answer(self, writer: asyncio.StreamWriter, method: str, target: str, body: bytes):
+        row, level = self.cassette.lookup(method, target, body, self.match)
+        if row is None:
+            key = request_keys(method, target, body)["loose"]
+            self.misses[key] = self.misses.get(key, 0) + 1
+            status, reason, headers = 404, "Not Found", [("Content-Type", "application/json")]
+            content = json.dumps({"error": f"No recorded response for {key}"}).encode()
+        else:
+            self.served[level] += 1
+            status, reason, headers_json, sha, ttfb_ms, total_ms = row
+            headers = json.loads(headers_json)
+            content = self.cassette.body(sha)
+            if self.latency_scale:
+                await asyncio.sleep(ttfb_ms * self.latency_scale / 1000)
+        no_body = method == "HEAD" or status in (204, 304)
+        headers = headers + [("X-Cassette", level)]
+        if not no_body:
+            headers.append(("Content-Length", str(len(content))))
+        writer.write((f"HTTP/1.1 {status} {reason}\r\n" + "".join(f"{n}: {v}\r\n" for n, v in headers)
+                      + "\r\n").encode("latin-1"))
+        if row is not None and self.latency_scale:
+            await writer.drain()
+            await asyncio.sleep(max(0.0, total_ms - ttfb_ms) * self.latency_scale / 1000)
+        if not no_body:
+            writer.write(content)
+        await writer.drain()
+
+
+async def record(args):
+    cassette = Cassette(args.cassette)
+    cassette.set_meta(upstream=args.upstream, recorded_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    proxy = ShapingProxy(args.upstream, ShapingProfile("passthrough"), args.host, args.port, recorder=cassette)
+    await proxy.start()
+    print(f"⏺️  Recording {args.upstream} into {args.cassette} via {proxy.base_url} (Ctrl-C to stop)")
+    print(f"   IGK_BASE_URL={proxy.base_url} python backend_test.py")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await proxy.stop()
+        count = cassette.db.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+        cassette.close()
+        print(f"\n📼 {count} interactions in {args.cassette}")
+
+
+async def replay(args):
+    cassette = Cassette(args.cassette)
+    server = StandInServer(cassette, args.host, args.port, args.match,
+                           args.latency_scale if args.latency else 0.0)
+    await server.start()
+    print(f"▶️  Serving {args.cassette} (recorded from {cassette.meta().get('upstream', '?')}) on "
+          f"http://{args.host}:{server.port}" + (f" with {args.latency_scale:g}× recorded latency" if args.latency else ""))
+    print(f"   IGK_BASE_URL=http://{args.host}:{server.port} python backend_test.py")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        cassette.close()
+        print(f"\n📼 Served {sum(server.served.values())} from the cassette "
+              f"({', '.join(f'{n} {level}' for level, n in server.served.items())}), "
+              f"{sum(server.misses.values())} misses")
+        for key, n in sorted(server.misses.items(), key=lambda item: -item[1]):
+            print(f"   ❓ {n:>4}× {key}")
+
+
+def info(args):
+    cassette = Cassette(args.cassette)
+    meta = cassette.meta()
+    print(f"📼 {args.cassette}: recorded from {meta.get('upstream', '?')} at {meta.get('recorded_at', '?')}")
+    print(f"{'Endpoint':<52}{'Calls':>7}{'Bodies':>8}{'ttfb ms':>10}{'total ms':>10}")
+    for template, calls, bodies, ttfb, total in cassette.summary():
+        print(f"{template:<52}{calls:>7}{bodies:>8}{ttfb:>10.1f}{total:>10.1f}")
+    cassette.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay cassettes and an offline stand-in API server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record_parser = sub.add_parser("record", help="Proxy to the real API and record every exchange")
+    record_parser.add_argument("--upstream", default=DEFAULT_BASE_URL, help="Origin to record, without /api")
+    replay_parser = sub.add_parser("replay", help="Serve recorded responses from a local stand-in server")
+    replay_parser.add_argument("--match", choices=MATCH_LEVELS, default="loose",
+                               help="Loosest key a request may match at (default: ignore bodies, keep paths)")
+    replay_parser.add_argument("--latency", action="store_true", help="Delay answers by the recorded latency")
+    replay_parser.add_argument("--latency-scale", type=float, default=1.0)
+    for p in (record_parser, replay_parser):
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    info_parser = sub.add_parser("info", help="Per-endpoint summary of a cassette")
+    for p in (record_parser, replay_parser, info_parser):
+        p.add_argument("--cassette", required=True, help="Cassette file (SQLite)")
+    args = parser.parse_args()
+
+    if args.command != "record" and not os.path.exists(args.cassette):
+        parser.error(f"no cassette at {args.cassette}")
+    if args.command == "info":
+        info(args)
+        return 0
+    try:
+        asyncio.run(record(args) if args.command == "record" else replay(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Event-day door check-in simulator.
+Seeds an event with N tickets, then models attendees arriving at the doors and
+M scanners working a shared queue: each scan validates with
+GET /api/admin/check-in and admits with POST /api/admin/check-in/confirm.
+Duplicate scans (the same ticket at two doors) and fraudulent codes (made-up
+or shared screenshots of used tickets) are mixed in.
+
+Reports check/confirm latency percentiles, scan throughput, queue waits, and
+every ticket that was admitted more than once under concurrent confirms.
+
+Human-scale times (arrivals, scan handling) can be compressed with
+--time-scale; HTTP latencies are always real.
+
+The check-in routes only accept the server's ADMIN_PASSWORD (no admin123
+fallback), so pass it with --admin-password or $ADMIN_PASSWORD; a 401 aborts
+the run rather than counting as rejected scans. The seeded event is deleted
+afterwards; its orders and tickets stay, as the API cannot delete them.
+
+Usage:
+    ADMIN_PASSWORD=... python checkin_simulator.py --tickets 500 --scanners 4 --arrival-rate 3 --time-scale 20
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+
+from api_client import ADMIN_HEADERS, ADMIN_PASSWORD, AsyncApiClient, DEFAULT_API_BASE, NO_RETRY
+from perf_report import summarize
+
+TICKETS_PER_ORDER = 4
+TARGET_UTILIZATION = 0.8
+
+
+class CheckInSimulator:
+    def __init__(self, client: AsyncApiClient, scanners: int, arrival_rate: float, scan_time_s: float,
+                 duplicate_rate: float, fraud_rate: float, time_scale: float):
+        self.client = client
+        self.scanners = scanners
+        self.arrival_rate = arrival_rate
+        self.scan_time_s = scan_time_s
+        self.duplicate_rate = duplicate_rate
+        self.fraud_rate = fraud_rate
+        self.time_scale = time_scale
+        self.latencies: Dict[str, List[float]] = {"check": [], "confirm": []}
+        self.queue_waits_s: List[float] = []
+        self.outcomes: Counter = Counter()
+        self.admissions: Counter = Counter()
+        self.max_queue = 0
+        self.scans = 0
+        self.event_id: Optional[str] = None
+
+    async def check_admin(self):
+        """Fail fast when the check-in routes reject our admin password"""
+        response = await self.client.get("admin/check-in", params={"ticketCode": "CHECKIN-SIM-PREFLIGHT"})
+        if response.status_code == 401:
+            raise RuntimeError("admin/check-in rejected the admin password (401); "
+                               "pass --admin-password or set $ADMIN_PASSWORD")
+
+    async def seed_event(self, tickets: int, concurrency: int = 10) -> List[str]:
+        """Create an event and buy `tickets` tickets for it; returns the ticket codes"""
+        response = await self.client.post("admin/events", json={
+            "title": f"Check-in Simulation {uuid.uuid4().hex[:8]}",
+            "status": "draft",
+            "capacity": tickets,
+            "startDateTime": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        })
+        if response.status_code != 201:
+            raise RuntimeError(f"Creating the event failed with status {response.status_code}: {response.text}")
+        event_id = self.event_id = response.json()["event"]["id"]
+
+        codes: List[str] = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def buy(quantity: int, n: int):
+            async with semaphore:
+                response = await self.client.post("orders", json={
+                    "eventId": event_id,
+                    "email": f"door-sim-{n}@example.com",
+                    "name": f"Attendee {n}",
+                    "ticketType": "General",
+                    "quantity": quantity,
+                    "totalAmount": 0,
+                })
+                response.raise_for_status()
+                codes.extend(t["ticketCode"] for t in response.json()["tickets"])
+
+        quantities = [TICKETS_PER_ORDER] * (tickets // TICKETS_PER_ORDER)
+        if tickets % TICKETS_PER_ORDER:
+            quantities.append(tickets % TICKETS_PER_ORDER)
+        await asyncio.gather(*(buy(q, n) for n, q in enumerate(quantities)))
+        print(f"🎟️  Seeded event {event_id} with {len(codes)} tickets")
+        return codes
+
+    async def delete_event(self):
+        if self.event_id is None:
+            return
+        response = await self.client.delete(f"admin/events/{self.event_id}")
+        if response.status_code == 200:
+            print(f"🧹 Deleted event {self.event_id}")
+        else:
+            print(f"⚠️  Deleting event {self.event_id} failed with status {response.status_code}")
+
+    def _sleep(self, seconds: float):
+        return asyncio.sleep(seconds / self.time_scale)
+
+    async def arrivals(self, codes: List[str], queue: asyncio.Queue):
+        """Attendees reach the doors as a Poisson process; some rescan or bring bad codes"""
+        admitted_codes: List[str] = []
+        for code in random.sample(codes, len(codes)):
+            await self._sleep(random.expovariate(self.arrival_rate))
+            queue.put_nowait(("valid", code, time.perf_counter()))
+            admitted_codes.append(code)
+            if random.random() < self.duplicate_rate:
+                # Same ticket presented at another door right away: the concurrent-confirm race
+                queue.put_nowait(("duplicate", code, time.perf_counter()))
+            if random.random() < self.fraud_rate:
+                if admitted_codes and random.random() < 0.5:
+                    queue.put_nowait(("shared_screenshot", random.choice(admitted_codes), time.perf_counter()))
+                else:
+                    fake = f"TKT-{int(time.time() * 1000)}-{uuid.uuid4().hex[:9].upper()}"
+                    queue.put_nowait(("forged", fake, time.perf_counter()))
+            self.max_queue = max(self.max_queue, queue.qsize())
+
+    async def _timed(self, kind: str, method: str, endpoint: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, endpoint, **kwargs)
+        except httpx.HTTPError:
+            self.outcomes[f"{kind}_transport_error"] += 1
+            return None
+        self.latencies[kind].append((time.perf_counter() - start) * 1000)
+        return response
+
+    @staticmethod
+    def _authorized(response: Optional[httpx.Response]):
+        if response is not None and response.status_code == 401:
+            raise RuntimeError(f"{response.request.url.path} answered 401; the admin password is wrong")
+
+    async def scanner(self, queue: asyncio.Queue):
+        while True:
+            kind, code, enqueued_at = await queue.get()
+            self.queue_waits_s.append((time.perf_counter() - enqueued_at) * self.time_scale)
+            check = await self._timed("check", "GET", "admin/check-in", params={"ticketCode": code})
+            self._authorized(check)
+            if check is not None and check.status_code == 200:
+                confirm = await self._timed("confirm", "POST", "admin/check-in/confirm", json={"ticketCode": code})
+                self._authorized(confirm)
+                if confirm is not None and confirm.status_code == 200:
+                    self.admissions[code] += 1
+                    self.outcomes[f"{kind}_admitted"] += 1
+                else:
+                    self.outcomes[f"{kind}_confirm_rejected"] += 1
+            else:
+                self.outcomes[f"{kind}_rejected"] += 1
+            self.scans += 1
+            # Door staff time: read the QR, look at the screen, wave the attendee through
+            await self._sleep(random.lognormvariate(math.log(self.scan_time_s), 0.4))
+            queue.task_done()
+
+    async def run(self, codes: List[str]) -> Dict:
+        queue: asyncio.Queue = asyncio.Queue()
+        workers = [asyncio.ensure_future(self.scanner(queue)) for _ in range(self.scanners)]
+        start = time.perf_counter()
+
+        async def drain():
+            await self.arrivals(codes, queue)
+            await queue.join()
+
+        # A scanner only finishes by raising (a 401), which must stop the run instead of hanging the queue
+        drained = asyncio.ensure_future(drain())
+        await asyncio.wait([drained, *workers], return_when=asyncio.FIRST_COMPLETED)
+        wall_s = time.perf_counter() - start
+        failed = next((w for w in workers if w.done() and w.exception() is not None), None)
+        for task in (drained, *workers):
+            task.cancel()
+        if failed is not None:
+            raise failed.exception()
+        return self.report(wall_s, len(codes))
+
+    def report(self, wall_s: float, tickets: int) -> Dict:
+        confirm = summarize(self.latencies["confirm"])
+        check = summarize(self.latencies["check"])
+        service_s = self.scan_time_s + (check["mean"] + confirm["mean"]) / 1000
+        doors_needed = math.ceil(self.arrival_rate * service_s / TARGET_UTILIZATION)
+        return {
+            "tickets": tickets,
+            "scanners": self.scanners,
+            "scans": self.scans,
+            "simulated_s": wall_s * self.time_scale,
+            "scans_per_min_simulated": self.scans / (wall_s * self.time_scale) * 60 if wall_s else 0.0,
+            "check_latency_ms": check,
+            "confirm_latency_ms": confirm,
+            "queue_wait_s": summarize(self.queue_waits_s),
+            "max_queue_length": self.max_queue,
+            "outcomes": dict(self.outcomes),
+            "double_check_ins": {code: n for code, n in self.admissions.items() if n > 1},
+            "per_scanner_capacity_per_min": 60 / service_s,
+            "scanners_needed": doors_needed,
+        }
+
+
+def print_report(report: Dict, arrival_rate: float):
+    print("\n" + "=" * 70)
+    print("🚪 CHECK-IN SIMULATION")
+    print("=" * 70)
+    print(f"Tickets: {report['tickets']}  Scanners: {report['scanners']}  Scans: {report['scans']}")
+    print(f"Throughput: {report['scans_per_min_simulated']:.1f} scans/min over {report['simulated_s']:.0f}s simulated")
+    for name in ("check", "confirm"):
+        s = report[f"{name}_latency_ms"]
+        print(f"{name.capitalize():<8} latency: p50={s['p50']:.0f} ms  p95={s['p95']:.0f} ms  "
+              f"p99={s['p99']:.0f} ms  max={s['max']:.0f} ms")
+    w = report["queue_wait_s"]
+    print(f"Queue wait: p50={w['p50']:.1f}s  p95={w['p95']:.1f}s  max={w['max']:.1f}s  "
+          f"(longest queue {report['max_queue_length']})")
+    print(f"Outcomes: {json.dumps(report['outcomes'], sort_keys=True)}")
+
+    doubles = report["double_check_ins"]
+    if doubles:
+        print(f"\n🚨 {len(doubles)} ticket(s) checked in more than once, e.g. {next(iter(doubles))}")
+    else:
+        print("\n✅ No ticket was checked in twice")
+    print(f"📐 One scanner handles ~{report['per_scanner_capacity_per_min']:.1f} scans/min; "
+          f"{arrival_rate * 60:.0f} arrivals/min needs ≥{report['scanners_needed']} scanner(s) "
+          f"to stay under {TARGET_UTILIZATION:.0%} utilisation")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate QR ticket scanning at the doors")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--tickets", type=int, default=200, help="Tickets to seed (ignored with --ticket-codes)")
+    parser.add_argument("--ticket-codes", help="JSON file with a list of existing ticket codes to scan instead")
+    parser.add_argument("--scanners", type=int, default=4, help="Door scanners working the queue")
+    parser.add_argument("--arrival-rate", type=float, default=2.0, help="Attendees arriving per second")
+    parser.add_argument("--scan-time", type=float, default=4.0, help="Median seconds of staff handling per scan")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Fraction of tickets scanned twice at once")
+    parser.add_argument("--fraud-rate", type=float, default=0.02, help="Fraction of arrivals followed by a bad code")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Speed up human-scale times by this factor")
+    parser.add_argument("--admin-password", default=os.environ.get("ADMIN_PASSWORD", ADMIN_PASSWORD),
+                        help="The server's ADMIN_PASSWORD (default: $ADMIN_PASSWORD)")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    async def _run():
+        headers = {**ADMIN_HEADERS, "x-admin-password": args.admin_password}
+        async with AsyncApiClient(args.base_url, timeout=30, headers=headers, retry=NO_RETRY,
+                                  max_connections=max(10, args.scanners * 2)) as client:
+            simulator = CheckInSimulator(client, args.scanners, args.arrival_rate, args.scan_time,
+                                         args.duplicate_rate, args.fraud_rate, args.time_scale)
+            await simulator.check_admin()
+            try:
+                if args.ticket_codes:
+                    with open(args.ticket_codes) as f:
+                        codes = json.load(f)
+                else:
+                    codes = await simulator.seed_event(args.tickets)
+                return await simulator.run(codes)
+            finally:
+                await simulator.delete_event()
+
+    try:
+        report = asyncio.run(_run())
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    print_report(report, args.arrival_rate)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+    if not report["outcomes"].get("valid_admitted"):
+        print("❌ No valid ticket was admitted; the run says nothing about double check-ins")
+        return 1
+    return 1 if report["double_check_ins"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
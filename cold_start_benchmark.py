@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Next.js API process.
+Starts the built server N times against a local mongod and, for every start,
+measures the time until the port accepts connections, the latency of the
+first request to each endpoint (in order, so the first one also pays for
+loading the catch-all route, its imports and the Mongo connection), and how
+long it takes until latency settles at its steady-state level.
+
+Steady state is the median of the last third of the measurement rounds. A
+start has settled at the first round from which the rolling median of
+--window rounds stays within --tolerance of it for the rest of the run.
+
+The server needs a production build (yarn build) and MONGO_URL / DB_NAME,
+which are passed to it from --mongo-url / --db-name. Seed the database with
+db_seeder.py first so the read endpoints return realistic payloads.
+
+Usage:
+    python cold_start_benchmark.py [--starts 10] [--port 3100] [--output cold_start.json]
+    python cold_start_benchmark.py --command "node .next/standalone/server.js" --starts 20
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from api_client import ApiClient, NO_RETRY
+from db_seeder import DEFAULT_DB_NAME, DEFAULT_MONGO_URL
+from perf_report import summarize
+from soak_test import LocalServer, ROOT
+
+DEFAULT_COMMAND = "npx next start --hostname 127.0.0.1 --port {port}"
+DEFAULT_ENDPOINTS = "health,events,gallery/themes"
+POLL_INTERVAL_S = 0.005
+
+
+def wait_listening(host: str, port: int, server: LocalServer, timeout_s: float) -> Optional[float]:
+    """Seconds since now until `port` accepts a TCP connection; None if the server died or timed out"""
+    start = time.perf_counter()
+    deadline = start + timeout_s
+    while time.perf_counter() < deadline:
+        if server.process.poll() is not None:
+            return None
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return time.perf_counter() - start
+        except OSError:
+            time.sleep(POLL_INTERVAL_S)
+    return None
+
+
+def rolling_median(values: List[float], window: int) -> List[float]:
+    return [statistics.median(values[max(0, i - window + 1):i + 1]) for i in range(len(values))]
+
+
+def settle_round(latencies: List[float], window: int, tolerance: float) -> Optional[int]:
+    """First round from which the rolling median stays within `tolerance` of the steady-state median"""
+    steady = statistics.median(latencies[-max(1, len(latencies) // 3):])
+    rolling = rolling_median(latencies, window)
+    settled = None
+    for i, value in enumerate(rolling):
+        if value <= steady * (1 + tolerance):
+            if settled is None:
+                settled = i
+        else:
+            settled = None
+    return settled
+
+
+class ColdStartBenchmark:
+    def __init__(self, command: str, port: int, env: Dict[str, str], endpoints: List[str], rounds: int,
+                 window: int, tolerance: float, startup_timeout_s: float, log_path: str):
+        self.command = command.format(port=port)
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}/api"
+        self.env = env
+        self.endpoints = endpoints
+        self.rounds = rounds
+        self.window = window
+        self.tolerance = tolerance
+        self.startup_timeout_s = startup_timeout_s
+        self.log_path = log_path
+
+    def port_in_use(self) -> bool:
+        with socket.socket() as sock:
+            return sock.connect_ex(("127.0.0.1", self.port)) == 0
+
+    def run_once(self) -> Dict:
+        server = LocalServer(self.command, self.base_url, self.log_path, self.startup_timeout_s, self.env)
+        spawned = time.perf_counter()
+        server.spawn()
+        client = None
+        try:
+            listen_s = wait_listening("127.0.0.1", self.port, server, self.startup_timeout_s)
+            if listen_s is None:
+                raise RuntimeError(f"server did not listen on port {self.port}; see {self.log_path}")
+            client = ApiClient(self.base_url, timeout=60, retry=NO_RETRY)
+
+            first = {}
+            for endpoint in self.endpoints:
+                response = client.get(endpoint)
+                timing = response.extensions["timing"]
+                first[endpoint] = {"status": response.status_code, "total_ms": timing.total_ms,
+                                   "ttfb_ms": timing.ttfb_ms}
+            ready_s = time.perf_counter() - spawned
+
+            series = {endpoint: [] for endpoint in self.endpoints}
+            round_ends = []
+            for _ in range(self.rounds):
+                for endpoint in self.endpoints:
+                    series[endpoint].append(client.get(endpoint).extensions["timing"].total_ms)
+                round_ends.append(time.perf_counter() - spawned)
+        finally:
+            if client is not None:
+                client.close()
+            server.stop()
+
+        steady = {}
+        for endpoint, latencies in series.items():
+            settled = settle_round(latencies, self.window, self.tolerance)
+            steady_ms = statistics.median(latencies[-max(1, len(latencies) // 3):])
+            steady[endpoint] = {
+                "steady_ms": steady_ms,
+                "first_over_steady": first[endpoint]["total_ms"] / steady_ms if steady_ms else 0.0,
+                # Settling in round 0 means the first measured round after the first requests was already steady
+                "settle_s": round_ends[settled] if settled is not None else None,
+                "settle_requests": (settled + 1) if settled is not None else None,
+            }
+        settle_times = [s["settle_s"] for s in steady.values()]
+        return {
+            "listen_ms": listen_s * 1000,
+            "ready_ms": ready_s * 1000,
+            "first_request": first,
+            "steady": steady,
+            "settle_s": max(settle_times) if None not in settle_times else None,
+        }
+
+    def run(self, starts: int) -> List[Dict]:
+        results = []
+        for i in range(starts):
+            result = self.run_once()
+            first = self.endpoints[0]
+            print(f"  ❄️  Start {i + 1}/{starts}: listening {result['listen_ms']:>7.0f} ms, "
+                  f"first {first} {result['first_request'][first]['total_ms']:>7.0f} ms, "
+                  f"ready {result['ready_ms']:>7.0f} ms, settled "
+                  + (f"{result['settle_s']:.1f}s" if result["settle_s"] is not None else "never"))
+            results.append(result)
+        return results
+
+
+def aggregate(results: List[Dict], endpoints: List[str]) -> Dict:
+    settled = [r["settle_s"] * 1000 for r in results if r["settle_s"] is not None]
+    return {
+        "starts": len(results),
+        "listen_ms": summarize([r["listen_ms"] for r in results]),
+        "ready_ms": summarize([r["ready_ms"] for r in results]),
+        "first_request_ms": {e: summarize([r["first_request"][e]["total_ms"] for r in results]) for e in endpoints},
+        "steady_ms": {e: summarize([r["steady"][e]["steady_ms"] for r in results]) for e in endpoints},
+        "first_over_steady": {e: summarize([r["steady"][e]["first_over_steady"] for r in results])
+                              for e in endpoints},
+        "settle_ms": summarize(settled),
+        "never_settled": len(results) - len(settled),
+    }
+
+
+def print_report(summary: Dict, endpoints: List[str]):
+    print("\n" + "=" * 70)
+    print(f"❄️  COLD START — {summary['starts']} starts")
+    print("=" * 70)
+    print(f"{'':<36}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+
+    def row(label: str, s: Dict, unit: str = " ms"):
+        print(f"{label:<36}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}{unit}")
+
+    row("Time to listening", summary["listen_ms"])
+    for endpoint in endpoints:
+        row(f"First GET /api/{endpoint}", summary["first_request_ms"][endpoint])
+    row("Ready (spawn → all first requests)", summary["ready_ms"])
+    row("Time to steady state", summary["settle_ms"])
+    print()
+    for endpoint in endpoints:
+        row(f"Steady GET /api/{endpoint}", summary["steady_ms"][endpoint])
+        row("  first ÷ steady", summary["first_over_steady"][endpoint], " ×")
+    if summary["never_settled"]:
+        print(f"\n⚠️  {summary['never_settled']} start(s) never settled; raise --rounds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start and first-request latency of the Next.js API")
+    parser.add_argument("--command", default=DEFAULT_COMMAND,
+                        help="Server command, run from the repo root; {port} is filled in")
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--starts", type=int, default=10, help="Number of cold starts")
+    parser.add_argument("--endpoints", default=DEFAULT_ENDPOINTS,
+                        help="Comma-separated endpoints, requested in this order after each start")
+    parser.add_argument("--rounds", type=int, default=60, help="Measurement rounds after the first requests")
+    parser.add_argument("--window", type=int, default=5, help="Rolling-median window in rounds")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Settled once the rolling median is within this fraction of steady state")
+    parser.add_argument("--mongo-url", default=DEFAULT_MONGO_URL)
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--server-log", default=os.path.join(ROOT, "test_reports", "cold_start_server.log"))
+    parser.add_argument("--output", help="Write per-start results and the summary as JSON to this path")
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1; steady state is measured from those rounds")
+
+    endpoints = [e.strip().strip("/") for e in args.endpoints.split(",") if e.strip()]
+    if "next start" in args.command and not os.path.exists(os.path.join(ROOT, ".next", "BUILD_ID")):
+        print("❌ No production build in .next; run `yarn build` first")
+        return 1
+    mongo = urlsplit(args.mongo_url)
+    if mongo.hostname not in ("localhost", "127.0.0.1", "::1"):
+        print(f"⚠️  {mongo.hostname} is not a local mongod; network latency will be part of every measurement")
+    os.makedirs(os.path.dirname(args.server_log), exist_ok=True)
+
+    benchmark = ColdStartBenchmark(args.command, args.port, {"MONGO_URL": args.mongo_url, "DB_NAME": args.db_name,
+                                                             "NODE_ENV": "production"},
+                                   endpoints, args.rounds, args.window, args.tolerance, args.startup_timeout,
+                                   args.server_log)
+    if benchmark.port_in_use():
+        print(f"❌ Port {args.port} is already in use; stop that server or pass --port")
+        return 1
+
+    print("❄️  COLD START BENCHMARK")
+    print("=" * 70)
+    print(f"'{benchmark.command}' × {args.starts}, endpoints {', '.join(endpoints)}, db {args.db_name}")
+    try:
+        results = benchmark.run(args.starts)
+    except (RuntimeError, httpx.HTTPError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    summary = aggregate(results, endpoints)
+    print_report(summary, endpoints)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"command": benchmark.command, "endpoints": endpoints, "summary": summary,
+                       "starts": results}, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Bulk synthetic data seeder for a local mongod.
+Generates referentially consistent events, orders, tickets, gallery themes,
+photos, testimonials and newsletter subscribers with the same field shapes
+as lib/models/*.js, and writes them with batched insert_many across a pool
+of worker processes. Orders are spread unevenly over events, so a few events
+carry most of the sales like a real season.
+
+Connects with the app's own MONGO_URL / DB_NAME environment variables.
+
+Usage:
+    python db_seeder.py --orders 100k [--events 60] [--workers 8] [--drop]
+    python db_seeder.py --orders 1M --batch-size 10000
+"""
+
+import argparse
+import base64
+import itertools
+import os
+import random
+import re
+import string
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from pymongo import MongoClient
+
+DEFAULT_MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+DEFAULT_DB_NAME = os.environ.get("DB_NAME", "igk_events_db")
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", "mongo", "mongodb")
+
+COLLECTIONS = ("events", "orders", "tickets", "gallery_themes", "gallery_photos",
+               "testimonials", "newsletter_subscribers")
+
+CITIES = ["Berlin", "Munich", "Frankfurt", "Hamburg", "Cologne", "Stuttgart", "Düsseldorf", "Leipzig"]
+CATEGORIES = ["Festival", "Concert", "Bollywood Night", "Garba", "Comedy", "Workshop", "Other"]
+FESTIVALS = ["Holi", "Diwali", "Navratri", "Garba Night", "Bollywood Bash", "Eid Mela", "Lohri", "Onam"]
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rahul", "Meera",
+               "Lukas", "Anna", "Jonas", "Lea", "Ishaan", "Diya", "Karan", "Pooja", "Nikhil", "Sara"]
+LAST_NAMES = ["Sharma", "Patel", "Iyer", "Reddy", "Singh", "Gupta", "Nair", "Müller", "Schmidt", "Kapoor",
+              "Mehta", "Joshi", "Rao", "Fischer", "Das", "Bose", "Verma", "Weber", "Khan", "Pillai"]
+TICKET_TYPES = [("General", 25.0, 70), ("Early Bird", 18.0, 20), ("VIP", 60.0, 10)]
+ORDER_STATUSES = [("completed", 85), ("pending", 12), ("cancelled", 3)]
+# Ticket.generateQRCode stores a PNG data URL of roughly this many bytes
+QR_CODE_BYTES = 1800
+
+
+def parse_count(value: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000"""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([kKmM]?)\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"not a count: {value!r}")
+    multiplier = {"": 1, "k": 1_000, "m": 1_000_000}[match.group(2).lower()]
+    return int(float(match.group(1)) * multiplier)
+
+
+def is_local(mongo_url: str) -> bool:
+    host = urlsplit(mongo_url).hostname or ""
+    return host in LOCAL_HOSTS
+
+
+def js_code(rng: random.Random, prefix: str, at: datetime) -> str:
+    """Same shape as `${prefix}-${Date.now()}-${Math.random().toString(36).substr(2, 9).toUpperCase()}`"""
+    suffix = "".join(rng.choices(string.ascii_uppercase + string.digits, k=9))
+    return f"{prefix}-{int(at.timestamp() * 1000)}-{suffix}"
+
+
+def slugify(title: str) -> str:
+    return re.sub(r"(^-|-$)", "", re.sub(r"[^a-z0-9]+", "-", title.lower()))
+
+
+def parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def person(rng: random.Random, n: int) -> Tuple[str, str]:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return f"{first} {last}", f"{first.lower()}.{last.lower()}.{n}@example.com".replace("ü", "ue")
+
+
+def weighted(rng: random.Random, choices):
+    return rng.choices([c[0] for c in choices], weights=[c[-1] for c in choices])[0]
+
+
+def uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_events(count: int, rng: random.Random, now: datetime) -> List[Dict]:
+    """Events from two years back to six months ahead, as Event.create stores them"""
+    events = []
+    for n in range(count):
+        festival, city = rng.choice(FESTIVALS), rng.choice(CITIES)
+        start = (now + timedelta(days=rng.randint(-730, 180))).replace(hour=19, minute=0, second=0, microsecond=0)
+        title = f"{festival} {city} {start.year} #{n + 1}"
+        created = min(start - timedelta(days=rng.randint(30, 120)), now - timedelta(days=1))
+        events.append({
+            "id": uid(rng),
+            "title": title,
+            "slug": slugify(title),
+            "heroTagline": f"{festival} comes to {city}",
+            "shortSummary": f"Celebrate {festival} with music, food and dance in {city}.",
+            "description": f"The biggest {festival} celebration in {city}. " * 8,
+            "city": city,
+            "venue": f"{city} Event Hall",
+            "venueAddress": f"Hauptstraße {rng.randint(1, 200)}, {city}",
+            "googleMapsUrl": "",
+            "startDateTime": start.isoformat().replace("+00:00", ".000Z"),
+            "endDateTime": (start + timedelta(hours=5)).isoformat().replace("+00:00", ".000Z"),
+            "date": start.isoformat().replace("+00:00", ".000Z"),
+            "time": "19:00",
+            "endTime": "00:00",
+            "poster": f"/uploads/events/{slugify(title)}.jpg",
+            "coverImagePath": f"/uploads/events/{slugify(title)}.jpg",
+            "coverImageUrl": f"/uploads/events/{slugify(title)}.jpg",
+            "gallery": [],
+            "category": rng.choice(CATEGORIES),
+            "brand": "IGK",
+            "tags": [festival.lower(), city.lower()],
+            "ticketPlatforms": {"desipassUrl": "", "eventbriteUrl": ""},
+            "desipassUrl": "",
+            "eventbriteUrl": "",
+            "ticketTypes": [{"name": name, "price": price} for name, price, _ in TICKET_TYPES],
+            "externalLinks": {},
+            "capacity": rng.choice([300, 500, 1000, 2500, 5000]),
+            "attendeesCount": 0,
+            "rules": ["No outside food or drinks"],
+            "faqs": [{"question": "Is there parking?", "answer": "Limited parking is available."}],
+            "schedule": [],
+            "status": "published" if rng.random() < 0.9 else "draft",
+            "statusOverride": "auto",
+            "featured": rng.random() < 0.1,
+            "createdAt": created,
+            "updatedAt": created,
+        })
+    return events
+
+
+def event_weights(count: int, rng: random.Random) -> List[float]:
+    """Zipf-like popularity: the headline events sell most of the tickets"""
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return [1 / r ** 0.9 for r in ranks]
+
+
+def seed_order_chunk(mongo_url: str, db_name: str, events: List[Dict], weights: List[float],
+                     first: int, count: int, seed: int, batch_size: int, now: datetime) -> Tuple[int, int]:
+    """Worker: insert orders [first, first + count) and their tickets; returns (orders, tickets)"""
+    rng = random.Random(seed * 1_000_003 + first)
+    cum_weights = list(itertools.accumulate(weights))
+    qr_code = "data:image/png;base64," + base64.b64encode(os.urandom(QR_CODE_BYTES * 3 // 4)).decode()
+    client = MongoClient(mongo_url)
+    db = client[db_name]
+    orders, tickets = [], []
+    inserted_orders = inserted_tickets = 0
+
+    def flush():
+        nonlocal orders, tickets, inserted_orders, inserted_tickets
+        if orders:
+            db.orders.insert_many(orders, ordered=False)
+            inserted_orders += len(orders)
+        if tickets:
+            db.tickets.insert_many(tickets, ordered=False)
+            inserted_tickets += len(tickets)
+        orders, tickets = [], []
+
+    for n in range(first, first + count):
+        event = rng.choices(events, cum_weights=cum_weights)[0]
+        start = parse_iso(event["startDateTime"])
+        sale_window = max((min(start, now) - event["createdAt"]).total_seconds(), 3600)
+        created = event["createdAt"] + timedelta(seconds=rng.uniform(0, sale_window))
+        name, email = person(rng, n)
+        ticket_type = weighted(rng, TICKET_TYPES)
+        price = next(p for t, p, _ in TICKET_TYPES if t == ticket_type)
+        quantity = rng.choices([1, 2, 3, 4, 5, 6], weights=[35, 35, 12, 10, 5, 3])[0]
+        status = weighted(rng, ORDER_STATUSES)
+        order = {
+            "id": uid(rng),
+            "orderId": js_code(rng, "ORD", created),
+            "eventId": event["id"],
+            "email": email,
+            "name": name,
+            "ticketType": ticket_type,
+            "quantity": quantity,
+            "totalAmount": price * quantity,
+            "status": status,
+            "createdAt": created,
+            "updatedAt": created + timedelta(minutes=rng.randint(1, 20)) if status != "pending" else created,
+        }
+        orders.append(order)
+        checked_in = status == "completed" and start < now
+        for _ in range(quantity):
+            used = checked_in and rng.random() < 0.9
+            used_at = start + timedelta(minutes=rng.randint(-30, 120)) if used else None
+            tickets.append({
+                "id": uid(rng),
+                "ticketCode": js_code(rng, "TKT", created),
+                "qrCode": qr_code,
+                "orderId": order["id"],
+                "eventId": event["id"],
+                "ticketType": ticket_type,
+                "attendeeName": name,
+                "isUsed": used,
+                "usedAt": used_at,
+                "createdAt": created,
+                "updatedAt": used_at or created,
+            })
+        if len(orders) >= batch_size:
+            flush()
+    flush()
+    client.close()
+    return inserted_orders, inserted_tickets
+
+
+def make_gallery(events: List[Dict], count: int, rng: random.Random, now: datetime) -> Tuple[List[Dict], List[Dict]]:
+    """Themes for past events, each with 20-300 photos and one cover photo"""
+    past = [e for e in events if parse_iso(e["startDateTime"]) < now] or events
+    themes, photos = [], []
+    for n, event in enumerate(rng.sample(past, min(count, len(past)))):
+        created = parse_iso(event["startDateTime"]) + timedelta(days=3)
+        theme = {
+            "id": uid(rng),
+            "name": event["title"],
+            "slug": event["slug"],
+            "coverImageUrl": "",
+            "description": f"Photos from {event['title']}",
+            "order": n,
+            "status": "published" if rng.random() < 0.85 else "draft",
+            "photoCount": 0,
+            "createdAt": created,
+            "updatedAt": created,
+        }
+        theme_photos = [{
+            "id": uid(rng),
+            "themeId": theme["id"],
+            "imageUrl": f"/uploads/gallery/{theme['slug']}/{i:04d}.webp",
+            "caption": "",
+            "order": i,
+            "isCover": i == 0,
+            "createdAt": created,
+            "updatedAt": created,
+        } for i in range(rng.randint(20, 300))]
+        theme["photoCount"] = len(theme_photos)
+        theme["coverImageUrl"] = theme_photos[0]["imageUrl"]
+        themes.append(theme)
+        photos.extend(theme_photos)
+    return themes, photos
+
+
+def make_testimonials(events: List[Dict], count: int, rng: random.Random, now: datetime) -> List[Dict]:
+    testimonials = []
+    for n in range(count):
+        name, email = person(rng, n)
+        created = now - timedelta(minutes=rng.randint(0, 730 * 24 * 60))
+        testimonials.append({
+            "id": uid(rng),
+            "name": name,
+            "email": email,
+            "eventAttended": rng.choice(events)["title"],
+            "rating": rng.choices([5, 4, 3, 2, 1], weights=[60, 25, 9, 4, 2])[0],
+            "testimonial": "Amazing atmosphere, great music and wonderful organisation. " * rng.randint(1, 4),
+            "city": rng.choice(CITIES),
+            "approved": rng.random() < 0.8,
+            "createdAt": created,
+            "updatedAt": created,
+        })
+    return testimonials
+
+
+def make_subscribers(count: int, rng: random.Random, now: datetime) -> List[Dict]:
+    subscribers = []
+    for n in range(count):
+        _, email = person(rng, n)
+        active = rng.random() < 0.95
+        subscriber = {
+            "id": uid(rng),
+            "email": email,
+            "subscribedAt": now - timedelta(minutes=rng.randint(0, 730 * 24 * 60)),
+            "active": active,
+        }
+        if not active:
+            subscriber["unsubscribedAt"] = subscriber["subscribedAt"] + timedelta(days=rng.randint(1, 200))
+        subscribers.append(subscriber)
+    return subscribers
+
+
+class Seeder:
+    def __init__(self, mongo_url: str = DEFAULT_MONGO_URL, db_name: str = DEFAULT_DB_NAME,
+                 workers: Optional[int] = None, batch_size: int = 5000, seed: int = 42):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.workers = workers or os.cpu_count() or 4
+        self.batch_size = batch_size
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.client = MongoClient(mongo_url)
+        self.db = self.client[db_name]
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def insert(self, collection: str, docs: List[Dict]):
+        start = time.perf_counter()
+        for i in range(0, len(docs), self.batch_size):
+            self.db[collection].insert_many(docs[i:i + self.batch_size], ordered=False)
+        self._record(collection, len(docs), time.perf_counter() - start)
+
+    def _record(self, collection: str, count: int, seconds: float):
+        self.timings[collection] = {"documents": count, "seconds": seconds,
+                                    "docs_per_s": count / seconds if seconds else 0.0}
+        print(f"  {collection:<24}{count:>10,} docs in {seconds:>7.1f}s  ({self.timings[collection]['docs_per_s']:>9,.0f}/s)")
+
+    def drop(self):
+        for name in COLLECTIONS:
+            self.db.drop_collection(name)
+        print(f"🗑️  Dropped {', '.join(COLLECTIONS)} in {self.db_name}")
+
+    def seed_events(self, count: int) -> List[Dict]:
+        events = make_events(count, self.rng, self.now)
+        self.insert("events", [dict(e) for e in events])
+        return events
+
+    def seed_orders(self, events: List[Dict], count: int, offset: int = 0) -> Tuple[int, int]:
+        """Spread `count` orders (and their tickets) over `events` across the worker pool. `offset` is the
+        number of orders already seeded with this seed: it continues the sequence instead of regenerating
+        the same IDs and codes"""
+        weights = event_weights(len(events), self.rng)
+        chunk = max(self.batch_size, -(-count // (self.workers * 4)))
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(seed_order_chunk, self.mongo_url, self.db_name, events, weights,
+                                   first, min(chunk, offset + count - first), self.seed, self.batch_size,
+                                   self.now)
+                       for first in range(offset, offset + count, chunk)]
+            totals = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+        orders, tickets = sum(t[0] for t in totals), sum(t[1] for t in totals)
+        self._record("orders", orders, elapsed)
+        self._record("tickets", tickets, elapsed)
+        return orders, tickets
+
+    def seed_gallery(self, events: List[Dict], count: int):
+        themes, photos = make_gallery(events, count, self.rng, self.now)
+        self.insert("gallery_themes", themes)
+        self.insert("gallery_photos", photos)
+
+    def seed_testimonials(self, events: List[Dict], count: int):
+        self.insert("testimonials", make_testimonials(events, count, self.rng, self.now))
+
+    def seed_subscribers(self, count: int):
+        self.insert("newsletter_subscribers", make_subscribers(count, self.rng, self.now))
+
+    def close(self):
+        self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a local mongod with synthetic IGK data")
+    parser.add_argument("--mongo-url", default=DEFAULT_MONGO_URL, help="Defaults to $MONGO_URL")
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Defaults to $DB_NAME or igk_events_db")
+    parser.add_argument("--orders", type=parse_count, default=parse_count("10k"), help="e.g. 10k, 250k, 1M")
+    parser.add_argument("--events", type=parse_count, help="Default: one event per 2,000 orders (min 20)")
+    parser.add_argument("--themes", type=parse_count, help="Gallery themes (default: a third of the events)")
+    parser.add_argument("--testimonials", type=parse_count, help="Default: 2%% of the order count")
+    parser.add_argument("--subscribers", type=parse_count, help="Default: 30%% of the order count")
+    parser.add_argument("--workers", type=int, help="Order/ticket insert processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Documents per insert_many")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible datasets")
+    parser.add_argument("--drop", action="store_true", help="Drop the seeded collections first")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local MongoDB host")
+    args = parser.parse_args()
+
+    if not is_local(args.mongo_url) and not args.allow_remote:
+        parser.error(f"refusing to seed non-local host {urlsplit(args.mongo_url).hostname!r}; "
+                     "pass --allow-remote if you really mean it")
+
+    events = args.events or max(20, args.orders // 2000)
+    themes = args.themes if args.themes is not None else max(1, events // 3)
+    testimonials = args.testimonials if args.testimonials is not None else max(10, args.orders // 50)
+    subscribers = args.subscribers if args.subscribers is not None else int(args.orders * 0.3)
+
+    seeder = Seeder(args.mongo_url, args.db_name, args.workers, args.batch_size, args.seed)
+    print("🌱 DATABASE SEEDER")
+    print("=" * 70)
+    print(f"Target: {args.db_name} @ {urlsplit(args.mongo_url).hostname}  "
+          f"({args.orders:,} orders over {events:,} events, {seeder.workers} workers)")
+    start = time.perf_counter()
+    try:
+        if args.drop:
+            seeder.drop()
+        seeded_events = seeder.seed_events(events)
+        seeder.seed_orders(seeded_events, args.orders)
+        seeder.seed_gallery(seeded_events, themes)
+        seeder.seed_testimonials(seeded_events, testimonials)
+        seeder.seed_subscribers(subscribers)
+    finally:
+        seeder.close()
+
+    total = sum(t["documents"] for t in seeder.timings.values())
+    print(f"\n✅ Seeded {total:,} documents in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Named dataset snapshots for a local mongod, restored in milliseconds.
+A dataset (the db_seeder parameters below plus a fixed set of fixture
+documents the pytest suite relies on: a published theme with three photos, a
+draft theme and an event without orders) is bulk-loaded once into its own
+snapshot database, igk_snapshot_<name>. Restoring copies it server-side with
+an aggregation $out into the target database, and only for collections whose
+dbHash no longer matches the snapshot; collections the snapshot does not have
+(contacts, partners, ... created by the API) are dropped. The result is the
+same database before every test or shard, without create/delete round-trips
+through the API.
+
+Snapshots are rebuilt when their dataset definition changes. Any existing
+database can also be captured as a snapshot with `capture`.
+
+Requires pymongo and MongoDB 4.4+ ($out into another database).
+
+Usage:
+    python db_snapshots.py build pytest
+    python db_snapshots.py restore pytest --db-name igk_events_db
+    python db_snapshots.py capture my-bug-repro --from-db igk_events_db
+    python -m pytest --db-dataset pytest [--db-restore test|session]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import MongoClient
+
+from db_seeder import DEFAULT_DB_NAME, DEFAULT_MONGO_URL, Seeder, is_local, make_events, uid
+
+SNAPSHOT_PREFIX = "igk_snapshot_"
+META_COLLECTION = "_snapshot"
+DATASETS = {
+    "pytest": {"events": 5, "orders": 0, "themes": 2, "testimonials": 5, "subscribers": 10},
+    "smoke": {"events": 20, "orders": 2_000, "themes": 6, "testimonials": 40, "subscribers": 600},
+    "season": {"events": 60, "orders": 100_000, "themes": 20, "testimonials": 2_000, "subscribers": 30_000},
+}
+FIXTURE_PHOTOS = 3
+
+
+def fingerprint(definition: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def fixture_documents(rng: random.Random, now: datetime) -> Dict[str, List[Dict]]:
+    """The documents the suite's theme/photos/event fixtures hand out, shaped as the models store them"""
+    created = now - timedelta(days=1)
+    themes = [{
+        "id": uid(rng), "name": f"Fixture {status.title()} Theme", "slug": f"fixture-{status}-theme",
+        "coverImageUrl": "", "description": "Snapshot fixture", "order": 0, "status": status,
+        "photoCount": 0, "createdAt": created, "updatedAt": created,
+    } for status in ("published", "draft")]
+    photos = [{
+        "id": uid(rng), "themeId": themes[0]["id"], "imageUrl": f"https://example.com/fixture/{i}.jpg",
+        "caption": f"Photo {i}", "order": i, "isCover": False, "createdAt": created, "updatedAt": created,
+    } for i in range(FIXTURE_PHOTOS)]
+    themes[0]["photoCount"] = len(photos)
+    event = make_events(1, rng, now)[0]
+    event.update(title="Fixture Event", slug="fixture-event", status="draft", city="Berlin", capacity=50,
+                 featured=False, createdAt=created, updatedAt=created)
+    return {"gallery_themes": themes, "gallery_photos": photos, "events": [event]}
+
+
+def strip_ids(docs: List[Dict]) -> List[Dict]:
+    return [{k: v for k, v in doc.items() if k != "_id"} for doc in docs]
+
+
+class SnapshotStore:
+    def __init__(self, mongo_url: str = DEFAULT_MONGO_URL):
+        self.mongo_url = mongo_url
+        self.client = MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
+
+    @staticmethod
+    def snapshot_db(dataset: str) -> str:
+        return SNAPSHOT_PREFIX + dataset.replace("-", "_")
+
+    def meta(self, dataset: str) -> Optional[Dict]:
+        return self.client[self.snapshot_db(dataset)][META_COLLECTION].find_one({"_id": "meta"})
+
+    def collections(self, db_name: str) -> List[str]:
+        return sorted(name for name in self.client[db_name].list_collection_names()
+                      if name != META_COLLECTION and not name.startswith("system."))
+
+    def hashes(self, db_name: str, collections: List[str]) -> Dict[str, str]:
+        if not collections:
+            return {}
+        return self.client[db_name].command("dbHash", collections=collections)["collections"]
+
+    def _finish(self, dataset: str, definition: Dict[str, Any], fixtures: Dict[str, Any], seconds: float) -> Dict:
+        name = self.snapshot_db(dataset)
+        collections = self.collections(name)
+        meta = {
+            "_id": "meta",
+            "dataset": dataset,
+            "fingerprint": fingerprint(definition),
+            "definition": definition,
+            "fixtures": fixtures,
+            "hashes": self.hashes(name, collections),
+            "counts": {c: self.client[name][c].estimated_document_count() for c in collections},
+            "built_at": datetime.now(timezone.utc),
+            "build_s": seconds,
+        }
+        self.client[name][META_COLLECTION].replace_one({"_id": "meta"}, meta, upsert=True)
+        return meta
+
+    def build(self, dataset: str, seed: int = 42) -> Dict:
+        """Seed a fresh snapshot database for one of DATASETS"""
+        definition = {**DATASETS[dataset], "seed": seed}
+        name = self.snapshot_db(dataset)
+        start = time.perf_counter()
+        self.client.drop_database(name)
+        seeder = Seeder(self.mongo_url, name, workers=2, seed=seed)
+        try:
+            events = seeder.seed_events(definition["events"])
+            if definition["orders"]:
+                seeder.seed_orders(events, definition["orders"])
+            seeder.seed_gallery(events, definition["themes"])
+            seeder.seed_testimonials(events, definition["testimonials"])
+            seeder.seed_subscribers(definition["subscribers"])
+            fixtures = fixture_documents(seeder.rng, seeder.now)
+            for collection, docs in fixtures.items():
+                seeder.db[collection].insert_many([dict(d) for d in docs])
+        finally:
+            seeder.close()
+        return self._finish(dataset, definition, {c: strip_ids(d) for c, d in fixtures.items()},
+                            time.perf_counter() - start)
+
+    def ensure(self, dataset: str, rebuild: bool = False) -> Dict:
+        """The snapshot's metadata, building it first if it is missing or its definition changed"""
+        meta = self.meta(dataset)
+        if dataset in DATASETS:
+            current = fingerprint({**DATASETS[dataset], "seed": (meta or {}).get("definition", {}).get("seed", 42)})
+            if rebuild or meta is None or meta["fingerprint"] != current:
+                print(f"📸 Building snapshot '{dataset}'...")
+                meta = self.build(dataset)
+                print(f"📸 Snapshot '{dataset}' built in {meta['build_s']:.1f}s: "
+                      + ", ".join(f"{c} {n:,}" for c, n in meta["counts"].items()))
+        elif meta is None:
+            raise KeyError(f"no snapshot named {dataset!r}; known datasets: {', '.join(DATASETS)}")
+        return meta
+
+    def capture(self, dataset: str, source_db: str) -> Dict:
+        """Snapshot an existing database (indexes included) under `dataset`"""
+        name = self.snapshot_db(dataset)
+        start = time.perf_counter()
+        self.client.drop_database(name)
+        self._copy(source_db, name, self.collections(source_db))
+        return self._finish(dataset, {"captured_from": source_db}, {}, time.perf_counter() - start)
+
+    def _copy(self, source_db: str, target_db: str, collections: List[str]):
+        source, target = self.client[source_db], self.client[target_db]
+        existing = set(target.list_collection_names())
+        for collection in collections:
+            # Server-side copy; $out replaces the target collection atomically and keeps its indexes
+            source[collection].aggregate([{"$match": {}}, {"$out": {"db": target_db, "coll": collection}}])
+            if collection not in existing:
+                for index_name, info in source[collection].index_information().items():
+                    if index_name != "_id_":
+                        options = {k: v for k, v in info.items() if k not in ("key", "v", "ns")}
+                        target[collection].create_index(info["key"], name=index_name, **options)
+
+    def restore(self, dataset: str, target_db: str, meta: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make `target_db` equal to the snapshot again, touching only what changed"""
+        meta = meta or self.ensure(dataset)
+        start = time.perf_counter()
+        snapshot = list(meta["hashes"])
+        present = self.collections(target_db)
+        current = self.hashes(target_db, [c for c in snapshot if c in present])
+        changed = [c for c in snapshot if current.get(c) != meta["hashes"][c]]
+        extra = [c for c in present if c not in meta["hashes"]]
+        self._copy(self.snapshot_db(dataset), target_db, changed)
+        for collection in extra:
+            self.client[target_db].drop_collection(collection)
+        return {"restored": changed, "dropped": extra, "ms": (time.perf_counter() - start) * 1000}
+
+    def drop(self, dataset: str):
+        self.client.drop_database(self.snapshot_db(dataset))
+
+    def close(self):
+        self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build, capture and restore database snapshots")
+    parser.add_argument("--mongo-url", default=DEFAULT_MONGO_URL, help="Defaults to $MONGO_URL")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local MongoDB host")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="(Re)build a named dataset's snapshot")
+    build.add_argument("dataset", choices=sorted(DATASETS))
+    build.add_argument("--seed", type=int, default=42)
+    capture = sub.add_parser("capture", help="Snapshot an existing database under a name")
+    capture.add_argument("dataset")
+    capture.add_argument("--from-db", default=DEFAULT_DB_NAME)
+    restore = sub.add_parser("restore", help="Restore a snapshot into a database")
+    restore.add_argument("dataset")
+    restore.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Defaults to $DB_NAME or igk_events_db")
+    sub.add_parser("list", help="List the snapshots on this server")
+    args = parser.parse_args()
+
+    if not is_local(args.mongo_url) and not args.allow_remote:
+        parser.error("refusing to touch a non-local MongoDB host; pass --allow-remote if you really mean it")
+    store = SnapshotStore(args.mongo_url)
+    try:
+        if args.command == "build":
+            meta = store.build(args.dataset, args.seed)
+            print(f"📸 Built '{args.dataset}' in {meta['build_s']:.1f}s: "
+                  + ", ".join(f"{c} {n:,}" for c, n in meta["counts"].items()))
+        elif args.command == "capture":
+            meta = store.capture(args.dataset, args.from_db)
+            print(f"📸 Captured {args.from_db} as '{args.dataset}' in {meta['build_s']:.1f}s")
+        elif args.command == "restore":
+            result = store.restore(args.dataset, args.db_name)
+            print(f"♻️  Restored {args.db_name} from '{args.dataset}' in {result['ms']:.1f} ms "
+                  f"({len(result['restored'])} collection(s) copied, {len(result['dropped'])} dropped)")
+        else:
+            for name in store.client.list_database_names():
+                if name.startswith(SNAPSHOT_PREFIX):
+                    meta = store.client[name][META_COLLECTION].find_one({"_id": "meta"}) or {}
+                    print(f"📸 {meta.get('dataset', name):<20} {sum(meta.get('counts', {}).values()):>10,} docs  "
+                          f"built {meta.get('built_at', '?')}")
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,13 @@ Additional test to check the exact endpoint formats mentioned in the requirement
 vs what's actually implemented.
 """
 
-import requests
 import json
+import sys
 
-def test_exact_endpoints():
+from api_client import ApiClient, DEFAULT_API_BASE
+
+def test_exact_endpoints(base_url: str = DEFAULT_API_BASE):
     """Test the exact endpoint formats mentioned in requirements"""
-    base_url = "https://igk-event-preview.preview.emergentagent.com/api"
     headers = {
         "Content-Type": "application/json",
         "x-admin-password": "admin123"
@@ -26,11 +27,12 @@ def test_exact_endpoints():
         ("GET", "admin/gallery/photos?themeId=test", "Admin photos with slash"),
     ]
     
+    client = ApiClient(base_url, timeout=10, headers=headers)
+    
     for method, endpoint, description in endpoints_to_test:
-        url = f"{base_url}/{endpoint}"
         try:
             if method == "GET":
-                response = requests.get(url, headers=headers, timeout=10)
+                response = client.get(endpoint)
             
             print(f"{description}: {response.status_code}")
             if response.status_code == 404:
@@ -61,6 +63,9 @@ def test_exact_endpoints():
     print("  - GET /api/admin/gallery/themes/[id]/photos") 
     print("  - POST /api/admin/gallery/themes/[id]/photos (bulk)")
     print("  - DELETE /api/admin/gallery/photos/[id]")
+    
+    print(f"\n{client.stats.summary()}")
+    client.close()
 
 if __name__ == "__main__":
-    test_exact_endpoints()
\ No newline at end of file
+    test_exact_endpoints(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_API_BASE)
\ No newline at end of file
@@ -3,12 +3,13 @@
 Final verification test to ensure all gallery APIs are working correctly
 """
 
-import requests
 import json
+import sys
 
-def final_verification():
+from api_client import ApiClient, DEFAULT_API_BASE
+
+def final_verification(base_url: str = DEFAULT_API_BASE):
     """Quick final verification of all major endpoints"""
-    base_url = "https://igk-event-preview.preview.emergentagent.com/api"
     headers = {
         "Content-Type": "application/json",
         "x-admin-password": "admin123"
@@ -30,14 +31,14 @@ def final_verification():
     ]
     
     created_theme_id = None
+    client = ApiClient(base_url, timeout=10, headers=headers)
     
     for method, endpoint, data, description in tests:
-        url = f"{base_url}/{endpoint}"
         try:
             if method == "GET":
-                response = requests.get(url, headers=headers, timeout=10)
+                response = client.get(endpoint)
             elif method == "POST":
-                response = requests.post(url, json=data, headers=headers, timeout=10)
+                response = client.post(endpoint, json=data)
             
             if response.status_code in [200, 201]:
                 print(f"✅ {description}: {response.status_code}")
@@ -53,11 +54,13 @@ def final_verification():
     # Clean up created theme
     if created_theme_id:
         try:
-            cleanup_url = f"{base_url}/admin/gallery/themes/{created_theme_id}"
-            response = requests.delete(cleanup_url, headers=headers, timeout=10)
+            response = client.delete(f"admin/gallery/themes/{created_theme_id}")
             print(f"🧹 Cleanup: {response.status_code}")
         except:
             print("🧹 Cleanup: Failed (non-critical)")
+    
+    print(client.stats.summary())
+    client.close()
 
 if __name__ == "__main__":
-    final_verification()
\ No newline at end of file
+    final_verification(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_API_BASE)
\ No newline at end of file
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Bulk import of full-resolution event photos into a gallery theme.
+1. Resizes every photo into a display WebP variant across a ProcessPoolExecutor
+   (JPEG sources are decoded at reduced scale via draft mode).
+2. Uploads the variants concurrently through POST /api/upload.
+3. Registers the display images in one POST /api/admin/gallery/themes/[id]/photos batch.
+
+Progress is kept in a manifest next to the variants, so an interrupted import
+resumes where it stopped instead of re-encoding or re-uploading.
+
+Usage:
+    python gallery_import.py ~/Photos/holi-2025 --theme-id <id>
+    python gallery_import.py ~/Photos/holi-2025 --theme-name "Holi 2025" [--publish]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import httpx
+from PIL import Image, ImageOps
+
+from api_client import ADMIN_HEADERS, ADMIN_PASSWORD, ApiClient, AsyncApiClient, DEFAULT_API_BASE
+
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff")
+VARIANTS = {
+    # name: (longest edge in px, WebP quality)
+    # No thumbnail until GalleryPhoto has a field to store one; the photos route would drop it
+    "display": (2048, 82),
+}
+WORK_DIR_NAME = ".igk-import"
+
+
+def render_variants(source: str, out_dir: str, key: str) -> Dict[str, str]:
+    """Worker: write every variant of `source` as WebP; returns {variant: path}"""
+    outputs = {}
+    with Image.open(source) as original:
+        largest = max(size for size, _ in VARIANTS.values())
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when that still covers the largest variant
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original).convert("RGB")
+        for name, (edge, quality) in sorted(VARIANTS.items(), key=lambda v: -v[1][0]):
+            variant = image.copy()
+            variant.thumbnail((edge, edge), Image.LANCZOS)
+            path = os.path.join(out_dir, f"{key}.{name}.webp")
+            variant.save(path, "WEBP", quality=quality, method=4)
+            outputs[name] = path
+    return outputs
+
+
+class ImportManifest:
+    """Per-photo import state, persisted after every stage"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.photos: Dict[str, Dict] = {}
+        self.theme_id: Optional[str] = None
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.photos = data.get("photos", {})
+            self.theme_id = data.get("theme_id")
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"theme_id": self.theme_id, "photos": self.photos}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def entry(self, key: str, source: str) -> Dict:
+        return self.photos.setdefault(key, {"source": source, "variants": {}, "uploads": {}, "photo_id": None})
+
+
+def photo_key(root: str, path: str) -> str:
+    """Stable key per source file that changes when the file itself changes"""
+    stat = os.stat(path)
+    relative = os.path.relpath(path, root).replace(os.sep, "__")
+    return f"{os.path.splitext(relative)[0]}-{stat.st_size}-{int(stat.st_mtime)}"
+
+
+class GalleryImporter:
+    def __init__(self, source_dir: str, base_url: str = DEFAULT_API_BASE, workers: int = None,
+                 upload_concurrency: int = 6, batch_size: int = 0):
+        self.source_dir = os.path.abspath(source_dir)
+        self.work_dir = os.path.join(self.source_dir, WORK_DIR_NAME)
+        os.makedirs(self.work_dir, exist_ok=True)
+        self.manifest = ImportManifest(os.path.join(self.work_dir, "manifest.json"))
+        self.base_url = base_url
+        self.workers = workers
+        self.upload_concurrency = upload_concurrency
+        self.batch_size = batch_size
+        self.current_keys = set()
+
+    def sources(self) -> List[str]:
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.source_dir):
+            dirnames[:] = [d for d in dirnames if d != WORK_DIR_NAME]
+            found.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(SOURCE_EXTENSIONS))
+        return sorted(found)
+
+    def resize_all(self, sources: List[str]):
+        pending = {}
+        for source in sources:
+            key = photo_key(self.source_dir, source)
+            self.current_keys.add(key)
+            entry = self.manifest.entry(key, os.path.relpath(source, self.source_dir))
+            if not all(os.path.exists(p) for p in entry["variants"].values()) or len(entry["variants"]) < len(VARIANTS):
+                pending[key] = source
+
+        print(f"🖼️  Resizing {len(pending)} photo(s) ({len(sources) - len(pending)} already done)")
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(render_variants, source, self.work_dir, key): key for key, source in pending.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                try:
+                    self.manifest.photos[key]["variants"] = future.result()
+                except Exception as e:
+                    print(f"  ❌ {self.manifest.photos[key]['source']}: {e}")
+                    continue
+                self.manifest.save()
+                print(f"  [{done}/{len(pending)}] {self.manifest.photos[key]['source']}")
+
+    async def _upload_one(self, client: AsyncApiClient, key: str, variant: str, path: str):
+        with open(path, "rb") as f:
+            response = await client.post("upload", data={"type": "gallery"},
+                                         files={"file": (os.path.basename(path), f, "image/webp")})
+        body = response.json() if response.status_code == 200 else {}
+        if not body.get("success"):
+            raise RuntimeError(f"upload of {os.path.basename(path)} failed with status {response.status_code}")
+        self.manifest.photos[key]["uploads"][variant] = body["path"]
+        self.manifest.save()
+
+    async def upload_all(self):
+        jobs = [(key, variant, path)
+                for key, entry in self.manifest.photos.items() if key in self.current_keys
+                for variant, path in entry["variants"].items()
+                if variant in VARIANTS and variant not in entry["uploads"]]
+        print(f"📤 Uploading {len(jobs)} variant file(s) with {self.upload_concurrency} concurrent uploads")
+        semaphore = asyncio.Semaphore(self.upload_concurrency)
+        failures = 0
+
+        async with AsyncApiClient(self.base_url, timeout=120, headers={"x-admin-password": ADMIN_PASSWORD},
+                                  max_connections=self.upload_concurrency) as client:
+            async def guarded(job):
+                nonlocal failures
+                async with semaphore:
+                    try:
+                        await self._upload_one(client, *job)
+                    except (httpx.HTTPError, RuntimeError) as e:
+                        failures += 1
+                        print(f"  ❌ {e}")
+
+            await asyncio.gather(*(guarded(job) for job in jobs))
+            print(client.stats.summary())
+        return failures
+
+    def ensure_theme(self, client: ApiClient, theme_id: str = None, theme_name: str = None,
+                     publish: bool = False) -> str:
+        if theme_id or self.manifest.theme_id:
+            self.manifest.theme_id = theme_id or self.manifest.theme_id
+        else:
+            response = client.post("admin/gallery/themes", json={
+                "name": theme_name, "status": "published" if publish else "draft"})
+            response.raise_for_status()
+            self.manifest.theme_id = response.json()["theme"]["id"]
+            print(f"📁 Created theme '{theme_name}' ({self.manifest.theme_id})")
+        self.manifest.save()
+        return self.manifest.theme_id
+
+    def register(self, client: ApiClient, theme_id: str) -> int:
+        ready = [(key, entry) for key, entry in sorted(self.manifest.photos.items(), key=lambda e: e[1]["source"])
+                 if key in self.current_keys and entry["photo_id"] is None and "display" in entry["uploads"]]
+        if not ready:
+            print("📝 No new photos to register")
+            return 0
+
+        batch_size = self.batch_size or len(ready)
+        registered = 0
+        for start in range(0, len(ready), batch_size):
+            batch = ready[start:start + batch_size]
+            photos = [{
+                "imageUrl": entry["uploads"]["display"],
+                "caption": "",
+            } for _, entry in batch]
+            response = client.post(f"admin/gallery/themes/{theme_id}/photos", json={"photos": photos})
+            if response.status_code != 201:
+                print(f"  ❌ Registering {len(batch)} photos failed with status {response.status_code}")
+                break
+            for (key, _), created in zip(batch, response.json()["photos"]):
+                self.manifest.photos[key]["photo_id"] = created["id"]
+            registered += len(batch)
+            self.manifest.save()
+        print(f"📝 Registered {registered} photo(s) in theme {theme_id}")
+        return registered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resize, upload and register a folder of event photos")
+    parser.add_argument("source_dir", help="Directory of full-resolution photos (searched recursively)")
+    theme = parser.add_mutually_exclusive_group()
+    theme.add_argument("--theme-id", help="Existing gallery theme to add the photos to")
+    theme.add_argument("--theme-name", help="Create a new theme with this name")
+    parser.add_argument("--publish", action="store_true", help="Publish a newly created theme")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--workers", type=int, help="Resize processes (default: CPU count)")
+    parser.add_argument("--upload-concurrency", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Photos per registration request (0 = all in one batch)")
+    args = parser.parse_args()
+
+    importer = GalleryImporter(args.source_dir, args.base_url, args.workers, args.upload_concurrency, args.batch_size)
+    if not (args.theme_id or args.theme_name or importer.manifest.theme_id):
+        parser.error("--theme-id or --theme-name is required for a new import")
+
+    sources = importer.sources()
+    if not sources:
+        print(f"❌ No photos found in {importer.source_dir}")
+        return 1
+
+    print("📸 GALLERY IMPORT")
+    print("=" * 70)
+    importer.resize_all(sources)
+    failures = asyncio.run(importer.upload_all())
+
+    with ApiClient(args.base_url, timeout=120, headers=ADMIN_HEADERS) as client:
+        theme_id = importer.ensure_theme(client, args.theme_id, args.theme_name, args.publish)
+        importer.register(client, theme_id)
+
+    source_bytes = sum(os.path.getsize(s) for s in sources)
+    variant_bytes = sum(os.path.getsize(p) for key, e in importer.manifest.photos.items()
+                        if key in importer.current_keys
+                        for p in e["variants"].values() if os.path.exists(p))
+    print(f"\n📦 {source_bytes / 2**20:.1f} MB of originals → {variant_bytes / 2**20:.1f} MB uploaded as variants")
+    pending = sum(1 for key, e in importer.manifest.photos.items()
+                  if key in importer.current_keys and e["photo_id"] is None)
+    if failures or pending:
+        print(f"⚠️  {pending} photo(s) not yet registered; rerun the same command to resume")
+        return 1
+    print("✅ Import complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
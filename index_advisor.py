@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+MongoDB profiler and index advisor for the catch-all API route.
+Against a local seeded mongod (see db_seeder.py) it:
+1. enables the database profiler and drives the API traffic mix that hits the
+   model queries (Event.findAll / findBySlug, Order.findByOrderId /
+   findByEventId, Ticket.findByOrderId / findByTicketCode / getStats,
+   Testimonial.getRecentApproved),
+2. collects explain("executionStats") for every query shape,
+3. reports collection scans, examined/returned ratios and ESR-ordered
+   (equality, sort, range) compound index suggestions,
+4. with --apply, creates the suggestions and reruns both steps for a
+   before/after latency comparison; both sides are measured the same way,
+   with the profiler off and after a warm-up pass.
+
+Exits non-zero while a door-critical lookup (order or ticket by code) still
+scans its whole collection.
+
+Usage:
+    python index_advisor.py --base-url http://localhost:3000/api [--rounds 50] [--apply [--keep-indexes]]
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import MongoClient
+
+from api_client import ADMIN_HEADERS, ApiClient, DEFAULT_API_BASE, NO_RETRY
+from db_seeder import DEFAULT_DB_NAME, DEFAULT_MONGO_URL, is_local
+from perf_report import PerfRecorder, summarize
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$in", "$nin", "$ne", "$exists", "$regex"}
+SCAN_RATIO_WARNING = 10
+WARMUP_ROUNDS = 3
+
+
+@dataclass
+class QueryShape:
+    """One model query as the route issues it, plus the API call that triggers it"""
+    name: str
+    collection: str
+    source: str
+    build_filter: Callable[[Dict], Dict]
+    sort: List[Tuple[str, int]] = field(default_factory=list)
+    limit: int = 0
+    api: Optional[Callable[[Dict], Tuple[str, Dict[str, Any]]]] = None
+    admin: bool = False
+    critical: bool = False
+
+
+QUERY_SHAPES = [
+    QueryShape("Event.findAll", "events", "events",
+               lambda e: {"status": "published", "city": e["city"]},
+               sort=[("startDateTime", 1), ("date", 1)],
+               api=lambda e: ("events", {"city": e["city"]})),
+    QueryShape("Event.findBySlug", "events", "events", lambda e: {"slug": e["slug"]}, limit=1,
+               api=lambda e: (f"events/{e['slug']}", {})),
+    QueryShape("Order.findByOrderId", "orders", "orders", lambda o: {"orderId": o["orderId"]}, limit=1,
+               api=lambda o: ("orders/lookup", {"orderId": o["orderId"], "email": o["email"]}), critical=True),
+    # Served by the same orders/lookup request as Order.findByOrderId
+    QueryShape("Ticket.findByOrderId", "tickets", "orders", lambda o: {"orderId": o["id"]}, critical=True),
+    QueryShape("Order.findByEventId", "orders", "events", lambda e: {"eventId": e["id"]},
+               sort=[("createdAt", -1)],
+               api=lambda e: (f"admin/events/{e['id']}/stats", {}), admin=True),
+    # Served by the same admin stats request as Order.findByEventId
+    QueryShape("Ticket.getStats", "tickets", "events", lambda e: {"eventId": e["id"]}),
+    QueryShape("Ticket.findByTicketCode", "tickets", "tickets", lambda t: {"ticketCode": t["ticketCode"]},
+               limit=1, api=lambda t: ("admin/check-in", {"ticketCode": t["ticketCode"]}), admin=True,
+               critical=True),
+    QueryShape("Testimonial.getRecentApproved", "testimonials", "testimonials", lambda t: {"approved": True},
+               sort=[("createdAt", -1)], limit=10, api=lambda t: ("testimonials", {})),
+]
+
+
+def plan_stages(plan: Dict) -> List[str]:
+    """Flatten a winning plan into its stage names, root first"""
+    plan = plan.get("queryPlan", plan)  # slot-based engine nests the classic plan one level down
+    stages = [plan.get("stage", "?")]
+    children = plan.get("inputStages", []) + ([plan["inputStage"]] if "inputStage" in plan else [])
+    for child in children:
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def suggest_index(filter_: Dict, sort: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """ESR order: equality fields, then sort fields, then range fields"""
+    equality = [(k, 1) for k, v in filter_.items()
+                if not (isinstance(v, dict) and set(v) & RANGE_OPERATORS)]
+    ranges = [(k, 1) for k, v in filter_.items() if isinstance(v, dict) and set(v) & RANGE_OPERATORS]
+    keys: List[Tuple[str, int]] = []
+    for key, direction in equality + list(sort) + ranges:
+        if key not in [k for k, _ in keys]:
+            keys.append((key, direction))
+    return keys
+
+
+def covered_by(keys: List[Tuple[str, int]], indexes: List[List[Tuple[str, int]]]) -> bool:
+    """True when an existing index starts with `keys` (or its exact reverse, which serves the same sorts)"""
+    reverse = [(k, -d) for k, d in keys]
+    return any(index[:len(keys)] in (keys, reverse) for index in indexes)
+
+
+class IndexAdvisor:
+    def __init__(self, mongo_url: str, db_name: str, api: ApiClient, admin_api: ApiClient,
+                 samples: int = 20, seed: int = 7):
+        self.client = MongoClient(mongo_url)
+        self.db = self.client[db_name]
+        self.api = api
+        self.admin_api = admin_api
+        self.samples = samples
+        self.rng = random.Random(seed)
+        self.sample_docs: Dict[str, List[Dict]] = {}
+        self.created: List[Tuple[str, str]] = []
+
+    def load_samples(self):
+        for source in {shape.source for shape in QUERY_SHAPES}:
+            docs = list(self.db[source].aggregate([{"$sample": {"size": self.samples}}]))
+            if not docs:
+                raise RuntimeError(f"Collection '{source}' is empty; seed the database first (db_seeder.py)")
+            self.sample_docs[source] = docs
+
+    def existing_indexes(self, collection: str) -> List[List[Tuple[str, int]]]:
+        return [list(info["key"]) for info in self.db[collection].index_information().values()]
+
+    def drive_traffic(self, rounds: int) -> Dict[str, Dict]:
+        """Replay every shape's API call `rounds` times with sampled parameters; returns endpoint stats"""
+        recorder = PerfRecorder()
+        self.api.add_listener(recorder.record)
+        self.admin_api.add_listener(recorder.record)
+        try:
+            for _ in range(rounds):
+                for shape in QUERY_SHAPES:
+                    if shape.api is None:
+                        continue
+                    path, params = shape.api(self.rng.choice(self.sample_docs[shape.source]))
+                    (self.admin_api if shape.admin else self.api).get(path, params=params)
+        finally:
+            self.api.listeners.remove(recorder.record)
+            self.admin_api.listeners.remove(recorder.record)
+        return recorder.endpoint_stats()
+
+    def measure(self, rounds: int) -> Dict[str, Dict]:
+        """Endpoint latency with the profiler off and the caches warmed by WARMUP_ROUNDS unrecorded passes"""
+        self.drive_traffic(WARMUP_ROUNDS)
+        return self.drive_traffic(rounds)
+
+    def profile(self, rounds: int) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """Drive the traffic mix with the profiler on; returns (endpoint stats, profiled query shapes)"""
+        previous = self.db.command("profile", 2)["was"]
+        started = self.db.command("serverStatus")["localTime"]
+        try:
+            stats = self.drive_traffic(rounds)
+        finally:
+            self.db.command("profile", previous)
+
+        namespaces = [f"{self.db.name}.{c}" for c in {shape.collection for shape in QUERY_SHAPES}]
+        grouped: Dict[Tuple, List[Dict]] = {}
+        for entry in self.db["system.profile"].find({"ts": {"$gte": started}, "ns": {"$in": namespaces}}):
+            command = entry.get("command", {})
+            if "find" in command:
+                shape = ("find", tuple(sorted(command.get("filter", {}))), tuple(command.get("sort", {}).items()))
+            elif "aggregate" in command:
+                shape = ("aggregate", tuple(next(iter(s)) for s in command.get("pipeline", [])), ())
+            else:
+                continue
+            grouped.setdefault((entry["ns"].split(".", 1)[1],) + shape, []).append(entry)
+
+        profiled = []
+        for (collection, op, keys, sort), entries in sorted(grouped.items()):
+            examined = sum(e.get("docsExamined", 0) for e in entries)
+            returned = sum(e.get("nreturned", 0) for e in entries)
+            profiled.append({
+                "collection": collection,
+                "op": op,
+                "keys": list(keys),
+                "sort": [list(s) for s in sort],
+                "count": len(entries),
+                "plans": sorted({e.get("planSummary", "?") for e in entries}),
+                "docs_examined": examined,
+                "returned": returned,
+                "millis": summarize([e.get("millis", 0) for e in entries]),
+            })
+        return stats, profiled
+
+    def explain(self, shape: QueryShape) -> Dict:
+        doc = self.rng.choice(self.sample_docs[shape.source])
+        filter_ = shape.build_filter(doc)
+        find = {"find": shape.collection, "filter": filter_}
+        if shape.sort:
+            find["sort"] = dict(shape.sort)
+        if shape.limit:
+            find["limit"] = shape.limit
+        result = self.db.command("explain", find, verbosity="executionStats")
+        execution = result["executionStats"]
+        stages = plan_stages(result["queryPlanner"]["winningPlan"])
+        suggestion = suggest_index(filter_, shape.sort)
+        return {
+            "shape": shape.name,
+            "collection": shape.collection,
+            "filter_keys": list(filter_),
+            "stages": stages,
+            "collection_scan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+            "docs_examined": execution["totalDocsExamined"],
+            "keys_examined": execution["totalKeysExamined"],
+            "returned": execution["nReturned"],
+            "execution_ms": execution["executionTimeMillis"],
+            "suggested_index": None if covered_by(suggestion, self.existing_indexes(shape.collection))
+            else suggestion,
+            "critical": shape.critical,
+        }
+
+    def explain_all(self) -> List[Dict]:
+        return [self.explain(shape) for shape in QUERY_SHAPES]
+
+    def apply(self, explains: List[Dict]):
+        seen = set()
+        for result in explains:
+            keys = result["suggested_index"]
+            if not keys or (result["collection"], tuple(keys)) in seen:
+                continue
+            seen.add((result["collection"], tuple(keys)))
+            start = time.perf_counter()
+            name = self.db[result["collection"]].create_index(keys)
+            self.created.append((result["collection"], name))
+            print(f"  🔨 {result['collection']}.{name} built in {time.perf_counter() - start:.1f}s")
+
+    def drop_created(self):
+        for collection, name in self.created:
+            self.db[collection].drop_index(name)
+        if self.created:
+            print(f"🧹 Dropped {len(self.created)} index(es) created by this run")
+        self.created = []
+
+    def close(self):
+        self.client.close()
+
+
+def print_explains(title: str, explains: List[Dict]):
+    print(f"\n🔎 {title}")
+    print(f"  {'Query shape':<32}{'plan':<26}{'examined':>10}{'returned':>10}{'ratio':>8}{'ms':>7}")
+    for e in explains:
+        ratio = e["docs_examined"] / max(e["returned"], 1)
+        icon = "❌" if e["collection_scan"] else ("⚠️ " if ratio > SCAN_RATIO_WARNING or e["in_memory_sort"] else "✅")
+        plan = ">".join(e["stages"])[:24]
+        print(f"{icon} {e['shape']:<31}{plan:<26}{e['docs_examined']:>10,}{e['returned']:>10,}"
+              f"{ratio:>8.1f}{e['execution_ms']:>7}")
+    suggestions = [e for e in explains if e["suggested_index"]]
+    if suggestions:
+        print("\n💡 Suggested indexes:")
+        for e in suggestions:
+            spec = ", ".join(f"{k}: {d}" for k, d in e["suggested_index"])
+            print(f"  db.{e['collection']}.createIndex({{ {spec} }})   // {e['shape']}")
+
+
+def print_profile(profiled: List[Dict]):
+    print("\n📈 PROFILER (system.profile during the traffic mix):")
+    for p in profiled:
+        scan = any("COLLSCAN" in plan for plan in p["plans"])
+        keys = ",".join(p["keys"]) or "-"
+        print(f"  {'❌' if scan else '✅'} {p['collection']}.{p['op']}({keys}) ×{p['count']}  "
+              f"{'/'.join(p['plans'])[:40]}  examined/returned {p['docs_examined']:,}/{p['returned']:,}  "
+              f"p95 {p['millis']['p95']:.0f} ms")
+
+
+def print_latency_comparison(before: Dict[str, Dict], after: Dict[str, Dict]):
+    print("\n⏱️  API LATENCY BEFORE → AFTER (ms):")
+    for endpoint in sorted(set(before) | set(after)):
+        b, a = before.get(endpoint, {}), after.get(endpoint, {})
+        if not (b and a):
+            continue
+        change = (a["p50"] - b["p50"]) / b["p50"] * 100 if b["p50"] else 0.0
+        print(f"  {endpoint:<52} p50 {b['p50']:>8.1f} → {a['p50']:>8.1f} ({change:+.0f}%)   "
+              f"p95 {b['p95']:>8.1f} → {a['p95']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the API's MongoDB queries and suggest indexes")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--mongo-url", default=DEFAULT_MONGO_URL, help="Defaults to $MONGO_URL")
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Defaults to $DB_NAME or igk_events_db")
+    parser.add_argument("--rounds", type=int, default=30, help="Passes over the API traffic mix per phase")
+    parser.add_argument("--apply", action="store_true", help="Create the suggested indexes and measure again")
+    parser.add_argument("--keep-indexes", action="store_true", help="Leave indexes created by --apply in place")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local MongoDB host")
+    args = parser.parse_args()
+
+    if not is_local(args.mongo_url) and not args.allow_remote:
+        parser.error("the profiler and index builds are meant for a local mongod; pass --allow-remote to override")
+
+    api = ApiClient(args.base_url, timeout=60, retry=NO_RETRY)
+    admin_api = ApiClient(args.base_url, timeout=60, headers=ADMIN_HEADERS, retry=NO_RETRY)
+    advisor = IndexAdvisor(args.mongo_url, args.db_name, api, admin_api)
+    print("🗂️  INDEX ADVISOR")
+    print("=" * 70)
+    try:
+        advisor.load_samples()
+        _, profiled = advisor.profile(args.rounds)
+        print_profile(profiled)
+        explains = advisor.explain_all()
+        print_explains("EXPLAIN (executionStats)", explains)
+
+        if args.apply:
+            # Profiled latencies pay for writing every operation to system.profile; compare like with like
+            before_latency = advisor.measure(args.rounds)
+            print("\n🔧 Creating suggested indexes...")
+            advisor.apply(explains)
+            after_latency = advisor.measure(args.rounds)
+            explains = advisor.explain_all()
+            print_explains("EXPLAIN AFTER INDEXING", explains)
+            print_latency_comparison(before_latency, after_latency)
+    finally:
+        # Also on failure: an exception after apply() must not leave this run's indexes behind
+        if not args.keep_indexes:
+            advisor.drop_created()
+        advisor.close()
+        api.close()
+        admin_api.close()
+
+    scanning = [e["shape"] for e in explains if e["critical"] and e["collection_scan"]]
+    if scanning:
+        print(f"\n❌ Door-critical lookups still scan their collection: {', '.join(scanning)}")
+        return 1
+    print("\n✅ Door-critical lookups are index-backed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Load generation for the IGK Events public API.
+Drives a weighted traffic mix from a scenario file either at a target request
+rate (open loop) or with a fixed number of virtual users (closed loop), and
+reports throughput, error rate and HDR-histogram latency percentiles per endpoint.
+
+Requires the hdrhistogram package (imported as hdrh).
+"""
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+from hdrh.histogram import HdrHistogram
+
+from api_client import AsyncApiClient, DEFAULT_API_BASE, NO_RETRY
+
+# Latencies are recorded in microseconds, from 1us up to 60s at 3 significant digits
+HISTOGRAM_MAX_US = 60_000_000
+REPORT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+@dataclass
+class ScenarioRequest:
+    name: str
+    path: str
+    method: str = "GET"
+    weight: float = 1
+    body: Optional[Dict] = None
+    expected_status: List[int] = field(default_factory=lambda: [200])
+
+    def render_path(self, variables: Dict[str, List[str]]) -> str:
+        """Fill {placeholders} in the path with a random value from the scenario variables"""
+        values = {key: random.choice(options) for key, options in variables.items()}
+        return self.path.format(**values)
+
+
+@dataclass
+class LoadScenario:
+    name: str
+    requests: List[ScenarioRequest]
+    variables: Dict[str, List[str]] = field(default_factory=dict)
+    think_time_ms: float = 0
+    description: str = ""
+
+    @classmethod
+    def from_file(cls, path: str) -> "LoadScenario":
+        with open(path) as f:
+            raw = json.load(f)
+        requests = [ScenarioRequest(**entry) for entry in raw.get("requests", [])]
+        if not requests:
+            raise ValueError(f"Scenario file {path} defines no requests")
+        if any(r.weight <= 0 for r in requests):
+            raise ValueError(f"Scenario file {path} has a request with a non-positive weight")
+        return cls(
+            name=raw.get("name", path),
+            requests=requests,
+            variables=raw.get("variables", {}),
+            think_time_ms=raw.get("think_time_ms", 0),
+            description=raw.get("description", ""),
+        )
+
+    def pick(self) -> ScenarioRequest:
+        return random.choices(self.requests, weights=[r.weight for r in self.requests])[0]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histogram = HdrHistogram(1, HISTOGRAM_MAX_US, 3)
+        self.count = 0
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+
+    def record(self, latency_s: float, status: str, ok: bool):
+        self.histogram.record_value(min(HISTOGRAM_MAX_US, max(1, int(latency_s * 1_000_000))))
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def as_dict(self, elapsed_s: float) -> Dict:
+        h = self.histogram
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "throughput_rps": self.count / elapsed_s if elapsed_s else 0.0,
+            "latency_ms": {
+                "min": h.get_min_value() / 1000,
+                "mean": h.get_mean_value() / 1000,
+                **{f"p{p:g}": h.get_value_at_percentile(p) / 1000 for p in REPORT_PERCENTILES},
+                "max": h.get_max_value() / 1000,
+            },
+            "status_codes": self.status_codes,
+        }
+
+
+class LoadReport:
+    def __init__(self, scenario: LoadScenario, mode: str):
+        self.scenario = scenario
+        self.mode = mode
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.started = time.perf_counter()
+        self.elapsed_s = 0.0
+
+    def record(self, name: str, latency_s: float, status: str, ok: bool):
+        self.endpoints.setdefault(name, EndpointStats()).record(latency_s, status, ok)
+
+    def finish(self):
+        self.elapsed_s = time.perf_counter() - self.started
+
+    def totals(self) -> EndpointStats:
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.histogram.add(stats.histogram)
+            total.count += stats.count
+            total.errors += stats.errors
+            for status, n in stats.status_codes.items():
+                total.status_codes[status] = total.status_codes.get(status, 0) + n
+        return total
+
+    def as_dict(self) -> Dict:
+        return {
+            "scenario": self.scenario.name,
+            "mode": self.mode,
+            "duration_s": self.elapsed_s,
+            "total": self.totals().as_dict(self.elapsed_s),
+            "endpoints": {name: s.as_dict(self.elapsed_s) for name, s in sorted(self.endpoints.items())},
+        }
+
+    def print_summary(self):
+        report = self.as_dict()
+        total = report["total"]
+        print("\n" + "=" * 100)
+        print(f"📈 LOAD SUMMARY — scenario '{self.scenario.name}' ({self.mode}), {self.elapsed_s:.1f}s")
+        print("=" * 100)
+        print(f"{'Endpoint':<36}{'Reqs':>8}{'RPS':>9}{'Err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'p99.9':>9}{'max':>9}")
+        rows = list(report["endpoints"].items()) + [("TOTAL", total)]
+        for name, s in rows:
+            lat = s["latency_ms"]
+            print(f"{name:<36}{s['requests']:>8}{s['throughput_rps']:>9.1f}{s['error_rate'] * 100:>6.1f}%"
+                  f"{lat['p50']:>9.1f}{lat['p95']:>9.1f}{lat['p99']:>9.1f}{lat['p99.9']:>9.1f}{lat['max']:>9.1f}")
+        print("(latencies in ms)")
+
+    def write_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+class LoadGenerator:
+    def __init__(self, scenario: LoadScenario, base_url: str = DEFAULT_API_BASE,
+                 headers: Optional[Dict[str, str]] = None, timeout: float = 30,
+                 max_connections: int = 100, http2: bool = False):
+        self.scenario = scenario
+        self.client = AsyncApiClient(base_url, timeout=timeout, headers=headers, http2=http2,
+                                     retry=NO_RETRY, max_connections=max_connections)
+
+    async def _send(self, report: LoadReport, request: ScenarioRequest, scheduled_at: float):
+        """Send one request; latency is measured from the scheduled time to avoid coordinated omission"""
+        path = request.render_path(self.scenario.variables)
+        try:
+            response = await self.client.request(request.method, path, json=request.body)
+            status = str(response.status_code)
+            ok = response.status_code in request.expected_status
+        except httpx.TimeoutException:
+            status, ok = "timeout", False
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        report.record(request.name, time.perf_counter() - scheduled_at, status, ok)
+
+    async def run_open_loop(self, rate: float, duration_s: float, poisson: bool = False) -> LoadReport:
+        """Issue requests at `rate` per second regardless of how fast the server answers"""
+        report = LoadReport(self.scenario, f"open loop @ {rate:g} req/s")
+        in_flight = set()
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < duration_s:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.ensure_future(self._send(report, self.scenario.pick(), next_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            next_at += random.expovariate(rate) if poisson else 1 / rate
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        report.finish()
+        return report
+
+    async def run_closed_loop(self, users: int, duration_s: float) -> LoadReport:
+        """Run `users` virtual users, each sending its next request once the last one returns"""
+        report = LoadReport(self.scenario, f"closed loop, {users} users")
+        deadline = time.perf_counter() + duration_s
+        think_s = self.scenario.think_time_ms / 1000
+
+        async def virtual_user():
+            while time.perf_counter() < deadline:
+                await self._send(report, self.scenario.pick(), time.perf_counter())
+                if think_s:
+                    # Exponential think time keeps users from marching in lockstep
+                    remaining = deadline - time.perf_counter()
+                    await asyncio.sleep(max(0, min(remaining, random.expovariate(1 / think_s))))
+
+        await asyncio.gather(*(virtual_user() for _ in range(users)))
+        report.finish()
+        return report
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def run_load(scenario_file: str, base_url: str = DEFAULT_API_BASE, rate: float = None,
+             users: int = None, duration_s: float = 60, poisson: bool = False,
+             headers: Optional[Dict[str, str]] = None, report_path: str = None,
+             max_connections: int = 100, http2: bool = False) -> LoadReport:
+    """Run one load test; `rate` selects open loop, otherwise `users` (default 10) runs closed loop"""
+    scenario = LoadScenario.from_file(scenario_file)
+
+    async def _run():
+        generator = LoadGenerator(scenario, base_url, headers=headers,
+                                  max_connections=max_connections, http2=http2)
+        try:
+            if rate:
+                return await generator.run_open_loop(rate, duration_s, poisson)
+            return await generator.run_closed_loop(users or 10, duration_s)
+        finally:
+            print(generator.client.stats.summary())
+            await generator.aclose()
+
+    mode = f"{rate:g} req/s open loop" if rate else f"{users or 10} virtual users"
+    print(f"🔥 Load test '{scenario.name}': {mode} for {duration_s:g}s against {base_url}")
+    report = asyncio.run(_run())
+    report.print_summary()
+    if report_path:
+        report.write_json(report_path)
+        print(f"📝 Load report written to {report_path}")
+    return report
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Access-log replay with time scaling.
+Reads production access logs (common/combined format, or NDJSON with a
+timestamp, method and path/url per line; .gz is fine), keeps the /api/
+requests and replays them against a target with their original inter-arrival
+times, optionally sped up. Requests whose second-resolution timestamps
+collide are spread evenly across that second.
+
+IDs are anonymised before anything is sent. Requests that match one of the
+load scenario's request builders are re-rendered from the scenario's
+variables (e.g. an order lookup gets one of the seeded ORD-LOADTEST orders).
+The same original value always maps to the same replacement, so repeat
+visitors stay repeat visitors. Other GETs keep their path but have
+identifying query values (emails, order IDs, codes...) replaced by salted
+hashes. Admin requests, unmatched writes and the unauthenticated routes that
+seed, migrate or scrape (route_dispatch_benchmark.UNSAFE_ROUTES) are never
+replayed; access logs carry no bodies.
+
+Latency is measured from the intended send time, so a replayer or server
+that falls behind shows up as latency instead of silently thinning the
+burst. The dispatch lag (actual minus intended send time) is reported
+separately, both overall and for the busiest minute of the log.
+
+Usage:
+    python log_replay.py access.log --base-url http://localhost:3000/api [--speed 2] [--output replay.json]
+    python log_replay.py requests.ndjson --start 2024-10-20T18:00:00 --end 2024-10-20T18:15:00
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+from api_client import AsyncApiClient, DEFAULT_API_BASE, NO_RETRY
+from load_generator import EndpointStats, LoadScenario, ScenarioRequest
+from perf_report import endpoint_template, percentile
+from route_dispatch_benchmark import UNSAFE_ROUTES
+from soak_test import DEFAULT_SCENARIO
+
+# host ident user [10/Oct/2024:13:55:36 +0000] "GET /api/events HTTP/1.1" 200 2326 "referer" "agent"
+CLF_RE = re.compile(r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3}|-)')
+CLF_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+NDJSON_TIME_KEYS = ("timestamp", "@timestamp", "time", "ts", "date")
+SENSITIVE_PARAMS = {"email", "orderid", "order_id", "phone", "name", "code", "ticketcode", "token", "password"}
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+LATE_MS = 10
+
+
+@dataclass
+class LogEntry:
+    timestamp: float
+    method: str
+    path: str  # relative to /api/, query string included
+    status: Optional[int] = None
+
+
+@dataclass
+class PlannedRequest:
+    offset_s: float
+    name: str
+    method: str
+    path: str
+    body: Optional[Dict] = None
+    expected_status: Tuple[int, ...] = ()
+
+
+def parse_time(value) -> float:
+    """Epoch seconds (or milliseconds), ISO 8601 or CLF time -> epoch seconds"""
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.strptime(value, CLF_TIME_FORMAT).timestamp()
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def api_path(target: str) -> Optional[str]:
+    """'/api/events/holi?x=1' or 'https://host/api/events/holi?x=1' -> 'events/holi?x=1'; None outside /api/"""
+    parts = urlsplit(target)
+    if not parts.path.startswith("/api/"):
+        return None
+    path = parts.path[len("/api/"):]
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+def parse_clf(line: str) -> Optional[LogEntry]:
+    match = CLF_RE.match(line)
+    if not match:
+        return None
+    path = api_path(match["target"])
+    if path is None:
+        return None
+    status = None if match["status"] == "-" else int(match["status"])
+    return LogEntry(parse_time(match["time"]), match["method"], path, status)
+
+
+def parse_ndjson(line: str) -> Optional[LogEntry]:
+    record = json.loads(line)
+    method, target = record.get("method"), record.get("path") or record.get("url") or record.get("uri")
+    if not target and record.get("request"):
+        method, target = record["request"].split()[:2]
+    stamp = next((record[key] for key in NDJSON_TIME_KEYS if key in record), None)
+    if not method or not target or stamp is None:
+        return None
+    path = api_path(target)
+    status = record.get("status") or record.get("status_code")
+    return LogEntry(parse_time(stamp), method.upper(), path, int(status) if status else None) if path else None
+
+
+def read_log(path: str) -> Tuple[List[LogEntry], int]:
+    """Parsed /api/ entries sorted by time, and the number of lines that were skipped"""
+    entries, skipped = [], 0
+    with (gzip.open(path, "rt") if path.endswith(".gz") else open(path)) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = parse_ndjson(line) if line.startswith("{") else parse_clf(line)
+            except (ValueError, KeyError, TypeError):
+                entry = None
+            if entry is None:
+                skipped += 1
+            else:
+                entries.append(entry)
+    entries.sort(key=lambda e: e.timestamp)
+    return entries, skipped
+
+
+def spread_within_seconds(entries: List[LogEntry]):
+    """Spread entries sharing a whole-second timestamp evenly over that second"""
+    i = 0
+    while i < len(entries):
+        j = i
+        while j < len(entries) and entries[j].timestamp == entries[i].timestamp:
+            j += 1
+        if j - i > 1 and entries[i].timestamp == int(entries[i].timestamp):
+            for k in range(i, j):
+                entries[k].timestamp += (k - i) / (j - i)
+        i = j
+
+
+def route_key(method: str, path: str) -> str:
+    """Endpoint template with the query keys sorted, so key order in the log does not matter"""
+    parts = urlsplit(path)
+    template = endpoint_template(method, f"/api/{parts.path}")
+    keys = sorted(key for key, _ in parse_qsl(parts.query, keep_blank_values=True))
+    return template + ("?" + "&".join(f"{key}=[{key}]" for key in keys) if keys else "")
+
+
+class ScenarioBuilder:
+    """A scenario request as a matcher for concrete log paths"""
+
+    def __init__(self, request: ScenarioRequest):
+        self.request = request
+        template_path, _, template_query = request.path.partition("?")
+        self.path_re = re.compile("^" + re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>[^/]+)", re.escape(template_path)) + "$")
+        self.query_vars = {key: value[1:-1] for key, value in parse_qsl(template_query)
+                           if value.startswith("{") and value.endswith("}")}
+
+    def match(self, method: str, path: str) -> Optional[Dict[str, str]]:
+        """Original value of every scenario variable in `path`, or None if it is not this request"""
+        if method != self.request.method.upper():
+            return None
+        parts = urlsplit(path)
+        match = self.path_re.match(parts.path)
+        if not match:
+            return None
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        if not set(self.query_vars) <= set(query):
+            return None
+        return {**match.groupdict(), **{var: query[key] for key, var in self.query_vars.items()}}
+
+
+class Anonymiser:
+    """Maps logged requests onto the scenario's request builders and pseudonymises what is left"""
+
+    def __init__(self, scenario: LoadScenario, salt: bytes):
+        self.scenario = scenario
+        self.salt = salt
+        self.builders = [ScenarioBuilder(r) for r in scenario.requests]
+        self.counts = {"scenario": 0, "pseudonymised": 0, "admin": 0, "unsafe": 0, "unmatched_write": 0}
+
+    def digest(self, value: str) -> int:
+        return int.from_bytes(hmac.new(self.salt, value.encode(), hashlib.sha256).digest()[:8], "big")
+
+    def pseudonym(self, value: str) -> str:
+        token = f"{self.digest(value):016x}"[:10]
+        return f"anon-{token}@example.com" if EMAIL_RE.match(value) else f"anon-{token}"
+
+    def plan(self, entry: LogEntry, offset_s: float) -> Optional[PlannedRequest]:
+        if entry.path.startswith("admin/"):
+            self.counts["admin"] += 1
+            return None
+        if urlsplit(entry.path).path.strip("/") in UNSAFE_ROUTES:
+            # Unauthenticated seeding/migration and scraping routes: seed-events wipes the events collection
+            self.counts["unsafe"] += 1
+            return None
+        for builder in self.builders:
+            originals = builder.match(entry.method, entry.path)
+            if originals is None:
+                continue
+            values = {}
+            for var, pool in self.scenario.variables.items():
+                values[var] = pool[self.digest(var + ":" + originals.get(var, "")) % len(pool)] if pool else ""
+            self.counts["scenario"] += 1
+            request = builder.request
+            return PlannedRequest(offset_s, request.name, request.method.upper(), request.path.format(**values),
+                                  request.body, tuple(request.expected_status))
+        if entry.method != "GET":
+            self.counts["unmatched_write"] += 1
+            return None
+        parts = urlsplit(entry.path)
+        query = [(key, self.pseudonym(value) if key.lower() in SENSITIVE_PARAMS or EMAIL_RE.match(value) else value)
+                 for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+        self.counts["pseudonymised"] += 1
+        path = parts.path + (f"?{urlencode(query)}" if query else "")
+        return PlannedRequest(offset_s, route_key("GET", path), "GET", path)
+
+
+def plan_replay(entries: List[LogEntry], anonymiser: Anonymiser, speed: float) -> List[PlannedRequest]:
+    if not entries:
+        return []
+    start = entries[0].timestamp
+    planned = (anonymiser.plan(e, (e.timestamp - start) / speed) for e in entries)
+    return [p for p in planned if p is not None]
+
+
+class LogReplayer:
+    def __init__(self, client: AsyncApiClient):
+        self.client = client
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.lags_ms: List[float] = []
+        self.sent: List[Tuple[float, float]] = []  # (intended offset, dispatch lag ms)
+
+    async def _send(self, request: PlannedRequest, intended: float):
+        try:
+            response = await self.client.request(request.method, request.path, json=request.body)
+            status = str(response.status_code)
+            ok = response.status_code in request.expected_status if request.expected_status \
+                else response.status_code < 500
+        except httpx.TimeoutException:
+            status, ok = "timeout", False
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        self.endpoints.setdefault(request.name, EndpointStats()).record(time.perf_counter() - intended, status, ok)
+
+    async def run(self, planned: List[PlannedRequest]) -> float:
+        """Send every request at its offset; returns the wall time the replay took"""
+        in_flight = set()
+        start = time.perf_counter()
+        for request in planned:
+            intended = start + request.offset_s
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lag_ms = max(0.0, (time.perf_counter() - intended) * 1000)
+            self.lags_ms.append(lag_ms)
+            self.sent.append((request.offset_s, lag_ms))
+            task = asyncio.ensure_future(self._send(request, intended))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        return time.perf_counter() - start
+
+
+def busiest_window(offsets: List[float], window_s: float) -> Tuple[float, int]:
+    """Start offset and request count of the busiest `window_s` stretch (offsets sorted)"""
+    best_start, best_count, low = 0.0, 0, 0
+    for high, offset in enumerate(offsets):
+        while offset - offsets[low] > window_s:
+            low += 1
+        if high - low + 1 > best_count:
+            best_start, best_count = offsets[low], high - low + 1
+    return best_start, best_count
+
+
+def lag_summary(lags_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50": percentile(lags_ms, 50),
+        "p95": percentile(lags_ms, 95),
+        "p99": percentile(lags_ms, 99),
+        "max": max(lags_ms, default=0.0),
+        "late_fraction": sum(1 for lag in lags_ms if lag > LATE_MS) / len(lags_ms) if lags_ms else 0.0,
+    }
+
+
+def analyze(replayer: LogReplayer, planned: List[PlannedRequest], wall_s: float, speed: float) -> Dict:
+    intended_s = planned[-1].offset_s if planned else 0.0
+    burst_window_s = 60 / speed
+    burst_start, burst_count = busiest_window([p.offset_s for p in planned], burst_window_s)
+    burst_lags = [lag for offset, lag in replayer.sent if burst_start <= offset <= burst_start + burst_window_s]
+    total = EndpointStats()
+    for stats in replayer.endpoints.values():
+        total.histogram.add(stats.histogram)
+        total.count += stats.count
+        total.errors += stats.errors
+    return {
+        "speed": speed,
+        "requests": len(planned),
+        "intended_duration_s": intended_s,
+        "achieved_duration_s": wall_s,
+        "intended_rps": len(planned) / intended_s if intended_s else 0.0,
+        "dispatch_lag_ms": lag_summary(replayer.lags_ms),
+        "busiest_minute": {
+            "log_offset_s": burst_start * speed,
+            "requests": burst_count,
+            "intended_rps": burst_count / burst_window_s,
+            "dispatch_lag_ms": lag_summary(burst_lags),
+        },
+        "total": total.as_dict(wall_s),
+        "endpoints": {name: s.as_dict(wall_s) for name, s in sorted(replayer.endpoints.items())},
+    }
+
+
+def print_report(report: Dict, counts: Dict[str, int]):
+    print("\n" + "=" * 100)
+    print(f"📼 REPLAY SUMMARY — {report['requests']} requests at {report['speed']:g}× "
+          f"({report['intended_duration_s']:.1f}s intended, {report['achieved_duration_s']:.1f}s achieved)")
+    print("=" * 100)
+    print(f"{'Endpoint':<52}{'Reqs':>8}{'Err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, s in list(report["endpoints"].items()) + [("TOTAL", report["total"])]:
+        lat = s["latency_ms"]
+        print(f"{name:<52}{s['requests']:>8}{s['error_rate'] * 100:>6.1f}%"
+              f"{lat['p50']:>9.1f}{lat['p95']:>9.1f}{lat['p99']:>9.1f}{lat['max']:>9.1f}")
+    print("(latencies in ms, measured from the intended send time)")
+
+    lag, burst = report["dispatch_lag_ms"], report["busiest_minute"]
+    print(f"\n🕒 Schedule lag: p50 {lag['p50']:.1f} ms, p95 {lag['p95']:.1f} ms, p99 {lag['p99']:.1f} ms, "
+          f"max {lag['max']:.1f} ms; {lag['late_fraction']:.1%} sent more than {LATE_MS} ms late")
+    print(f"🔥 Busiest log minute (+{burst['log_offset_s']:.0f}s): {burst['requests']} requests, "
+          f"{burst['intended_rps']:.1f} req/s intended, lag p95 {burst['dispatch_lag_ms']['p95']:.1f} ms, "
+          f"{burst['dispatch_lag_ms']['late_fraction']:.1%} late")
+    if lag["late_fraction"] > 0.05:
+        print("⚠️  The replayer could not keep up with the schedule; raise --max-connections or lower --speed")
+    print(f"🕵️  {counts['scenario']} mapped to scenario builders, {counts['pseudonymised']} pseudonymised, "
+          f"skipped {counts['admin']} admin, {counts['unsafe']} unsafe-route and {counts['unmatched_write']} "
+          "unmatched write requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay production access logs with their original timing")
+    parser.add_argument("log", help="Access log: common/combined format or NDJSON, optionally gzipped")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay this many times faster than recorded")
+    parser.add_argument("--start", help="Only replay entries at or after this ISO timestamp")
+    parser.add_argument("--end", help="Only replay entries before this ISO timestamp")
+    parser.add_argument("--limit", type=int, help="Replay at most this many requests")
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO, help="Scenario whose request builders IDs map onto")
+    parser.add_argument("--salt", help="Pseudonymisation key (default: random per run)")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--dry-run", action="store_true", help="Print the anonymised plan without sending anything")
+    parser.add_argument("--output", help="Write the replay report as JSON to this path")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    entries, skipped = read_log(args.log)
+    if args.start:
+        entries = [e for e in entries if e.timestamp >= parse_time(args.start)]
+    if args.end:
+        entries = [e for e in entries if e.timestamp < parse_time(args.end)]
+    spread_within_seconds(entries)
+    anonymiser = Anonymiser(LoadScenario.from_file(args.scenario),
+                            args.salt.encode() if args.salt else secrets.token_bytes(16))
+    planned = plan_replay(entries, anonymiser, args.speed)[:args.limit]
+
+    print("📼 ACCESS-LOG REPLAY")
+    print("=" * 70)
+    print(f"{len(entries)} /api/ entries read from {args.log} ({skipped} other lines skipped); "
+          f"{len(planned)} to replay at {args.speed:g}× against {args.base_url}")
+    if not planned:
+        print("❌ Nothing to replay")
+        return 1
+    if args.dry_run:
+        for request in planned[:50]:
+            print(f"  +{request.offset_s:9.3f}s {request.method:<6} {request.path}")
+        print(f"  ... {max(0, len(planned) - 50)} more" if len(planned) > 50 else "")
+        return 0
+
+    async def _run():
+        client = AsyncApiClient(args.base_url, timeout=args.timeout, retry=NO_RETRY,
+                                max_connections=args.max_connections)
+        replayer = LogReplayer(client)
+        try:
+            wall_s = await replayer.run(planned)
+        finally:
+            print(client.stats.summary())
+            await client.aclose()
+        return replayer, wall_s
+
+    replayer, wall_s = asyncio.run(_run())
+    report = analyze(replayer, planned, wall_s, args.speed)
+    print_report(report, anonymiser.counts)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({**report, "mapping": anonymiser.counts}, f, indent=2)
+        print(f"📝 Replay report written to {args.output}")
+    return 1 if report["total"]["error_rate"] > 0.01 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Response payload size and compression audit.
+Fetches every public read endpoint and records the size on the wire as served,
+the raw JSON size and what gzip and brotli would make of it, the estimated
+download time on a weak 4G link, and the fields that take up the most bytes
+(e.g. photo arrays in gallery/themes/[slug], descriptions in /api/events).
+List endpoints are probed with ?limit/&page; those that ignore both return
+every document on each request and are flagged, with the size they would reach
+at 10× today's data. Each run is appended to a history file and compared with
+the previous run against the same base URL.
+
+Brotli sizes need the brotli package (pip install brotli); without it they are
+left out.
+
+Usage:
+    python payload_audit.py [--base-url http://localhost:3000/api] [--budget-kb 100] [--output payload.json]
+    python backend_test.py --payload-audit
+"""
+
+import argparse
+import gzip
+import importlib.util
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from api_client import ApiClient, DEFAULT_API_BASE, NO_RETRY
+from perf_report import fit_power_law
+
+PUBLIC_ENDPOINTS = {
+    "GET /api/events": "events",
+    "GET /api/events/[slug]": "events/{event_slug}",
+    "GET /api/gallery": "gallery",
+    "GET /api/gallery/themes": "gallery/themes",
+    "GET /api/gallery/themes/[slug]": "gallery/themes/{theme_slug}",
+    "GET /api/testimonials": "testimonials",
+    "GET /api/team": "team",
+    "GET /api/brands": "brands",
+    "GET /api/settings": "settings",
+    "GET /api/stats": "stats",
+}
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_reports", "payload_history.jsonl")
+# Level/quality a server typically uses when compressing dynamic responses on the fly
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# A congested venue connection: ~1.5 Mbit/s down with a 150 ms round trip
+WEAK_4G_KBPS = 1500
+WEAK_4G_RTT_MS = 150
+PAGE_PROBE = {"limit": 2, "page": 2}
+TOP_FIELDS = 5
+
+
+def brotli_available() -> bool:
+    if importlib.util.find_spec("brotli") is None:
+        print("⚠️  brotli is not installed; brotli sizes will not be reported (pip install brotli)")
+        return False
+    return True
+
+
+def weak_4g_ms(size: int) -> float:
+    """Request round trip plus serialisation time of `size` bytes on the weak 4G link"""
+    return WEAK_4G_RTT_MS + size * 8 / WEAK_4G_KBPS
+
+
+def compact(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def field_sizes(value: Any, path: str = "$", sizes: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Bytes each leaf field path takes up across the document, list items folded into '[]'"""
+    sizes = {} if sizes is None else sizes
+    if isinstance(value, dict):
+        for key, item in value.items():
+            field_sizes(item, f"{path}.{key}", sizes)
+    elif isinstance(value, list):
+        for item in value:
+            field_sizes(item, f"{path}[]", sizes)
+    else:
+        sizes[path] = sizes.get(path, 0) + len(compact(value))
+    return sizes
+
+
+def top_level_lists(body: Any) -> Dict[str, int]:
+    """Item counts of the arrays directly under the response object"""
+    if isinstance(body, list):
+        return {"$": len(body)}
+    if not isinstance(body, dict):
+        return {}
+    return {f"$.{key}": len(value) for key, value in body.items() if isinstance(value, list)}
+
+
+class PayloadAuditor:
+    def __init__(self, client: ApiClient, brotli: bool):
+        self.client = client
+        self.brotli = brotli
+
+    def resolve(self, template: str) -> Optional[str]:
+        """Fill in detail-endpoint slugs from the first item of the matching list"""
+        for placeholder, listing, key in (("event_slug", "events", "events"), ("theme_slug", "gallery/themes", "themes")):
+            if f"{{{placeholder}}}" in template:
+                items = self.client.get(listing).json().get(key) or []
+                slug = items[0].get("slug") if items else None
+                return template.format(**{placeholder: slug}) if slug else None
+        return template
+
+    def audit(self, path: str) -> Dict:
+        response = self.client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        timing = response.extensions["timing"]
+        body = response.json()
+        raw = compact(body)
+        sizes = {
+            "wire": timing.response_bytes,
+            "served_raw": len(response.content),
+            "raw": len(raw),
+            "gzip": len(gzip.compress(raw, GZIP_LEVEL)),
+        }
+        if self.brotli:
+            import brotli
+            sizes["brotli"] = len(brotli.compress(raw, quality=BROTLI_QUALITY))
+        best = min(size for name, size in sizes.items() if name not in ("wire", "served_raw"))
+
+        fields = field_sizes(body)
+        largest = sorted(fields.items(), key=lambda item: item[1], reverse=True)[:TOP_FIELDS]
+        lists = top_level_lists(body)
+        result = {
+            "path": path,
+            "content_encoding": response.headers.get("content-encoding", "identity"),
+            "sizes": sizes,
+            "weak_4g_ms": {"as_served": weak_4g_ms(sizes["wire"]), "best": weak_4g_ms(best)},
+            "largest_fields": [{"field": name, "bytes": size, "share": size / len(raw)} for name, size in largest],
+            "lists": lists,
+            "unpaginated": [],
+        }
+        if lists:
+            result["unpaginated"] = self.unpaginated(path, lists)
+        return result
+
+    def unpaginated(self, path: str, lists: Dict[str, int]) -> List[Dict]:
+        """Arrays that come back the same length when the request asks for a page of PAGE_PROBE['limit']"""
+        probe = self.client.get(path, params=PAGE_PROBE)
+        if probe.status_code != 200:
+            return []
+        paged = top_level_lists(probe.json())
+        flagged = []
+        for field, count in lists.items():
+            if count > PAGE_PROBE["limit"] and paged.get(field) == count:
+                flagged.append({"field": field, "items": count})
+        return flagged
+
+    def run(self, endpoints: Dict[str, str]) -> Dict[str, Dict]:
+        results = {}
+        for name, template in endpoints.items():
+            try:
+                path = self.resolve(template)
+                if path is None:
+                    print(f"  ⏭️  {name}: nothing published to resolve the slug")
+                    continue
+                results[name] = self.audit(path)
+            except (httpx.HTTPError, RuntimeError, ValueError) as e:
+                print(f"  ❌ {name}: {e}")
+                results[name] = {"path": template, "error": str(e)}
+                continue
+            result = results[name]
+            sizes = result["sizes"]
+            print(f"  {'⚠️ ' if result['unpaginated'] else '✅'} {name:<32} raw {sizes['raw']:>9,} B  "
+                  f"gzip {sizes['gzip']:>8,} B  wire {sizes['wire']:>9,} B ({result['content_encoding']})")
+        return results
+
+
+def load_history(path: str, base_url: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return [run for run in runs if run["base_url"] == base_url]
+
+
+def append_history(path: str, base_url: str, results: Dict[str, Dict]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entry = {
+        "timestamp": time.time(),
+        "base_url": base_url,
+        "endpoints": {name: {"raw": r["sizes"]["raw"], "gzip": r["sizes"]["gzip"], "items": sum(r["lists"].values())}
+                      for name, r in results.items() if "error" not in r},
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def growth_against_history(history: List[Dict], results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Change since the previous run and, over three or more runs, raw size ≈ a · items^b"""
+    trends = {}
+    for name, result in results.items():
+        if "error" in result:
+            continue
+        points = [(run["endpoints"][name]["items"], run["endpoints"][name]["raw"])
+                  for run in history if name in run["endpoints"]]
+        if not points:
+            continue
+        items, raw = sum(result["lists"].values()), result["sizes"]["raw"]
+        previous_items, previous_raw = points[-1]
+        trend = {"runs": len(points) + 1, "previous_raw": previous_raw, "raw_change": raw - previous_raw,
+                 "previous_items": previous_items, "items_change": items - previous_items}
+        points.append((items, raw))
+        if len({p[0] for p in points if p[0] > 0}) >= 3:
+            usable = [p for p in points if p[0] > 0]
+            _, exponent, r2 = fit_power_law([p[0] for p in usable], [p[1] for p in usable])
+            trend.update({"size_vs_items_exponent": exponent, "r_squared": r2})
+        trends[name] = trend
+    return trends
+
+
+def print_report(results: Dict[str, Dict], trends: Dict[str, Dict], budget_kb: Optional[float]):
+    print("\n" + "=" * 70)
+    print("📦 PAYLOAD REPORT")
+    print("=" * 70)
+    print(f"(weak 4G ≈ {WEAK_4G_KBPS / 1000:.1f} Mbit/s, {WEAK_4G_RTT_MS} ms RTT; "
+          f"gzip level {GZIP_LEVEL}, brotli quality {BROTLI_QUALITY})")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"\n❌ {name}: {result['error']}")
+            continue
+        sizes, download = result["sizes"], result["weak_4g_ms"]
+        compressed = f"gzip {sizes['gzip']:,} B" + (f", brotli {sizes['brotli']:,} B" if "brotli" in sizes else "")
+        print(f"\n📦 {name}  ({result['path']})")
+        print(f"   raw {sizes['raw']:,} B → {compressed}; served as {result['content_encoding']}, "
+              f"{sizes['wire']:,} B on the wire")
+        print(f"   weak 4G: {download['as_served']:,.0f} ms as served, {download['best']:,.0f} ms best compressed")
+        if result["content_encoding"] == "identity" and sizes["raw"] > 1024:
+            print(f"   ⚠️  sent uncompressed; gzip alone would save {1 - sizes['gzip'] / sizes['raw']:.0%}")
+        if budget_kb and sizes["wire"] > budget_kb * 1024:
+            print(f"   🚨 {sizes['wire'] / 1024:,.1f} KB on the wire exceeds the {budget_kb:g} KB budget")
+        for field in result["largest_fields"]:
+            print(f"     {field['field']:<44} {field['bytes']:>9,} B  {field['share']:>5.1%}")
+        for flagged in result["unpaginated"]:
+            per_item = sizes["raw"] / flagged["items"]
+            print(f"   ⚠️  {flagged['field']} is unpaginated: all {flagged['items']} items on every request "
+                  f"(~{per_item:,.0f} B each, ~{per_item * flagged['items'] * 10 / 1024:,.0f} KB raw at 10× the data)")
+        trend = trends.get(name)
+        if trend:
+            line = (f"   📈 vs previous run: {trend['raw_change']:+,} B raw, {trend['items_change']:+,} items "
+                    f"({trend['runs']} runs tracked)")
+            if "size_vs_items_exponent" in trend:
+                line += f"; size ∝ items^{trend['size_vs_items_exponent']:.2f} (R²={trend['r_squared']:.2f})"
+            print(line)
+
+    audited = [r for r in results.values() if "error" not in r]
+    print(f"\n📊 {sum(r['sizes']['wire'] for r in audited):,} B on the wire for one read of each endpoint; "
+          f"{sum(1 for r in audited if r['unpaginated'])} unpaginated list endpoint(s)")
+
+
+def over_budget(results: Dict[str, Dict], budget_kb: Optional[float]) -> List[str]:
+    if not budget_kb:
+        return []
+    return [name for name, r in results.items() if "error" not in r and r["sizes"]["wire"] > budget_kb * 1024]
+
+
+def run_payload_audit(base_url: str = DEFAULT_API_BASE, history_path: Optional[str] = HISTORY_PATH,
+                      report_path: Optional[str] = None, budget_kb: Optional[float] = None,
+                      timeout: float = 30) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Audit PUBLIC_ENDPOINTS, print the report, record the run in the history file and optionally write JSON"""
+    print("📦 PAYLOAD SIZE AUDIT")
+    print("=" * 70)
+    client = ApiClient(base_url, timeout=timeout, retry=NO_RETRY)
+    try:
+        results = PayloadAuditor(client, brotli_available()).run(PUBLIC_ENDPOINTS)
+    finally:
+        client.close()
+
+    trends = {}
+    if history_path:
+        trends = growth_against_history(load_history(history_path, base_url), results)
+        append_history(history_path, base_url, results)
+    print_report(results, trends, budget_kb)
+    if history_path:
+        print(f"🗂️  Run appended to {history_path}")
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump({"base_url": base_url, "endpoints": results, "trends": trends}, f, indent=2)
+        print(f"📝 Report written to {report_path}")
+    return results, trends
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Response payload size and compression audit")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON-lines file the runs are tracked in")
+    parser.add_argument("--no-history", action="store_true", help="Neither read nor append the history file")
+    parser.add_argument("--budget-kb", type=float, help="Fail when an endpoint sends more than this many KB")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results, _ = run_payload_audit(args.base_url, None if args.no_history else args.history,
+                                   args.output, args.budget_kb, args.timeout)
+    failed = [name for name, r in results.items() if "error" in r] + over_budget(results, args.budget_kb)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
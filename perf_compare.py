@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Performance regression gate.
+Compares a candidate perf report against a stored baseline endpoint by endpoint
+and exits non-zero when any endpoint's p95 regresses past the threshold with
+statistical significance (one-sided Mann-Whitney U or a bootstrap CI on p95).
+
+Usage:
+    python perf_compare.py baseline.json candidate.json [--threshold 0.10] [--method bootstrap]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from perf_report import percentile
+
+
+@dataclass
+class EndpointComparison:
+    endpoint: str
+    baseline_p95: float
+    candidate_p95: float
+    change: float
+    p_value: Optional[float]
+    ci: Optional[Tuple[float, float]]
+    verdict: str  # "regression", "improvement", "ok" or "insufficient data"
+
+    @property
+    def regressed(self) -> bool:
+        return self.verdict == "regression"
+
+
+def mann_whitney_greater(baseline: List[float], candidate: List[float]) -> float:
+    """One-sided p-value that candidate latencies are stochastically greater (normal approximation)"""
+    n_a, n_b = len(baseline), len(candidate)
+    combined = sorted([(v, 0) for v in baseline] + [(v, 1) for v in candidate])
+    n = n_a + n_b
+
+    # Average ranks over ties and accumulate the tie correction term
+    rank_sum_b = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum_b += avg_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 1)
+        i = j + 1
+
+    u_b = rank_sum_b - n_b * (n_b + 1) / 2
+    mean = n_a * n_b / 2
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_b - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_p95_change(baseline: List[float], candidate: List[float], alpha: float,
+                         iterations: int = 2000, seed: int = 1) -> Tuple[float, float]:
+    """(1 - alpha) confidence interval for the relative change in p95, candidate vs baseline"""
+    rng = random.Random(seed)
+    changes = []
+    for _ in range(iterations):
+        base_p95 = percentile(rng.choices(baseline, k=len(baseline)), 95)
+        cand_p95 = percentile(rng.choices(candidate, k=len(candidate)), 95)
+        if base_p95 > 0:
+            changes.append(cand_p95 / base_p95 - 1)
+    return percentile(changes, 100 * alpha / 2), percentile(changes, 100 * (1 - alpha / 2))
+
+
+def compare_endpoint(endpoint: str, baseline: List[float], candidate: List[float], threshold: float,
+                     alpha: float, method: str, min_samples: int) -> EndpointComparison:
+    base_p95 = percentile(baseline, 95)
+    cand_p95 = percentile(candidate, 95)
+    change = cand_p95 / base_p95 - 1 if base_p95 > 0 else 0.0
+
+    if len(baseline) < min_samples or len(candidate) < min_samples:
+        return EndpointComparison(endpoint, base_p95, cand_p95, change, None, None, "insufficient data")
+
+    p_value, ci = None, None
+    if method == "bootstrap":
+        ci = bootstrap_p95_change(baseline, candidate, alpha)
+        significant_slower, significant_faster = ci[0] > 0, ci[1] < 0
+    else:
+        p_value = mann_whitney_greater(baseline, candidate)
+        significant_slower = p_value < alpha
+        significant_faster = mann_whitney_greater(candidate, baseline) < alpha
+
+    if significant_slower and change > threshold:
+        verdict = "regression"
+    elif significant_faster and change < -threshold:
+        verdict = "improvement"
+    else:
+        verdict = "ok"
+    return EndpointComparison(endpoint, base_p95, cand_p95, change, p_value, ci, verdict)
+
+
+def load_samples(path: str) -> Dict[str, List[float]]:
+    with open(path) as f:
+        report = json.load(f)
+    return {endpoint: stats.get("samples_ms", []) for endpoint, stats in report.get("endpoints", {}).items()}
+
+
+def compare_reports(baseline_path: str, candidate_path: str, threshold: float = 0.10, alpha: float = 0.05,
+                    method: str = "mannwhitney", min_samples: int = 5) -> List[EndpointComparison]:
+    baseline = load_samples(baseline_path)
+    candidate = load_samples(candidate_path)
+    return [
+        compare_endpoint(endpoint, baseline[endpoint], candidate[endpoint], threshold, alpha, method, min_samples)
+        for endpoint in sorted(baseline.keys() & candidate.keys())
+    ]
+
+
+def print_comparison(comparisons: List[EndpointComparison], threshold: float):
+    print("\n" + "=" * 100)
+    print(f"🏁 PERFORMANCE GATE (p95, regression threshold {threshold:.0%})")
+    print("=" * 100)
+    icons = {"regression": "❌", "improvement": "🚀", "ok": "✅", "insufficient data": "⚪"}
+    for c in comparisons:
+        stat = f"p={c.p_value:.3f}" if c.p_value is not None else (
+            f"CI=[{c.ci[0]:+.1%}, {c.ci[1]:+.1%}]" if c.ci else "")
+        print(f"  {icons[c.verdict]} {c.endpoint:<52}{c.baseline_p95:>9.1f} → {c.candidate_p95:>9.1f} ms "
+              f"({c.change:+.1%}) {stat}  {c.verdict}")
+    regressions = [c for c in comparisons if c.regressed]
+    if regressions:
+        print(f"\n🚨 {len(regressions)} endpoint(s) regressed past {threshold:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a candidate perf report against a baseline")
+    parser.add_argument("baseline", help="Baseline perf_report.json")
+    parser.add_argument("candidate", help="Candidate perf_report.json")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative p95 increase that counts as a regression (0.10 = 10%%)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    parser.add_argument("--method", choices=("mannwhitney", "bootstrap"), default="mannwhitney")
+    parser.add_argument("--min-samples", type=int, default=5,
+                        help="Endpoints with fewer samples on either side are reported but not gated")
+    args = parser.parse_args()
+
+    comparisons = compare_reports(args.baseline, args.candidate, args.threshold, args.alpha,
+                                  args.method, args.min_samples)
+    print_comparison(comparisons, args.threshold)
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Per-request timing collection and machine-readable performance reports.
+Groups RequestTimings from the shared API client by endpoint template,
+computes p50/p95/p99 per endpoint and writes JSON plus JUnit XML (with the
+timings as <properties>) to test_reports/pytest.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+from api_client import RequestTiming
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_reports", "pytest")
+REPORT_PHASES = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "total_ms")
+
+# Dynamic path segments of the catch-all API route, most specific first
+ROUTE_TEMPLATES = [
+    (re.compile(r"^admin/gallery/themes/[^/]+/photos$"), "admin/gallery/themes/[id]/photos"),
+    (re.compile(r"^admin/gallery/themes/[^/]+/reorder$"), "admin/gallery/themes/[id]/reorder"),
+    (re.compile(r"^admin/gallery/photos/set-cover$"), "admin/gallery/photos/set-cover"),
+    (re.compile(r"^admin/gallery/themes/[^/]+$"), "admin/gallery/themes/[id]"),
+    (re.compile(r"^admin/gallery/photos/[^/]+$"), "admin/gallery/photos/[id]"),
+    (re.compile(r"^admin/events/[^/]+/stats$"), "admin/events/[id]/stats"),
+    (re.compile(r"^admin/(events|team|brands|partners|contacts|newsletter)/(?!reply$|read$)[^/]+$"),
+     r"admin/\1/[id]"),
+    (re.compile(r"^admin/gallery/(?!themes$|photos$)[^/]+$"), "admin/gallery/[id]"),
+    (re.compile(r"^gallery/themes/[^/]+$"), "gallery/themes/[slug]"),
+    (re.compile(r"^events/(?!migrate$)[^/]+$"), "events/[slug]"),
+]
+
+
+def endpoint_template(method: str, url: str) -> str:
+    """'GET https://host/api/gallery/themes/holi-2024' -> 'GET /api/gallery/themes/[slug]'"""
+    parts = urlsplit(url)
+    path = f"{parts.path}/".split("/api/", 1)[-1].strip("/")
+    for pattern, template in ROUTE_TEMPLATES:
+        if pattern.match(path):
+            path = pattern.sub(template, path)
+            break
+    query = "&".join(f"{key}=[{key}]" for key, _ in parse_qsl(parts.query))
+    return f"{method} /api/{path}" + (f"?{query}" if query else "")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linear-interpolated percentile (the numpy default) of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def fit_power_law(sizes: List[float], values: List[float]):
+    """Least-squares fit of value = a * size^b in log-log space; returns (a, b, r_squared)"""
+    points = [(math.log(n), math.log(v)) for n, v in zip(sizes, values) if n > 0 and v > 0]
+    if len(points) < 2:
+        return 0.0, 0.0, 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    if sxx == 0:
+        return 0.0, 0.0, 0.0
+    b = sxy / sxx
+    a = math.exp(mean_y - b * mean_x)
+    r_squared = (sxy * sxy) / (sxx * syy) if syy else 1.0
+    return a, b, r_squared
+
+
+def fit_line(points: List[Tuple[float, float]]) -> Tuple[float, float, float]:
+    """Least-squares y = intercept + slope * x; returns (slope, intercept, standard error of slope)"""
+    n = len(points)
+    if n < 3:
+        return 0.0, 0.0, 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if sxx == 0:
+        return 0.0, mean_y, 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    intercept = mean_y - slope * mean_x
+    residual = sum((y - intercept - slope * x) ** 2 for x, y in points) / (n - 2)
+    return slope, intercept, (residual / sxx) ** 0.5
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "min": min(samples) if samples else 0.0,
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples) if samples else 0.0,
+    }
+
+
+class PerfRecorder:
+    """
+    Thread-safe sink for RequestTimings; register with ApiClient.add_listener(recorder.record).
+    Keeps every request in memory unless given a result_sink.ResultSink, which streams them
+    to disk and summarises them with sketches instead.
+    """
+
+    def __init__(self, current_test=None, sink=None):
+        self.current_test = current_test
+        self.sink = sink
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, timing: RequestTiming):
+        entry = timing.as_dict()
+        entry["endpoint"] = endpoint_template(timing.method, timing.url)
+        entry["test"] = self.current_test.get() if self.current_test is not None else None
+        if self.sink is not None:
+            self.sink.write_request(entry)
+            return
+        with self._lock:
+            self.requests.append(entry)
+
+    def requests_for(self, test: str) -> List[Dict[str, Any]]:
+        return [r for r in self.requests if r["test"] == test]
+
+    def endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        if self.sink is not None:
+            return self.sink.endpoints.endpoint_stats()
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in self.requests:
+            grouped.setdefault(entry["endpoint"], []).append(entry)
+
+        stats = {}
+        for endpoint, entries in sorted(grouped.items()):
+            totals = [e["total_ms"] for e in entries]
+            stats[endpoint] = {
+                **summarize(totals),
+                "phases_p50_ms": {phase: percentile([e[phase] for e in entries], 50) for phase in REPORT_PHASES},
+                "request_bytes": sum(e["request_bytes"] for e in entries),
+                "response_bytes": sum(e["response_bytes"] for e in entries),
+                "samples_ms": totals,
+            }
+        return stats
+
+    def print_endpoint_table(self):
+        stats = self.endpoint_stats()
+        if not stats:
+            return
+        print("\n⏱️  ENDPOINT LATENCY (ms):")
+        print(f"  {'Endpoint':<52}{'n':>4}{'p50':>9}{'p95':>9}{'p99':>9}{'ttfb p50':>10}")
+        for endpoint, s in stats.items():
+            print(f"  {endpoint:<52}{s['count']:>4}{s['p50']:>9.1f}{s['p95']:>9.1f}{s['p99']:>9.1f}"
+                  f"{s['phases_p50_ms']['ttfb_ms']:>10.1f}")
+
+    def write_json(self, path: str, results: List[Dict[str, Any]], metadata: Optional[Dict] = None):
+        report = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "metadata": metadata or {},
+            "results": [{k: v for k, v in r.items() if k != "data"} for r in results],
+            "endpoints": self.endpoint_stats(),
+            "requests": self.requests,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+    def write_junit(self, path: str, results: List[Dict[str, Any]], suite_name: str = "backend_test",
+                    durations: Optional[Dict[str, float]] = None):
+        failures = [r for r in results if not r["success"]]
+        total_time = sum((durations or {}).values())
+        suite = ET.Element("testsuite", name=suite_name, tests=str(len(results)),
+                           failures=str(len(failures)), errors="0", time=f"{total_time:.3f}")
+
+        suite_props = ET.SubElement(suite, "properties")
+        for endpoint, s in self.endpoint_stats().items():
+            for key in ("p50", "p95", "p99"):
+                ET.SubElement(suite_props, "property", name=f"{endpoint} {key}_ms", value=f"{s[key]:.2f}")
+        if self.sink is not None:
+            # Streamed requests are not kept in memory, so the per-testcase request properties are left out
+            ET.SubElement(suite_props, "property", name="requests",
+                          value=f"streamed to {len(self.sink.paths)} sink chunk(s); per-request properties omitted")
+
+        for result in results:
+            test_func = result.get("test_func") or suite_name
+            case = ET.SubElement(suite, "testcase", classname=f"{suite_name}.{test_func}", name=result["test"],
+                                 time=f"{(durations or {}).get(test_func, 0.0):.3f}")
+            case_props = ET.SubElement(case, "properties")
+            for i, entry in enumerate(self.requests_for(result.get("test_func"))):
+                prefix = f"request.{i}.{entry['endpoint']}"
+                ET.SubElement(case_props, "property", name=f"{prefix}.status", value=str(entry["status_code"]))
+                for phase in REPORT_PHASES:
+                    ET.SubElement(case_props, "property", name=f"{prefix}.{phase}", value=f"{entry[phase]:.2f}")
+                ET.SubElement(case_props, "property", name=f"{prefix}.response_bytes",
+                              value=str(entry["response_bytes"]))
+            if not result["success"]:
+                ET.SubElement(case, "failure", message=result["message"])
+
+        tree = ET.ElementTree(suite)
+        ET.indent(tree)
+        tree.write(path, encoding="utf-8", xml_declaration=True)
+
+    def write_reports(self, results: List[Dict[str, Any]], report_dir: str = REPORT_DIR,
+                      metadata: Optional[Dict] = None, durations: Optional[Dict[str, float]] = None):
+        """Write perf_report.json and junit.xml into `report_dir`; returns both paths"""
+        os.makedirs(report_dir, exist_ok=True)
+        json_path = os.path.join(report_dir, "perf_report.json")
+        junit_path = os.path.join(report_dir, "junit.xml")
+        self.write_json(json_path, results, metadata)
+        self.write_junit(junit_path, results, durations=durations)
+        return json_path, junit_path
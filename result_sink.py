@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Streaming sinks for check results and per-request timings.
+Instead of keeping every record in a list, the harness hands each compact
+record (no parsed response bodies, no response headers) to a sink that appends
+it to rotating chunk files: NDJSON (optionally gzipped) or Parquet. Alongside,
+the sink keeps per-endpoint HDR histograms and a bounded reservoir of raw
+samples, so the endpoint table, perf report and regression gate are computed
+from constant memory however long the run is. The JUnit report keeps its
+per-endpoint percentiles but drops the per-request testcase properties, which
+would need every request in memory; those requests are in the chunks.
+
+Chunks are named <prefix>-<kind>-<n>.ndjson[.gz] / .parquet, kind being
+"results" or "requests". Parquet chunks load straight into pandas, DuckDB or
+pyarrow.dataset; `python result_sink.py summarize DIR` streams a directory of
+request chunks back through the same sketches.
+
+Requires hdrhistogram (imported as hdrh); Parquet additionally needs pyarrow.
+
+Usage:
+    python backend_test.py --repeat 1000 --sink ndjson --sink-dir test_reports/stream
+    python result_sink.py summarize test_reports/stream
+"""
+
+import argparse
+import glob
+import gzip
+import importlib.util
+import json
+import os
+import random
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+from hdrh.histogram import HdrHistogram
+
+from perf_report import REPORT_PHASES
+
+# Microsecond resolution from 1us to 60s at 3 significant digits, as in load_generator
+HISTOGRAM_MAX_US = 60_000_000
+RESERVOIR_SIZE = 2000
+DEFAULT_ROTATE_RECORDS = 500_000
+SINK_FORMATS = ("ndjson", "ndjson.gz", "parquet")
+
+
+class LatencySketch:
+    """HDR histogram of millisecond values plus a uniform reservoir sample for rank tests"""
+
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE):
+        self.histogram = HdrHistogram(1, HISTOGRAM_MAX_US, 3)
+        self.reservoir: List[float] = []
+        self.reservoir_size = reservoir_size
+        self.count = 0
+
+    def add(self, value_ms: float):
+        self.histogram.record_value(min(HISTOGRAM_MAX_US, max(1, int(value_ms * 1000))))
+        self.count += 1
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(value_ms)
+        else:
+            # Algorithm R: every value seen so far is in the reservoir with equal probability
+            slot = random.randrange(self.count)
+            if slot < self.reservoir_size:
+                self.reservoir[slot] = value_ms
+
+    def percentile(self, p: float) -> float:
+        return self.histogram.get_value_at_percentile(p) / 1000 if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        h = self.histogram
+        return {
+            "count": self.count,
+            "min": h.get_min_value() / 1000 if self.count else 0.0,
+            "mean": h.get_mean_value() / 1000 if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": h.get_max_value() / 1000 if self.count else 0.0,
+        }
+
+
+class EndpointSketches:
+    """Incremental replacement for PerfRecorder.endpoint_stats(); same output shape"""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, LatencySketch]] = {}
+        self.bytes: Dict[str, Dict[str, int]] = {}
+
+    def add(self, entry: Dict[str, Any]):
+        endpoint = entry["endpoint"]
+        phases = self.phases.get(endpoint)
+        if phases is None:
+            phases = self.phases[endpoint] = {phase: LatencySketch() for phase in REPORT_PHASES}
+            self.bytes[endpoint] = {"request_bytes": 0, "response_bytes": 0}
+        for phase, sketch in phases.items():
+            sketch.add(entry[phase])
+        for key in ("request_bytes", "response_bytes"):
+            self.bytes[endpoint][key] += entry[key]
+
+    def endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {}
+        for endpoint, phases in sorted(self.phases.items()):
+            total = phases["total_ms"]
+            stats[endpoint] = {
+                **total.summary(),
+                "phases_p50_ms": {phase: sketch.percentile(50) for phase, sketch in phases.items()},
+                **self.bytes[endpoint],
+                "samples_ms": list(total.reservoir),
+            }
+        return stats
+
+
+class ResultSink(ABC):
+    """Base sink: rotating chunk bookkeeping and the running endpoint sketches"""
+
+    extension = ""
+
+    def __init__(self, directory: str, prefix: str = "run", rotate_records: int = DEFAULT_ROTATE_RECORDS):
+        self.directory = directory
+        self.prefix = prefix
+        self.rotate_records = rotate_records
+        self.endpoints = EndpointSketches()
+        self.paths: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self._chunks: Dict[str, int] = {}
+        self._in_chunk: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def write_request(self, entry: Dict[str, Any]):
+        record = {k: v for k, v in entry.items() if k != "response_headers"}
+        with self._lock:
+            self.endpoints.add(record)
+            self._append("requests", record)
+
+    def write_result(self, record: Dict[str, Any]):
+        with self._lock:
+            self._append("results", record)
+
+    def _append(self, kind: str, record: Dict[str, Any]):
+        if self._in_chunk.get(kind, self.rotate_records) >= self.rotate_records:
+            self._rotate(kind)
+        self._write(kind, record)
+        self._in_chunk[kind] += 1
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def _rotate(self, kind: str):
+        self._close_chunk(kind)
+        self._chunks[kind] = self._chunks.get(kind, 0) + 1
+        self._in_chunk[kind] = 0
+        path = os.path.join(self.directory, f"{self.prefix}-{kind}-{self._chunks[kind]:05d}{self.extension}")
+        self.paths.append(path)
+        self._open_chunk(kind, path)
+
+    @abstractmethod
+    def _open_chunk(self, kind: str, path: str):
+        """Start a new chunk file for `kind` at `path`"""
+
+    @abstractmethod
+    def _write(self, kind: str, record: Dict[str, Any]):
+        """Append one record to the open `kind` chunk"""
+
+    @abstractmethod
+    def _close_chunk(self, kind: str):
+        """Flush and close the open `kind` chunk, if any"""
+
+    def close(self):
+        with self._lock:
+            for kind in list(self._chunks):
+                self._close_chunk(kind)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"format": self.extension.lstrip("."), "records": dict(self.counts), "paths": list(self.paths)}
+
+
+class NdjsonSink(ResultSink):
+    """One compact JSON object per line; compress=True gzips the chunks"""
+
+    def __init__(self, *args, compress: bool = False, **kwargs):
+        self.compress = compress
+        self.extension = ".ndjson.gz" if compress else ".ndjson"
+        self._files: Dict[str, Any] = {}
+        super().__init__(*args, **kwargs)
+
+    def _open_chunk(self, kind: str, path: str):
+        self._files[kind] = gzip.open(path, "wt") if self.compress else open(path, "w")
+
+    def _write(self, kind: str, record: Dict[str, Any]):
+        self._files[kind].write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def _close_chunk(self, kind: str):
+        f = self._files.pop(kind, None)
+        if f is not None:
+            f.close()
+
+
+class ParquetSink(ResultSink):
+    """Columnar chunks via pyarrow, written in row groups of `batch_size` records"""
+
+    extension = ".parquet"
+
+    def __init__(self, *args, batch_size: int = 10_000, **kwargs):
+        import pyarrow as pa
+        self.pa = pa
+        self.batch_size = batch_size
+        self.schemas = {
+            "requests": pa.schema([
+                ("endpoint", pa.string()), ("method", pa.string()), ("url", pa.string()),
+                ("test", pa.string()), ("status_code", pa.int32()), ("started_at", pa.float64()),
+                *[(phase, pa.float64()) for phase in REPORT_PHASES],
+                ("request_bytes", pa.int64()), ("response_bytes", pa.int64()),
+                ("reused_connection", pa.bool_()), ("http_version", pa.string()),
+                ("attempts", pa.int32()), ("cache", pa.string()),
+            ]),
+            "results": pa.schema([
+                ("test", pa.string()), ("test_func", pa.string()), ("success", pa.bool_()), ("message", pa.string()),
+            ]),
+        }
+        self._writers: Dict[str, Any] = {}
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        super().__init__(*args, **kwargs)
+
+    def _open_chunk(self, kind: str, path: str):
+        import pyarrow.parquet as pq
+        self._writers[kind] = pq.ParquetWriter(path, self.schemas[kind], compression="zstd")
+        self._buffers[kind] = []
+
+    def _write(self, kind: str, record: Dict[str, Any]):
+        buffer = self._buffers[kind]
+        buffer.append(record)
+        if len(buffer) >= self.batch_size:
+            self._flush(kind)
+
+    def _flush(self, kind: str):
+        if self._buffers.get(kind):
+            table = self.pa.Table.from_pylist(self._buffers[kind], schema=self.schemas[kind])
+            self._writers[kind].write_table(table)
+            self._buffers[kind] = []
+
+    def _close_chunk(self, kind: str):
+        if kind in self._writers:
+            self._flush(kind)
+            self._writers.pop(kind).close()
+
+
+def open_sink(fmt: str, directory: str, prefix: str = "run",
+              rotate_records: int = DEFAULT_ROTATE_RECORDS) -> Optional[ResultSink]:
+    """Sink for --sink FORMAT; falls back to NDJSON when Parquet is asked for without pyarrow"""
+    if fmt == "parquet":
+        if importlib.util.find_spec("pyarrow") is not None:
+            return ParquetSink(directory, prefix, rotate_records)
+        print("⚠️  Parquet output needs pyarrow (pip install pyarrow); writing NDJSON instead")
+        fmt = "ndjson"
+    return NdjsonSink(directory, prefix, rotate_records, compress=fmt == "ndjson.gz")
+
+
+def read_records(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Stream records back out of NDJSON or Parquet chunks, one at a time"""
+    for path in paths:
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(path).iter_batches():
+                yield from batch.to_pylist()
+        else:
+            with (gzip.open(path, "rt") if path.endswith(".gz") else open(path)) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def summarize_directory(directory: str, prefix: str = "*") -> Dict[str, Dict[str, Any]]:
+    paths = sorted(path for ext in (".ndjson", ".ndjson.gz", ".parquet")
+                   for path in glob.glob(os.path.join(directory, f"{prefix}-requests-*{ext}")))
+    sketches = EndpointSketches()
+    for record in read_records(paths):
+        sketches.add(record)
+    print(f"📂 {len(paths)} request chunk(s) in {directory}")
+    return sketches.endpoint_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-hoc summaries of streamed result chunks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summarize = sub.add_parser("summarize", help="Per-endpoint latency table from a directory of request chunks")
+    summarize.add_argument("directory")
+    summarize.add_argument("--prefix", default="*", help="Only chunks written with this prefix")
+    summarize.add_argument("--output", help="Write the endpoint stats as JSON to this path")
+    args = parser.parse_args()
+
+    stats = summarize_directory(args.directory, args.prefix)
+    if not stats:
+        print("❌ No request records found")
+        return 1
+    print("\n⏱️  ENDPOINT LATENCY (ms):")
+    print(f"  {'Endpoint':<52}{'n':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'ttfb p50':>10}")
+    for endpoint, s in stats.items():
+        print(f"  {endpoint:<52}{s['count']:>10}{s['p50']:>9.1f}{s['p95']:>9.1f}{s['p99']:>9.1f}"
+              f"{s['phases_p50_ms']['ttfb_ms']:>10.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"endpoints": stats}, f, indent=2)
+        print(f"📝 Endpoint stats written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
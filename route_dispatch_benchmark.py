@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Dispatch-cost benchmark for the catch-all API route.
+app/api/[[...path]]/route.js picks a handler by walking a chain of
+`path === ...`, `startsWith` and regex checks per HTTP method, so later routes
+pay for every check above them. This parses the route table out of that file,
+builds a probe request for every route and measures it against two baselines
+per method: GET /api/health (first check) and an unmatched path that falls
+through the whole chain to the 404.
+
+Probes are chosen to exit right after dispatch wherever possible (wrong admin
+password -> 401, empty body -> 400), so the difference to the baseline is
+dispatch plus a constant early return. A least-squares fit of that overhead
+against each route's position gives the per-check cost, and routes are ranked
+by the share of their latency that position explains. Routes whose generated
+path is captured by an earlier check (shadowed) are reported as well.
+
+Routes with side effects or external calls (seeding, migrations, scrapers) are
+never requested.
+
+Usage:
+    python route_dispatch_benchmark.py --base-url http://localhost:3000/api [--rounds 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from api_client import ADMIN_HEADERS, ApiClient, DEFAULT_API_BASE, NO_RETRY
+from perf_report import fit_line, percentile
+
+ROUTE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "api", "[[...path]]", "route.js")
+PLACEHOLDER = "dispatch-bench-0000"
+MISS_PATH = "dispatch-bench/no-such-route"
+WRONG_PASSWORD = {"x-admin-password": "dispatch-bench-wrong-password"}
+# Handlers that write data or call third-party sites even without valid input
+UNSAFE_ROUTES = {"seed-events", "seed-team", "events/migrate", "community/links", "desipass/events"}
+
+FUNCTION_RE = re.compile(r"^export async function (GET|POST|PUT|DELETE)\(")
+ROUTE_RE = re.compile(r"^    if \((.*\bpath\b.*)\) \{\s*$")
+GATE_RE = re.compile(r"^    if \(password !== ")
+CLAUSE_RES = [
+    ("equals", re.compile(r"^path === '([^']*)'$")),
+    ("startswith", re.compile(r"^path\.startsWith\('([^']*)'\)$")),
+    ("endswith", re.compile(r"^path\.endsWith\('([^']*)'\)$")),
+    ("includes", re.compile(r"^path\.includes\('([^']*)'\)$")),
+    ("not_includes", re.compile(r"^!path\.includes\('([^']*)'\)$")),
+    ("match", re.compile(r"^path\.match\(/(.*)/\)$")),
+]
+
+
+@dataclass
+class Route:
+    method: str
+    position: int
+    condition: str
+    line: int
+    clauses: List[Tuple[str, str]]
+    block: str
+    auth_gate: bool = False
+    sample_path: str = ""
+    shadowed_by: Optional[int] = None
+    probe: str = ""
+    samples_ms: List[float] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.sample_path.replace(PLACEHOLDER, '[id]')}"
+
+    def matches(self, path: str) -> bool:
+        for kind, value in self.clauses:
+            if kind == "equals" and path != value:
+                return False
+            if kind == "startswith" and not path.startswith(value):
+                return False
+            if kind == "endswith" and not path.endswith(value):
+                return False
+            if kind == "includes" and value not in path:
+                return False
+            if kind == "not_includes" and value in path:
+                return False
+            if kind == "match" and not re.search(value.replace("\\/", "/"), path):
+                return False
+        return True
+
+
+def sample_path(clauses: List[Tuple[str, str]]) -> str:
+    """A concrete path that satisfies every clause of a route condition"""
+    values = dict(clauses)
+    if "equals" in values:
+        return values["equals"]
+    if "match" in values:
+        pattern = values["match"].replace("\\/", "/").lstrip("^").rstrip("$")
+        return pattern.replace("[^/]+", PLACEHOLDER)
+    prefix, suffix = values.get("startswith", ""), values.get("endswith", "")
+    return f"{prefix}{PLACEHOLDER}{suffix}"
+
+
+def parse_routes(route_file: str = ROUTE_FILE) -> Dict[str, List[Route]]:
+    """Top-level route checks per exported method handler, in dispatch order"""
+    with open(route_file) as f:
+        lines = f.read().splitlines()
+
+    routes: Dict[str, List[Route]] = {}
+    method, gate = None, False
+    for number, line in enumerate(lines, 1):
+        function = FUNCTION_RE.match(line)
+        if function:
+            method, gate = function.group(1), False
+            routes[method] = []
+            continue
+        if method is None:
+            continue
+        if GATE_RE.match(line) and not routes[method]:
+            gate = True  # PUT/DELETE check the password once, before any route
+            continue
+        match = ROUTE_RE.match(line)
+        if not match:
+            continue
+        clauses = []
+        for part in (p.strip() for p in match.group(1).split("&&")):
+            for kind, clause_re in CLAUSE_RES:
+                parsed = clause_re.match(part)
+                if parsed:
+                    clauses.append((kind, parsed.group(1)))
+                    break
+            else:
+                raise ValueError(f"route.js:{number}: unrecognised route condition {part!r}")
+        end = next((i for i in range(number, len(lines)) if lines[i].startswith("    }")), len(lines))
+        block = "\n".join(lines[number:min(end, number + 12)])
+        route = Route(method, len(routes[method]), match.group(1), number, clauses, block, gate)
+        route.sample_path = sample_path(clauses)
+        routes[method].append(route)
+
+    for method_routes in routes.values():
+        for route in method_routes:
+            first = next(r for r in method_routes if r.matches(route.sample_path))
+            if first is not route:
+                route.shadowed_by = first.position
+            route.probe = choose_probe(route)
+    return routes
+
+
+def choose_probe(route: Route) -> str:
+    """'unauthorized' / 'invalid' exit right after dispatch; 'handler' runs the handler; 'skip' is never sent"""
+    if route.sample_path in UNSAFE_ROUTES:
+        return "skip"
+    if route.auth_gate:
+        return "handler"  # a wrong password is rejected before dispatch, so send the right one
+    if "x-admin-password" in route.block:
+        return "unauthorized"
+    if route.method == "POST" or re.search(r"corsResponse\(\{ error: [^}]*\}, 400\)", route.block):
+        return "invalid"
+    return "handler"
+
+
+class DispatchBenchmark:
+    def __init__(self, client: ApiClient, routes: Dict[str, List[Route]], include_handlers: bool = True):
+        self.client = client
+        self.routes = routes
+        self.include_handlers = include_handlers
+        self.baselines: Dict[str, Route] = {}
+        self.statuses: Dict[Tuple[str, str], Dict[int, int]] = {}
+
+    def probes(self) -> List[Route]:
+        probes = [r for rs in self.routes.values() for r in rs if r.shadowed_by is None and r.probe != "skip"
+                  and (self.include_handlers or r.probe != "handler" or r.sample_path == "health")]
+        for method, method_routes in self.routes.items():
+            gate = bool(method_routes) and method_routes[0].auth_gate
+            miss = Route(method, len(method_routes), "<no match>", 0, [], "", gate)
+            miss.sample_path = MISS_PATH
+            miss.probe = "miss"
+            self.baselines[method] = miss
+            probes.append(miss)
+        return probes
+
+    def send(self, route: Route) -> float:
+        headers = WRONG_PASSWORD if route.probe == "unauthorized" else (ADMIN_HEADERS if route.auth_gate else None)
+        kwargs = {"headers": headers}
+        if route.method in ("POST", "PUT"):
+            kwargs["json"] = {}
+        response = self.client.request(route.method, route.sample_path, **kwargs)
+        key = (route.method, route.sample_path)
+        counts = self.statuses.setdefault(key, {})
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        return response.extensions["timing"].ttfb_ms
+
+    def run(self, rounds: int, warmup: int = 5):
+        probes = self.probes()
+        for _ in range(warmup):
+            for probe in probes:
+                self.send(probe)
+        for key in self.statuses:
+            self.statuses[key] = {}
+        for _ in range(rounds):
+            # Interleave in a fresh order each round so drift hits every route alike
+            random.shuffle(probes)
+            for probe in probes:
+                probe.samples_ms.append(self.send(probe))
+        return probes
+
+
+def analyze(benchmark: DispatchBenchmark, health: Route, probes: List[Route], early_statuses=(400, 401)) -> Dict:
+    base = percentile(health.samples_ms, 50)
+    rows = []
+    for probe in probes:
+        statuses = benchmark.statuses.get((probe.method, probe.sample_path), {})
+        status = max(statuses, key=statuses.get) if statuses else None
+        rows.append({
+            "route": probe.label if probe.probe != "miss" else f"{probe.method} <unmatched>",
+            "method": probe.method,
+            "position": probe.position,
+            "line": probe.line,
+            "probe": probe.probe,
+            "status": status,
+            "p50_ms": percentile(probe.samples_ms, 50),
+            "p95_ms": percentile(probe.samples_ms, 95),
+            "overhead_ms": percentile(probe.samples_ms, 50) - base,
+        })
+
+    early = [r for r in rows if r["probe"] in ("unauthorized", "invalid") and r["status"] in early_statuses]
+    slope, intercept, stderr = fit_line([(r["position"], r["overhead_ms"]) for r in early])
+    for row in rows:
+        row["position_cost_ms"] = max(slope, 0.0) * row["position"]
+    return {"health_p50_ms": base, "per_check_ms": slope, "per_check_stderr_ms": stderr,
+            "intercept_ms": intercept, "fitted_on": len(early), "routes": rows}
+
+
+def print_report(result: Dict, routes: Dict[str, List[Route]], top: int):
+    print(f"\n📏 Baseline GET /api/health p50 (server TTFB): {result['health_p50_ms']:.2f} ms")
+    for row in (r for r in result["routes"] if r["probe"] == "miss"):
+        print(f"   {row['route']:<44} falls through {row['position']} checks: "
+              f"{row['overhead_ms']:+.2f} ms vs health (status {row['status']})")
+
+    print(f"\n📐 Fit over {result['fitted_on']} early-exit probes: "
+          f"{result['per_check_ms'] * 1000:+.1f} ± {result['per_check_stderr_ms'] * 1000:.1f} µs per preceding check")
+    if abs(result["per_check_ms"]) < 2 * result["per_check_stderr_ms"]:
+        print("   (within noise: no measurable position-related cost at this sample size)")
+    ranked = sorted((r for r in result["routes"] if r["probe"] != "miss"),
+                    key=lambda r: (r["position_cost_ms"], r["overhead_ms"]), reverse=True)
+    print(f"\n🏁 Routes ranked by position-related cost (top {top}):")
+    print(f"  {'Route':<50}{'pos':>4}{'probe':>14}{'status':>7}{'p50':>9}{'vs health':>11}{'position':>10}")
+    for row in ranked[:top]:
+        print(f"  {row['route']:<50}{row['position']:>4}{row['probe']:>14}{str(row['status']):>7}"
+              f"{row['p50_ms']:>9.2f}{row['overhead_ms']:>+11.2f}{row['position_cost_ms']:>10.3f}")
+
+    shadowed = [r for rs in routes.values() for r in rs if r.shadowed_by is not None]
+    if shadowed:
+        print("\n🕳️  Shadowed routes (an earlier check captures their paths):")
+        for route in shadowed:
+            winner = routes[route.method][route.shadowed_by]
+            print(f"  route.js:{route.line} {route.method} if ({route.condition}) "
+                  f"← route.js:{winner.line} if ({winner.condition})")
+
+    worst = max(ranked, key=lambda r: r["position"], default=None)
+    if worst:
+        share = worst["position_cost_ms"] / worst["p50_ms"] * 100 if worst["p50_ms"] else 0.0
+        print(f"\n💡 The latest route checked ({worst['route']}, position {worst['position']}) spends "
+              f"~{worst['position_cost_ms']:.3f} ms ({share:.1f}% of its p50) on dispatch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-route dispatch overhead of the catch-all API route")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--route-file", default=ROUTE_FILE)
+    parser.add_argument("--rounds", type=int, default=100, help="Measured requests per route")
+    parser.add_argument("--early-exit-only", action="store_true",
+                        help="Skip probes that run a handler (DB reads) and keep only 401/400 early exits")
+    parser.add_argument("--top", type=int, default=15, help="Routes to show in the ranking")
+    parser.add_argument("--list", action="store_true", help="Print the parsed route table and exit")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    routes = parse_routes(args.route_file)
+    print("🧭 ROUTE DISPATCH BENCHMARK")
+    print("=" * 70)
+    print(f"Parsed {sum(len(r) for r in routes.values())} routes from {os.path.relpath(args.route_file)}: "
+          + ", ".join(f"{m} {len(r)}" for m, r in routes.items()))
+    if args.list:
+        for method_routes in routes.values():
+            for r in method_routes:
+                note = f" (shadowed by #{r.shadowed_by})" if r.shadowed_by is not None else ""
+                print(f"  {r.method:<7}#{r.position:<3} {r.probe:<13} {r.sample_path}{note}")
+        return 0
+
+    client = ApiClient(args.base_url, timeout=30, retry=NO_RETRY, max_connections=1)
+    benchmark = DispatchBenchmark(client, routes, include_handlers=not args.early_exit_only)
+    try:
+        probes = benchmark.run(args.rounds)
+    finally:
+        client.close()
+
+    health = next(p for p in probes if p.method == "GET" and p.sample_path == "health")
+    result = analyze(benchmark, health, probes)
+    print_report(result, routes, args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
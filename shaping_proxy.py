@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Latency and bandwidth shaping reverse proxy for timeout and tail-latency testing.
+An asyncio HTTP/1.1 proxy that sits between a client and the API and, per
+route, adds a first-byte delay drawn from a latency distribution, caps the
+upload and download bandwidth, stalls responses mid-body and resets
+connections. Profiles live in shaping_profiles.json; within a profile the first
+rule whose route pattern matches "METHOD /api/path" applies (fnmatch syntax,
+e.g. "GET /api/gallery/*").
+
+Bodies are streamed in both directions, so a capped /api/upload is slow for
+the client the way a real slow uplink is rather than buffered by the proxy.
+Resets are real TCP RSTs (SO_LINGER 0) part-way through the response body.
+
+`serve` runs the proxy in front of an upstream until interrupted and prints
+what it injected per route. `sweep` starts it in-process once per profile,
+drives gallery reads and JPEG uploads through it with the harness's client
+timeout, and reports how p50/p95/p99 and the error mix move against the first
+(unshaped) profile. The files the sweep uploads are deleted from --upload-dir
+afterwards; the API has no delete route, so against a server that does not
+run from this checkout they stay.
+
+Usage:
+    python shaping_proxy.py serve --upstream http://localhost:3000 --profile venue-wifi [--port 8900]
+    python load_generator.py --base-url http://127.0.0.1:8900/api ...
+    python shaping_proxy.py sweep --upstream http://localhost:3000 [--profiles lan,venue-wifi] [--output shaping.json]
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import random
+import socket
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from api_client import ADMIN_PASSWORD, AsyncApiClient, DEFAULT_BASE_URL, NO_RETRY
+from perf_report import endpoint_template, summarize
+
+DEFAULT_PROFILES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shaping_profiles.json")
+DEFAULT_PORT = 8900
+SLICE_S = 0.05  # bandwidth caps are enforced in slices of this many seconds
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer", "upgrade", "host"}
+
+
+def sample_latency_ms(spec: Optional[Dict[str, Any]], rng: random.Random) -> float:
+    """One draw from a latency spec: fixed, uniform, normal, lognormal or pareto (heavy tail)"""
+    if not spec:
+        return 0.0
+    dist = spec.get("dist", "fixed")
+    if dist == "fixed":
+        return spec["ms"]
+    if dist == "uniform":
+        return rng.uniform(spec["min_ms"], spec["max_ms"])
+    if dist == "normal":
+        return max(0.0, rng.gauss(spec["mean_ms"], spec["sd_ms"]))
+    if dist == "lognormal":
+        return spec["median_ms"] * rng.lognormvariate(0, spec["sigma"])
+    if dist == "pareto":
+        return spec["scale_ms"] * rng.paretovariate(spec["alpha"])
+    raise ValueError(f"Unknown latency distribution: {dist}")
+
+
+@dataclass
+class ShapingRule:
+    route: str = "*"
+    latency: Optional[Dict[str, Any]] = None
+    down_kbps: Optional[float] = None
+    up_kbps: Optional[float] = None
+    stall: Optional[Dict[str, float]] = None
+    reset_probability: float = 0.0
+
+    def matches(self, method: str, path: str) -> bool:
+        return fnmatch.fnmatchcase(f"{method} {path}", self.route)
+
+
+@dataclass
+class ShapingProfile:
+    name: str
+    rules: List[ShapingRule] = field(default_factory=list)
+    description: str = ""
+
+    def rule_for(self, method: str, path: str) -> ShapingRule:
+        return next((r for r in self.rules if r.matches(method, path)), ShapingRule())
+
+
+def load_profiles(path: str = DEFAULT_PROFILES) -> Dict[str, ShapingProfile]:
+    with open(path) as f:
+        raw = json.load(f)
+    return {
+        name: ShapingProfile(name, [ShapingRule(**rule) for rule in entry.get("rules", [])],
+                             entry.get("description", ""))
+        for name, entry in raw.items()
+    }
+
+
+class Throttle:
+    """Paces a byte stream to `kbps` kilobits per second; unlimited when kbps is None"""
+
+    def __init__(self, kbps: Optional[float]):
+        self.bytes_per_s = kbps * 1000 / 8 if kbps else None
+        self.start = time.monotonic()
+        self.sent = 0
+
+    @property
+    def slice_bytes(self) -> int:
+        return max(1024, int(self.bytes_per_s * SLICE_S)) if self.bytes_per_s else 64 * 1024
+
+    async def consume(self, n: int):
+        self.sent += n
+        if self.bytes_per_s:
+            delay = self.start + self.sent / self.bytes_per_s - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+async def read_request_head(reader: asyncio.StreamReader) -> Tuple[str, str, str, List[Tuple[str, str]]]:
+    """Method, target, HTTP version and headers of the next request on the connection"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    method, target, version = request_line.split(" ", 2)
+    headers = [tuple(part.strip() for part in line.split(":", 1)) for line in header_lines if ":" in line]
+    return method, target, version, headers
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.upstream_ms: List[float] = []
+        self.total_ms: List[float] = []
+        self.injected_ms: List[float] = []
+        self.stalls = 0
+        self.resets = 0
+        self.client_aborts = 0
+        self.upstream_errors = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "upstream_ms": summarize(self.upstream_ms),
+            "total_ms": summarize(self.total_ms),
+            "injected_delay_ms": summarize(self.injected_ms),
+            "stalls": self.stalls,
+            "resets": self.resets,
+            "client_aborts": self.client_aborts,
+            "upstream_errors": self.upstream_errors,
+            "bytes_up": self.bytes_up,
+            "bytes_down": self.bytes_down,
+        }
+
+
+class ShapingProxy:
+    def __init__(self, upstream: str, profile: ShapingProfile, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 seed: Optional[int] = None, recorder=None):
+        self.upstream = upstream.rstrip("/")
+        self.profile = profile
+        # Called with every completed exchange (request and response bodies included) when set
+        self.recorder = recorder
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.routes: Dict[str, RouteStats] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        self.client = httpx.AsyncClient(base_url=self.upstream, timeout=None,
+                                        limits=httpx.Limits(max_connections=None, max_keepalive_connections=100))
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.client.aclose()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            while keep_alive:
+                keep_alive = await self._proxy_one(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            if not writer.is_closing():
+                writer.close()
+
+    async def _proxy_one(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Proxy one request on the connection; returns whether the connection stays open"""
+        method, target, version, headers = await read_request_head(reader)
+        lower = {name.lower(): value for name, value in headers}
+        path = target.split("?", 1)[0]
+        rule = self.profile.rule_for(method, path)
+        stats = self.routes.setdefault(endpoint_template(method, target), RouteStats())
+        stats.requests += 1
+        started = time.perf_counter()
+
+        delay_ms = sample_latency_ms(rule.latency, self.rng)
+        stats.injected_ms.append(delay_ms)
+        await asyncio.sleep(delay_ms / 1000)
+
+        upload = Throttle(rule.up_kbps)
+        request_body = [] if self.recorder is not None else None
+        response_body = [] if self.recorder is not None else None
+        body = self._read_body(reader, lower, upload, stats, request_body)
+        # Content-Length is kept so the upstream sees the same framing as from a direct client
+        forward = [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP]
+        has_body = "content-length" in lower or "chunked" in lower.get("transfer-encoding", "").lower()
+        request = self.client.build_request(method, target, headers=forward, content=body if has_body else None)
+        upstream_start = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            stats.upstream_errors += 1
+            message = f"upstream error: {type(e).__name__}".encode()
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Type: text/plain\r\n"
+                         b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(message), message))
+            await writer.drain()
+            return False
+        upstream_ms = (time.perf_counter() - upstream_start) * 1000
+        stats.upstream_ms.append(upstream_ms)
+
+        try:
+            no_body = method == "HEAD" or response.status_code in (204, 304) or response.status_code < 200
+            status_line = f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n"
+            out = [(name, value) for name, value in response.headers.raw
+                   for name, value in [(name.decode("latin-1"), value.decode("latin-1"))]
+                   if name.lower() not in HOP_BY_HOP and (no_body or name.lower() != "content-length")]
+            if not no_body:
+                out.append(("Transfer-Encoding", "chunked"))
+            writer.write((status_line + "".join(f"{n}: {v}\r\n" for n, v in out) + "\r\n").encode("latin-1"))
+            if not no_body:
+                await self._write_body(writer, response, rule, stats, response_body)
+            await writer.drain()
+        except _Reset:
+            return False
+        finally:
+            await response.aclose()
+        stats.total_ms.append((time.perf_counter() - started) * 1000)
+        if self.recorder is not None:
+            self.recorder.record(method, target, headers, b"".join(request_body), response,
+                                 b"".join(response_body), upstream_ms,
+                                 (time.perf_counter() - upstream_start) * 1000)
+        return lower.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str], throttle: Throttle,
+                         stats: RouteStats, tee: Optional[List[bytes]] = None):
+        """Stream the client's request body at the rule's upload rate, copying it into `tee` if given"""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    return
+                remaining = size
+                while remaining:
+                    chunk = await reader.readexactly(min(remaining, throttle.slice_bytes))
+                    remaining -= len(chunk)
+                    stats.bytes_up += len(chunk)
+                    await throttle.consume(len(chunk))
+                    if tee is not None:
+                        tee.append(chunk)
+                    yield chunk
+                await reader.readexactly(2)
+        remaining = int(headers.get("content-length", 0))
+        while remaining:
+            chunk = await reader.readexactly(min(remaining, throttle.slice_bytes))
+            remaining -= len(chunk)
+            stats.bytes_up += len(chunk)
+            await throttle.consume(len(chunk))
+            if tee is not None:
+                tee.append(chunk)
+            yield chunk
+
+    async def _write_body(self, writer: asyncio.StreamWriter, response: httpx.Response, rule: ShapingRule,
+                          stats: RouteStats, tee: Optional[List[bytes]] = None):
+        download = Throttle(rule.down_kbps)
+        length = int(response.headers.get("content-length", 0)) or None
+        stall_at = reset_at = None
+        if rule.stall and self.rng.random() < rule.stall["probability"]:
+            stall_at = int(self.rng.random() * length) if length else 1
+        if rule.reset_probability and self.rng.random() < rule.reset_probability:
+            reset_at = int(self.rng.random() * length) if length else 1
+        written = 0
+        async for raw in response.aiter_raw():
+            if tee is not None:
+                tee.append(raw)
+            for offset in range(0, len(raw), download.slice_bytes):
+                chunk = raw[offset:offset + download.slice_bytes]
+                if reset_at is not None and written + len(chunk) >= reset_at:
+                    stats.resets += 1
+                    self._reset(writer)
+                    raise _Reset()
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    stats.client_aborts += 1
+                    raise
+                written += len(chunk)
+                stats.bytes_down += len(chunk)
+                await download.consume(len(chunk))
+                if stall_at is not None and written >= stall_at:
+                    stats.stalls += 1
+                    stall_at = None
+                    await asyncio.sleep(rule.stall["ms"] / 1000)
+        if reset_at is not None:
+            stats.resets += 1
+            self._reset(writer)
+            raise _Reset()
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _reset(writer: asyncio.StreamWriter):
+        """Abort with a TCP RST instead of an orderly FIN"""
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        writer.transport.abort()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {route: stats.as_dict() for route, stats in sorted(self.routes.items())}
+
+
+class _Reset(Exception):
+    """The proxy deliberately reset the client connection"""
+
+
+def classify_error(e: Exception) -> str:
+    if isinstance(e, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(e, (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)):
+        return "reset"
+    return type(e).__name__
+
+
+class ShapingSweep:
+    """Drives gallery reads and uploads through the proxy once per profile"""
+
+    def __init__(self, upstream: str, requests: int = 30, concurrency: int = 4, client_timeout: float = 30,
+                 upload_profile: Optional[str] = "web"):
+        self.upstream = upstream
+        self.requests = requests
+        self.concurrency = concurrency
+        self.client_timeout = client_timeout
+        self.upload_profile = upload_profile
+        self.upload_image = None
+        self.uploaded: List[str] = []
+
+    async def _probe_paths(self, base_url: str) -> List[Tuple[str, str]]:
+        """(name, path) of the read probes; the photo-heavy detail probe uses the first published theme"""
+        probes = [("GET /api/events", "events"), ("GET /api/gallery/themes", "gallery/themes")]
+        async with AsyncApiClient(base_url, timeout=self.client_timeout) as client:
+            themes = (await client.get("gallery/themes")).json().get("themes") or []
+        if themes:
+            probes.append(("GET /api/gallery/themes/[slug]", f"gallery/themes/{themes[0]['slug']}"))
+        return probes
+
+    async def _send(self, client: AsyncApiClient, name: str, path: str) -> Dict:
+        start = time.perf_counter()
+        try:
+            if name == "POST /api/upload":
+                with open(self.upload_image.path, "rb") as f:
+                    response = await client.post(
+                        "upload", data={"type": "gallery"},
+                        files={"file": (self.upload_image.name, f, self.upload_image.content_type)})
+                if response.status_code == 200 and response.json().get("success"):
+                    self.uploaded.append(response.json()["path"])
+            else:
+                response = await client.get(path)
+            outcome = "ok" if response.status_code < 400 else str(response.status_code)
+        except httpx.HTTPError as e:
+            outcome = classify_error(e)
+        return {"name": name, "outcome": outcome, "latency_ms": (time.perf_counter() - start) * 1000}
+
+    async def run_profile(self, profile: ShapingProfile) -> Dict:
+        proxy = ShapingProxy(self.upstream, profile, port=0, seed=0)
+        await proxy.start()
+        base_url = f"{proxy.base_url}/api"
+        try:
+            probes = await self._probe_paths(base_url)
+            if self.upload_image is not None:
+                probes.append(("POST /api/upload", "upload"))
+            work = [probes[i % len(probes)] for i in range(self.requests * len(probes))]
+            random.Random(0).shuffle(work)
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in work:
+                queue.put_nowait(item)
+            results = []
+            async with AsyncApiClient(base_url, timeout=self.client_timeout, retry=NO_RETRY,
+                                      headers={"x-admin-password": ADMIN_PASSWORD},
+                                      max_connections=self.concurrency) as client:
+                async def worker():
+                    while not queue.empty():
+                        results.append(await self._send(client, *queue.get_nowait()))
+
+                start = time.perf_counter()
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+                wall_s = time.perf_counter() - start
+        finally:
+            await proxy.stop()
+
+        probes_out = {}
+        for name in dict.fromkeys(r["name"] for r in results):
+            mine = [r for r in results if r["name"] == name]
+            errors: Dict[str, int] = {}
+            for r in mine:
+                if r["outcome"] != "ok":
+                    errors[r["outcome"]] = errors.get(r["outcome"], 0) + 1
+            probes_out[name] = {
+                "latency_ms": summarize([r["latency_ms"] for r in mine if r["outcome"] == "ok"]),
+                "error_rate": sum(errors.values()) / len(mine),
+                "errors": errors,
+            }
+        return {"profile": profile.name, "description": profile.description, "wall_s": wall_s,
+                "probes": probes_out, "proxy": proxy.report()}
+
+    async def run(self, profiles: List[ShapingProfile]) -> List[Dict]:
+        if self.upload_profile:
+            from upload_benchmark import ImageCorpus
+            self.upload_image = ImageCorpus().ensure([self.upload_profile], ["jpeg"])[0]
+        results = []
+        for profile in profiles:
+            print(f"\n🌐 Profile {profile.name}: {profile.description}")
+            result = await self.run_profile(profile)
+            for name, probe in result["probes"].items():
+                lat = probe["latency_ms"]
+                print(f"  {name:<34} p50 {lat['p50']:>8.0f}  p95 {lat['p95']:>8.0f}  p99 {lat['p99']:>8.0f} ms  "
+                      f"errors {probe['error_rate']:>6.1%} {probe['errors'] or ''}")
+            results.append(result)
+        return results
+
+
+def print_comparison(results: List[Dict], client_timeout: float):
+    baseline = results[0]
+    print("\n" + "=" * 70)
+    print(f"📶 TAIL LATENCY UNDER SHAPING (vs {baseline['profile']}, client timeout {client_timeout:g}s)")
+    print("=" * 70)
+    for result in results[1:]:
+        print(f"\n{result['profile']}:")
+        for name, probe in result["probes"].items():
+            base = baseline["probes"].get(name)
+            if base is None:
+                continue
+            base_p99 = base["latency_ms"]["p99"]
+            p99 = probe["latency_ms"]["p99"]
+            ratio = f"×{p99 / base_p99:.1f}" if base_p99 and p99 else "—"
+            print(f"  {name:<34} p99 {base_p99:>7.0f} → {p99:>7.0f} ms ({ratio})  "
+                  f"errors {base['error_rate']:.1%} → {probe['error_rate']:.1%}")
+            timeouts = probe["errors"].get("timeout", 0)
+            if timeouts:
+                print(f"    ⚠️  {timeouts} request(s) hit the {client_timeout:g}s client timeout")
+            if p99 > client_timeout * 1000 * 0.8:
+                print("    ⚠️  p99 is within 20% of the client timeout")
+
+
+async def serve(args, profile: ShapingProfile):
+    proxy = ShapingProxy(args.upstream, profile, args.host, args.port, args.seed)
+    await proxy.start()
+    print(f"🌐 Shaping {args.upstream} with profile '{profile.name}' on {proxy.base_url} (Ctrl-C to stop)")
+    print(f"   point clients at {proxy.base_url}/api")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await proxy.stop()
+        report = proxy.report()
+        print(f"\n{'Route':<52}{'Reqs':>6}{'delay p50':>11}{'total p99':>11}{'stalls':>8}{'resets':>8}")
+        for route, s in report.items():
+            print(f"{route:<52}{s['requests']:>6}{s['injected_delay_ms']['p50']:>11.0f}"
+                  f"{s['total_ms']['p99']:>11.0f}{s['stalls']:>8}{s['resets']:>8}")
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({"profile": profile.name, "routes": report}, f, indent=2)
+            print(f"📝 Proxy report written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/bandwidth shaping reverse proxy")
+    parser.add_argument("--upstream", default=DEFAULT_BASE_URL, help="Origin to proxy to, e.g. http://localhost:3000")
+    parser.add_argument("--profiles-file", default=DEFAULT_PROFILES)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve", help="Run the proxy until interrupted")
+    serve_parser.add_argument("--profile", default="venue-wifi")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--seed", type=int, help="Seed the injected faults for a reproducible run")
+    sweep_parser = sub.add_parser("sweep", help="Measure probe latency and errors under each profile")
+    sweep_parser.add_argument("--profiles", help="Comma-separated profiles, the first being the baseline "
+                                                 "(default: all, in file order)")
+    sweep_parser.add_argument("--requests", type=int, default=30, help="Requests per probe and profile")
+    sweep_parser.add_argument("--concurrency", type=int, default=4)
+    sweep_parser.add_argument("--client-timeout", type=float, default=30,
+                              help="Client timeout in seconds (backend_test uses 30, the other scripts 10)")
+    sweep_parser.add_argument("--upload-profile", default="web",
+                              help="upload_benchmark size profile for the upload probe")
+    sweep_parser.add_argument("--no-upload", action="store_true", help="Skip the /api/upload probe")
+    sweep_parser.add_argument("--upload-dir", help="Upload directory of the upstream server to delete the sweep's "
+                                                   "files from (default: public/uploads of this checkout)")
+    sweep_parser.add_argument("--keep-uploads", action="store_true", help="Leave the files the sweep uploaded")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.profiles_file)
+    if args.command == "serve":
+        if args.profile not in profiles:
+            parser.error(f"unknown profile {args.profile!r} (have {', '.join(profiles)})")
+        try:
+            asyncio.run(serve(args, profiles[args.profile]))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    names = args.profiles.split(",") if args.profiles else list(profiles)
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        parser.error(f"unknown profile(s) {', '.join(unknown)} (have {', '.join(profiles)})")
+    print("📶 SHAPING SWEEP")
+    print("=" * 70)
+    sweep = ShapingSweep(args.upstream, args.requests, args.concurrency, args.client_timeout,
+                         None if args.no_upload else args.upload_profile)
+    try:
+        results = asyncio.run(sweep.run([profiles[name] for name in names]))
+    finally:
+        if sweep.uploaded and not args.keep_uploads:
+            from upload_benchmark import DEFAULT_UPLOAD_DIR, remove_uploaded_files
+            removed = remove_uploaded_files(sweep.uploaded, args.upload_dir or DEFAULT_UPLOAD_DIR)
+            print(f"🧹 Removed {removed} of {len(sweep.uploaded)} uploaded files")
+    if len(results) > 1:
+        print_comparison(results, args.client_timeout)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"client_timeout_s": args.client_timeout, "profiles": results}, f, indent=2)
+        print(f"📝 Sweep report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
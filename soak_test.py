@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Soak test: runs the load scenario's traffic mix (plus a trickle of uploads)
+against a local Next.js server for hours and looks for slow leaks.
+A background thread samples the server's process tree with psutil: RSS, open
+file descriptors, threads, sockets (and those to MongoDB) and the size of
+public/uploads. Traffic is driven in fixed windows; per window the latency
+percentiles and the median of every resource metric are recorded. After a
+warm-up period each series is fitted with a least-squares line over time and
+flagged when the slope is significant and larger than a per-hour threshold
+(a leak), or when p95 latency drifts up by more than 20% across the run.
+
+The server is started with --start-command (e.g. "yarn start" after
+"yarn build") and stopped at the end, or attached to with --server-pid /
+auto-detected from the base URL's port. Needs psutil.
+
+Usage:
+    python soak_test.py --start-command "yarn start" --duration 4h [--users 20] [--window 5m]
+    python soak_test.py --base-url http://localhost:3000/api --duration 30m --rate 50 --output soak.json
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from PIL import Image
+
+from api_client import ADMIN_PASSWORD
+from load_generator import LoadGenerator, LoadScenario
+from perf_report import fit_line
+from stats_scaling_benchmark import find_server_pid
+from upload_benchmark import DEFAULT_UPLOAD_DIR, remove_uploaded_files
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCENARIO = os.path.join(ROOT, "load_scenarios.json")
+RESOURCE_METRICS = ("rss_mb", "fds", "threads", "sockets", "mongo_sockets", "upload_mb")
+# A trend counts when its slope exceeds TREND_SIGNIFICANCE standard errors and this much per hour
+LEAK_PER_HOUR = {"rss_mb": 8.0, "fds": 5.0, "threads": 2.0, "sockets": 5.0, "mongo_sockets": 2.0}
+TREND_SIGNIFICANCE = 3.0
+LATENCY_DRIFT = 0.20
+
+
+def parse_duration(value: str) -> float:
+    """'90' -> 90 s, '30m' -> 1800, '4h' -> 14400"""
+    units = {"s": 1, "m": 60, "h": 3600}
+    value = value.strip().lower()
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def format_elapsed(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:{secs:02d}"
+
+
+class LocalServer:
+    """Starts the Next.js server in its own process group and stops it again"""
+
+    def __init__(self, command: str, base_url: str, log_path: str, startup_timeout_s: float = 180,
+                 env: Optional[Dict[str, str]] = None, cwd: str = ROOT):
+        self.command = command
+        self.base_url = base_url.rstrip("/")
+        self.log_path = log_path
+        self.startup_timeout_s = startup_timeout_s
+        self.env = env
+        self.cwd = cwd
+        self.process: Optional[subprocess.Popen] = None
+        self._log = None
+
+    def spawn(self) -> int:
+        """Start the process without waiting for it to answer; `env` entries override the inherited environment"""
+        self._log = open(self.log_path, "w")
+        self.process = subprocess.Popen(shlex.split(self.command), cwd=self.cwd, stdout=self._log,
+                                        stderr=subprocess.STDOUT, start_new_session=True,
+                                        env={**os.environ, **self.env} if self.env else None)
+        return self.process.pid
+
+    def start(self) -> int:
+        self.spawn()
+        print(f"🚀 Started '{self.command}' (pid {self.process.pid}), log in {self.log_path}")
+        deadline = time.monotonic() + self.startup_timeout_s
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"server exited with status {self.process.returncode}; see {self.log_path}")
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=5).status_code == 200:
+                    return self.process.pid
+            except httpx.HTTPError:
+                pass
+            time.sleep(1)
+        self.stop()
+        raise RuntimeError(f"server did not answer {self.base_url}/health within {self.startup_timeout_s:g}s")
+
+    def stop(self):
+        if self._log is not None:
+            self._log.close()
+        if self.process is None or self.process.poll() is not None:
+            return
+        os.killpg(self.process.pid, signal.SIGTERM)
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+        print(f"🛑 Stopped the server (pid {self.process.pid})")
+
+
+def directory_size(path: str) -> Tuple[int, int]:
+    """(bytes, files) under `path`"""
+    total, files = 0, 0
+    for folder, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(folder, name))
+                files += 1
+            except OSError:
+                pass  # removed while walking
+    return total, files
+
+
+class ResourceSampler:
+    """Samples the server's process tree (the npm/yarn wrapper and its node children) on a background thread"""
+
+    def __init__(self, pid: int, upload_dir: str, mongo_port: int = 27017, interval_s: float = 10):
+        import psutil
+        self.psutil = psutil
+        self.process = psutil.Process(pid)
+        self.upload_dir = upload_dir
+        self.mongo_port = mongo_port
+        self.interval_s = interval_s
+        self.samples: List[Dict] = []
+        self.started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _tree(self) -> List:
+        try:
+            return [self.process] + self.process.children(recursive=True)
+        except self.psutil.NoSuchProcess:
+            return []
+
+    def sample(self) -> Dict:
+        rss = fds = threads = sockets = mongo = 0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    fds += proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()
+                    threads += proc.num_threads()
+                # psutil < 6 names it connections()
+                connections = getattr(proc, "net_connections", None) or proc.connections
+                for conn in connections(kind="inet"):
+                    sockets += 1
+                    if conn.raddr and conn.raddr.port == self.mongo_port:
+                        mongo += 1
+            except (self.psutil.NoSuchProcess, self.psutil.AccessDenied):
+                continue
+        upload_bytes, upload_files = directory_size(self.upload_dir)
+        return {
+            "t_s": time.monotonic() - self.started,
+            "rss_mb": rss / 2**20,
+            "fds": fds,
+            "threads": threads,
+            "sockets": sockets,
+            "mongo_sockets": mongo,
+            "upload_mb": upload_bytes / 2**20,
+            "upload_files": upload_files,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(self.sample())
+            self._stop.wait(self.interval_s)
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def between(self, start_s: float, end_s: float) -> List[Dict]:
+        return [s for s in self.samples if start_s <= s["t_s"] < end_s]
+
+
+def median(values: List[float]) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def small_jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (100, 100), color="red").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class SoakTest:
+    def __init__(self, scenario: LoadScenario, base_url: str, sampler: ResourceSampler, window_s: float,
+                 rate: Optional[float] = None, users: int = 10, poisson: bool = False,
+                 upload_interval_s: float = 0):
+        self.scenario = scenario
+        self.base_url = base_url
+        self.generator: Optional[LoadGenerator] = None
+        self.sampler = sampler
+        self.window_s = window_s
+        self.rate = rate
+        self.users = users
+        self.poisson = poisson
+        self.upload_interval_s = upload_interval_s
+        self.windows: List[Dict] = []
+        self.uploaded: List[str] = []
+        self.upload_failures = 0
+
+    async def _upload_loop(self, deadline: float):
+        image = small_jpeg()
+        while time.monotonic() < deadline:
+            try:
+                response = await self.generator.client.post(
+                    "upload", data={"type": "gallery"}, files={"file": ("soak.jpg", image, "image/jpeg")},
+                    headers={"x-admin-password": ADMIN_PASSWORD})
+                if response.status_code == 200:
+                    self.uploaded.append(response.json()["path"])
+                else:
+                    self.upload_failures += 1
+            except httpx.HTTPError:
+                self.upload_failures += 1
+            await asyncio.sleep(min(self.upload_interval_s, max(0.0, deadline - time.monotonic())))
+
+    async def _window(self) -> Dict:
+        start_s = time.monotonic() - self.sampler.started
+        if self.rate:
+            report = await self.generator.run_open_loop(self.rate, self.window_s, self.poisson)
+        else:
+            report = await self.generator.run_closed_loop(self.users, self.window_s)
+        end_s = time.monotonic() - self.sampler.started
+        total = report.as_dict()["total"]
+        samples = self.sampler.between(start_s, end_s)
+        window = {
+            "t_s": (start_s + end_s) / 2,
+            "requests": total["requests"],
+            "throughput_rps": total["throughput_rps"],
+            "error_rate": total["error_rate"],
+            "latency_ms": total["latency_ms"],
+            **{metric: median([s[metric] for s in samples]) for metric in RESOURCE_METRICS},
+        }
+        self.windows.append(window)
+        return window
+
+    async def run(self, duration_s: float) -> List[Dict]:
+        self.generator = LoadGenerator(self.scenario, self.base_url)
+        try:
+            await self._run(duration_s)
+        finally:
+            await self.generator.aclose()
+        return self.windows
+
+    async def _run(self, duration_s: float):
+        deadline = time.monotonic() + duration_s
+        uploader = None
+        if self.upload_interval_s:
+            uploader = asyncio.ensure_future(self._upload_loop(deadline))
+        count = max(1, round(duration_s / self.window_s))
+        for index in range(count):
+            w = await self._window()
+            print(f"⏱️  {format_elapsed(w['t_s'] + self.window_s / 2)} window {index + 1}/{count}: "
+                  f"{w['throughput_rps']:.1f} req/s, p95 {w['latency_ms']['p95']:.1f} ms, "
+                  f"{w['error_rate']:.1%} errors | RSS {w['rss_mb']:.0f} MB, {w['fds']:.0f} fds, "
+                  f"{w['sockets']:.0f} sockets ({w['mongo_sockets']:.0f} to Mongo), uploads {w['upload_mb']:.1f} MB")
+        if uploader is not None:
+            await uploader
+
+    def remove_uploads(self, upload_dir: str) -> int:
+        """Delete the files this run uploaded; only paths inside `upload_dir` are touched"""
+        return remove_uploaded_files(self.uploaded, upload_dir)
+
+
+def trend(points: List[Tuple[float, float]]) -> Dict:
+    """Per-hour least-squares slope of a metric and whether it is distinguishable from noise"""
+    slope, intercept, stderr = fit_line([(t / 3600, y) for t, y in points])
+    first_h, last_h = points[0][0] / 3600, points[-1][0] / 3600
+    return {
+        "per_hour": slope,
+        "stderr": stderr,
+        "significant": slope > 0 and (stderr == 0 or slope > TREND_SIGNIFICANCE * stderr),
+        "start": intercept + slope * first_h,
+        "end": intercept + slope * last_h,
+    }
+
+
+def analyze(windows: List[Dict], warmup_s: float) -> Dict[str, Dict]:
+    """Fit every series after the warm-up; leaks and latency drift fail the run, upload growth only warns"""
+    steady = [w for w in windows if w["t_s"] >= warmup_s]
+    if len(steady) < 3:
+        print(f"\n⚠️  Only {len(steady)} windows after the warm-up; run longer for trend detection")
+        return {}
+    series = {"latency p50": [(w["t_s"], w["latency_ms"]["p50"]) for w in steady],
+              "latency p95": [(w["t_s"], w["latency_ms"]["p95"]) for w in steady],
+              "error rate": [(w["t_s"], w["error_rate"]) for w in steady]}
+    series.update({metric: [(w["t_s"], w[metric]) for w in steady] for metric in RESOURCE_METRICS})
+
+    trends = {}
+    for name, points in series.items():
+        fit = trend(points)
+        if name.startswith("latency"):
+            growth = (fit["end"] - fit["start"]) / fit["start"] if fit["start"] > 0 else 0.0
+            fit["verdict"] = "drift" if fit["significant"] and growth > LATENCY_DRIFT else "stable"
+            fit["growth"] = growth
+        elif name == "error rate":
+            fit["verdict"] = "drift" if fit["significant"] and fit["end"] > 0.01 else "stable"
+        elif name == "upload_mb":
+            fit["verdict"] = "accumulates" if fit["significant"] else "stable"
+        else:
+            fit["verdict"] = "leak" if fit["significant"] and fit["per_hour"] > LEAK_PER_HOUR[name] else "stable"
+        trends[name] = fit
+    return trends
+
+
+def print_report(trends: Dict[str, Dict], soak: SoakTest, warmup_s: float):
+    print("\n" + "=" * 70)
+    print(f"🧪 SOAK REPORT ({len(soak.windows)} windows, trends after a {warmup_s / 60:g} min warm-up)")
+    print("=" * 70)
+    icons = {"stable": "✅", "accumulates": "⚠️ ", "leak": "❌", "drift": "❌"}
+    for name, fit in trends.items():
+        change = f" ({fit['growth']:+.0%})" if "growth" in fit else ""
+        print(f"  {icons[fit['verdict']]} {name:<14} {fit['start']:>10.2f} → {fit['end']:>10.2f}{change}  "
+              f"slope {fit['per_hour']:+.3f}/h ± {fit['stderr']:.3f} — {fit['verdict']}")
+    upload = trends.get("upload_mb")
+    if upload and upload["verdict"] == "accumulates":
+        print(f"\n⚠️  public/uploads grows {upload['per_hour']:.1f} MB/h ({upload['per_hour'] * 24 / 1024:.2f} GB/day "
+              f"at this upload rate); nothing in the app ever deletes uploaded files")
+    print(f"\n📤 {len(soak.uploaded)} uploads, {soak.upload_failures} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running soak test with leak and latency-drift detection")
+    parser.add_argument("--base-url", default="http://localhost:3000/api", help="API base URL of the local server")
+    parser.add_argument("--start-command", help="Start the server with this command (run from the repo root)")
+    parser.add_argument("--server-log", default=os.path.join(ROOT, "test_reports", "soak_server.log"),
+                        help="Where the started server's output goes")
+    parser.add_argument("--server-pid", type=int, help="Sample this process instead of auto-detecting it")
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO, help="Scenario file with the weighted traffic mix")
+    parser.add_argument("--duration", default="4h", help="How long to soak, e.g. 90m or 4h")
+    parser.add_argument("--window", default="5m", help="Length of each measurement window")
+    parser.add_argument("--warmup", default="10m", help="Windows starting before this are left out of the trends")
+    parser.add_argument("--rate", type=float, help="Open loop: target requests per second")
+    parser.add_argument("--users", type=int, default=10, help="Closed loop: number of virtual users")
+    parser.add_argument("--poisson", action="store_true", help="Open loop: use Poisson arrivals")
+    parser.add_argument("--upload-interval", default="30s", help="Upload a small JPEG this often (0 disables)")
+    parser.add_argument("--upload-dir", default=DEFAULT_UPLOAD_DIR, help="Upload directory to measure")
+    parser.add_argument("--keep-uploads", action="store_true", help="Leave the files this run uploaded on disk")
+    parser.add_argument("--sample-interval", type=float, default=10, help="Seconds between resource samples")
+    parser.add_argument("--mongo-port", type=int, default=27017, help="Port that identifies sockets to MongoDB")
+    parser.add_argument("--output", help="Write samples, windows and trends as JSON to this path")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("psutil") is None:
+        parser.error("the soak test needs psutil (pip install psutil)")
+    duration_s, window_s = parse_duration(args.duration), parse_duration(args.window)
+    warmup_s = parse_duration(args.warmup)
+
+    server = LocalServer(args.start_command, args.base_url, args.server_log) if args.start_command else None
+    pid = server.start() if server else (args.server_pid or find_server_pid(args.base_url))
+    if pid is None:
+        parser.error("no server found; pass --start-command or --server-pid")
+
+    print("🧪 SOAK TEST")
+    print("=" * 70)
+    print(f"{args.duration} against {args.base_url} in {args.window} windows, sampling pid {pid} "
+          f"every {args.sample_interval:g}s")
+    sampler = ResourceSampler(pid, args.upload_dir, args.mongo_port, args.sample_interval)
+    soak = SoakTest(LoadScenario.from_file(args.scenario), args.base_url, sampler, window_s,
+                    args.rate, args.users, args.poisson, parse_duration(args.upload_interval))
+
+    sampler.start()
+    try:
+        asyncio.run(soak.run(duration_s))
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted; analysing the windows collected so far")
+    finally:
+        sampler.stop()
+        if server:
+            server.stop()
+        if soak.uploaded and not args.keep_uploads:
+            print(f"🧹 Removed {soak.remove_uploads(args.upload_dir)} uploaded files")
+
+    trends = analyze(soak.windows, warmup_s)
+    print_report(trends, soak, warmup_s)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"samples": sampler.samples, "windows": soak.windows, "trends": trends}, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    return 1 if any(fit["verdict"] in ("leak", "drift") for fit in trends.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Dataset-size scaling benchmark for the stats endpoints.
+Grows one dedicated event in a local seeded mongod from 1k to 1M orders (plus
+a proportional number of approved testimonials) and, at each size, measures
+GET /api/stats and GET /api/admin/events/[id]/stats: latency, response size
+and the server process's memory. Fits value = a * N^b per metric and fails
+when any of them grows super-linearly.
+
+Memory needs psutil and the server's PID (--server-pid, or auto-detected from
+the process listening on the base URL's port when it is local).
+
+Usage:
+    python stats_scaling_benchmark.py --base-url http://localhost:3000/api [--sizes 1k,10k,100k,1M]
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from api_client import ADMIN_HEADERS, ApiClient, DEFAULT_API_BASE, NO_RETRY
+from bulk_photo_benchmark import SUPER_LINEAR_EXPONENT
+from db_seeder import DEFAULT_DB_NAME, DEFAULT_MONGO_URL, Seeder, is_local, make_testimonials, parse_count
+from perf_report import fit_power_law, summarize
+
+FLAT_EXPONENT = 0.2
+
+
+def find_server_pid(base_url: str) -> Optional[int]:
+    """PID of the local process listening on the base URL's port"""
+    import psutil
+    parts = urlsplit(base_url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    for conn in psutil.net_connections(kind="tcp"):
+        if conn.status == psutil.CONN_LISTEN and conn.laddr.port == port and conn.pid:
+            return conn.pid
+    return None
+
+
+class MemorySampler:
+    """Samples a process's RSS (MB) on a background thread while a block runs"""
+
+    def __init__(self, pid: Optional[int], interval_s: float = 0.05):
+        self.process = None
+        if pid is not None:
+            import psutil
+            self.process = psutil.Process(pid)
+        self.interval_s = interval_s
+        self.samples: List[float] = []
+        self._stop = threading.Event()
+
+    def rss_mb(self) -> float:
+        return self.process.memory_info().rss / 2**20 if self.process else 0.0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(self.rss_mb())
+            self._stop.wait(self.interval_s)
+
+    def __enter__(self):
+        self.samples = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        if self.process:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.process:
+            self._thread.join()
+
+
+class StatsScalingBenchmark:
+    def __init__(self, client: ApiClient, seeder: Seeder, memory: MemorySampler, repeats: int = 5,
+                 testimonial_ratio: float = 0.02):
+        self.client = client
+        self.seeder = seeder
+        self.memory = memory
+        self.repeats = repeats
+        self.testimonial_ratio = testimonial_ratio
+        self.event = None
+        self.orders = 0
+        self.testimonials = 0
+
+    def setup(self):
+        self.event = self.seeder.seed_events(1)[0]
+        print(f"🎫 Benchmark event {self.event['id']} ({self.event['title']})")
+
+    def grow_to(self, size: int):
+        if size > self.orders:
+            self.seeder.seed_orders([self.event], size - self.orders, offset=self.orders)
+            self.orders = size
+        wanted = int(size * self.testimonial_ratio)
+        if wanted > self.testimonials:
+            docs = make_testimonials([self.event], wanted - self.testimonials, self.seeder.rng, self.seeder.now)
+            for doc in docs:
+                doc["approved"] = True
+            self.seeder.insert("testimonials", docs)
+            self.testimonials = wanted
+
+    def measure(self, endpoint: str) -> Dict:
+        self.client.get(endpoint)  # warm-up, not counted
+        baseline_mb = self.memory.rss_mb()
+        latencies, sizes = [], []
+        with self.memory:
+            for _ in range(self.repeats):
+                response = self.client.get(endpoint)
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {endpoint} returned {response.status_code}")
+                timing = response.extensions["timing"]
+                latencies.append(timing.total_ms)
+                sizes.append(timing.response_bytes)
+        peak_mb = max(self.memory.samples, default=baseline_mb)
+        return {
+            "latency_ms": summarize(latencies),
+            "response_bytes": max(sizes),
+            "rss_baseline_mb": baseline_mb,
+            "rss_peak_mb": peak_mb,
+            "rss_growth_mb": max(peak_mb - baseline_mb, 0.0),
+        }
+
+    def cleanup(self):
+        if self.event is None:
+            return
+        db = self.seeder.db
+        db.tickets.delete_many({"eventId": self.event["id"]})
+        orders = db.orders.delete_many({"eventId": self.event["id"]}).deleted_count
+        db.testimonials.delete_many({"eventAttended": self.event["title"]})
+        db.events.delete_one({"id": self.event["id"]})
+        print(f"🧹 Removed the benchmark event, {orders:,} orders and their tickets")
+
+
+def fit_metric(sizes: List[int], values: List[float]) -> Dict:
+    a, b, r2 = fit_power_law(sizes, values)
+    _, tail_b, _ = fit_power_law(sizes[-2:], values[-2:])
+    return {"a": a, "exponent": b, "r_squared": r2, "tail_exponent": tail_b,
+            "super_linear": max(b, tail_b) > SUPER_LINEAR_EXPONENT}
+
+
+def analyze(results: Dict[str, Dict[int, Dict]]) -> Dict[str, Dict[str, Dict]]:
+    print("\n📐 COMPLEXITY FIT (value ≈ a · N^b):")
+    fits = {}
+    for endpoint, by_size in results.items():
+        sizes = sorted(by_size)
+        metrics = {
+            "latency p50": [by_size[n]["latency_ms"]["p50"] for n in sizes],
+            "response size": [by_size[n]["response_bytes"] for n in sizes],
+            "rss growth": [by_size[n]["rss_growth_mb"] for n in sizes],
+        }
+        fits[endpoint] = {}
+        for metric, values in metrics.items():
+            if not any(values):
+                continue
+            fit = fit_metric(sizes, values)
+            fits[endpoint][metric] = fit
+            growth = max(fit["exponent"], fit["tail_exponent"])
+            icon = "❌" if fit["super_linear"] else ("✅" if growth < FLAT_EXPONENT else "⚠️ ")
+            label = "super-linear" if fit["super_linear"] else ("flat" if growth < FLAT_EXPONENT else "grows with N")
+            print(f"  {icon} {endpoint:<34} {metric:<14} b={fit['exponent']:.2f} "
+                  f"(largest-N {fit['tail_exponent']:.2f}, R²={fit['r_squared']:.2f}) — {label}")
+    return fits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark for /api/stats and per-event stats")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--mongo-url", default=DEFAULT_MONGO_URL, help="Defaults to $MONGO_URL")
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Defaults to $DB_NAME or igk_events_db")
+    parser.add_argument("--sizes", default="1k,10k,100k,1M", help="Comma-separated order counts, e.g. 1k,10k,100k")
+    parser.add_argument("--repeats", type=int, default=5, help="Measured requests per endpoint and size")
+    parser.add_argument("--workers", type=int, help="Seeder processes (default: CPU count)")
+    parser.add_argument("--server-pid", type=int, help="PID of the Next.js server, for memory sampling")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--keep-data", action="store_true", help="Leave the benchmark event and its orders in place")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a non-local MongoDB host")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    if not is_local(args.mongo_url) and not args.allow_remote:
+        parser.error("this benchmark writes up to millions of documents; pass --allow-remote for a non-local host")
+    sizes = sorted(parse_count(s) for s in args.sizes.split(","))
+
+    pid = args.server_pid
+    if importlib.util.find_spec("psutil") is None:
+        print("⚠️  psutil is not installed; server memory will not be measured")
+        pid = None
+    elif pid is None and is_local(args.base_url):
+        pid = find_server_pid(args.base_url)
+    if pid is None:
+        print("⚠️  No server PID; pass --server-pid to measure server memory")
+
+    client = ApiClient(args.base_url, timeout=args.timeout, headers=ADMIN_HEADERS, retry=NO_RETRY)
+    seeder = Seeder(args.mongo_url, args.db_name, workers=args.workers)
+    benchmark = StatsScalingBenchmark(client, seeder, MemorySampler(pid), args.repeats)
+    endpoints = {"GET /api/stats": "stats"}
+    results: Dict[str, Dict[int, Dict]] = {}
+
+    print("📊 STATS SCALING BENCHMARK")
+    print("=" * 70)
+    try:
+        benchmark.setup()
+        endpoints["GET /api/admin/events/[id]/stats"] = f"admin/events/{benchmark.event['id']}/stats"
+        for size in sizes:
+            print(f"\n🌱 Growing to {size:,} orders...")
+            start = time.perf_counter()
+            benchmark.grow_to(size)
+            print(f"   seeded in {time.perf_counter() - start:.1f}s")
+            for name, path in endpoints.items():
+                result = benchmark.measure(path)
+                results.setdefault(name, {})[size] = result
+                s = result["latency_ms"]
+                print(f"  {name:<34} N={size:<9,} p50={s['p50']:>9.1f} ms  p95={s['p95']:>9.1f} ms  "
+                      f"{result['response_bytes']:>9,} B  RSS +{result['rss_growth_mb']:.0f} MB")
+    finally:
+        if not args.keep_data:
+            benchmark.cleanup()
+        seeder.close()
+        client.close()
+
+    fits = analyze(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"sizes": sizes, "results": results, "fits": fits}, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    return 1 if any(fit["super_linear"] for metrics in fits.values() for fit in metrics.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
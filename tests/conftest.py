@@ -0,0 +1,431 @@
+"""
+Shared fixtures for the API test suite.
+
+Every test builds its own data through the fixtures below, so tests are
+order-independent and can be spread across processes:
+
+    python -m pytest -n auto                  # pytest-xdist, one worker per core
+    python -m pytest --shard 2/4              # run the 2nd of 4 shards (e.g. one per CI job)
+
+Resources are namespaced per worker (theme names/slugs, event titles), carry
+their IDs back to the fixture that created them and are deleted by ID on
+teardown. Each worker writes its timings to test_reports/pytest/shard-<id>.json
+and the controller prints a per-shard summary at the end.
+
+Against a local mongod the suite can start every test from a database
+snapshot instead (db_snapshots.py): --db-dataset NAME restores the app's
+database before each test (or once per shard with --db-restore session), and
+the theme/photos/event fixtures hand out the snapshot's fixture documents
+rather than creating and deleting them through the API. With pytest-xdist
+each worker needs its own database and server; "{worker}" in --db-name and
+--base-url is replaced by the worker's number. Only a local mongod is touched
+unless --allow-remote-db is given, and the session fails when the server under
+test does not serve the restored database:
+
+    python -m pytest --db-dataset pytest
+    python -m pytest -n 4 --db-dataset pytest --db-name igk_test_{worker} --base-url http://127.0.0.1:310{worker}
+"""
+
+import glob
+import importlib.util
+import io
+import json
+import os
+import time
+import uuid
+
+import httpx
+import pytest
+from PIL import Image
+
+from api_client import ADMIN_HEADERS, ApiClient, DEFAULT_BASE_URL
+from async_runner import current_test
+from perf_report import PerfRecorder, REPORT_DIR
+
+SHARD_REPORT_PATTERN = os.path.join(REPORT_DIR, "shard-*.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("igk", "IGK API suite")
+    group.addoption("--base-url", default=os.environ.get("IGK_BASE_URL", DEFAULT_BASE_URL),
+                    help="Site under test (default: $IGK_BASE_URL or the preview deployment)")
+    group.addoption("--shard", default=None, metavar="K/N",
+                    help="Only run the K-th of N deterministic shards (1-based)")
+    group.addoption("--require-server", action="store_true", default=bool(os.environ.get("IGK_REQUIRE_SERVER")),
+                    help="Fail instead of skipping when the API is unreachable")
+    group.addoption("--db-dataset", default=os.environ.get("IGK_DB_DATASET"),
+                    help="Restore the app database from this db_snapshots dataset (needs a local mongod)")
+    group.addoption("--db-restore", choices=("test", "session"), default="test",
+                    help="Restore before every test (default) or once per worker/shard")
+    group.addoption("--mongo-url", default=None, help="Default: $MONGO_URL or mongodb://localhost:27017")
+    group.addoption("--db-name", default=None,
+                    help="Database the server under test uses (default: $DB_NAME or igk_events_db)")
+    group.addoption("--rebuild-snapshot", action="store_true", help="Rebuild the dataset's snapshot first")
+    group.addoption("--allow-remote-db", action="store_true",
+                    help="Let --db-dataset restore into a non-local MongoDB host (drops collections there)")
+
+
+def worker_id(config) -> str:
+    """xdist worker name (gw0, gw1, ...), the --shard spec, or 'main' for a plain run"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        return worker
+    shard = config.getoption("--shard")
+    return f"shard{shard.replace('/', 'of')}" if shard else "main"
+
+
+def worker_index(config) -> int:
+    """0, 1, ... for xdist workers gw0, gw1, ...; K-1 for --shard K/N; 0 otherwise"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        return int(worker.lstrip("gw"))
+    shard = config.getoption("--shard")
+    return int(shard.split("/")[0]) - 1 if shard else 0
+
+
+def is_controller(config) -> bool:
+    return not hasattr(config, "workerinput")
+
+
+def open_snapshot_store(config):
+    """SnapshotStore for --db-dataset, or None when the suite runs against the API alone"""
+    if not config.getoption("--db-dataset"):
+        return None
+    if importlib.util.find_spec("pymongo") is None:
+        raise pytest.UsageError("--db-dataset needs pymongo (pip install pymongo)")
+    from db_snapshots import SnapshotStore
+    from db_seeder import DEFAULT_MONGO_URL, is_local
+    mongo_url = config.getoption("--mongo-url") or DEFAULT_MONGO_URL
+    if not is_local(mongo_url) and not config.getoption("--allow-remote-db"):
+        raise pytest.UsageError(f"--db-dataset refuses to overwrite and drop collections on non-local MongoDB host "
+                                f"{mongo_url}; pass --allow-remote-db if you really mean it")
+    return SnapshotStore(mongo_url)
+
+
+def pytest_configure(config):
+    config.igk_run_id = getattr(config, "workerinput", {}).get("igk_run_id") or uuid.uuid4().hex[:6]
+    config.igk_started = time.perf_counter()
+    if is_controller(config):
+        for path in glob.glob(SHARD_REPORT_PATTERN):
+            os.remove(path)
+        # Build (or validate) the snapshot once, before any xdist worker starts restoring from it
+        store = open_snapshot_store(config)
+        if store is not None:
+            from pymongo.errors import PyMongoError
+            try:
+                store.ensure(config.getoption("--db-dataset"), config.getoption("--rebuild-snapshot"))
+            except KeyError as e:
+                raise pytest.UsageError(e.args[0])
+            except PyMongoError as e:
+                raise pytest.UsageError(f"--db-dataset: MongoDB error: {e}")
+            finally:
+                store.close()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """xdist hook: give every worker the controller's run id so namespaces share a prefix"""
+    node.workerinput["igk_run_id"] = node.config.igk_run_id
+
+
+def pytest_collection_modifyitems(config, items):
+    shard = config.getoption("--shard")
+    if not shard:
+        return
+    index, total = (int(part) for part in shard.split("/"))
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard {shard}: K must be between 1 and N")
+    # Round-robin over node ids sorted by name: balanced, and the same split on every machine
+    ordered = sorted(items, key=lambda item: item.nodeid)
+    selected = set(ordered[index - 1::total])
+    deselected = [item for item in items if item not in selected]
+    config.hook.pytest_deselected(items=deselected)
+    items[:] = [item for item in items if item in selected]
+
+
+@pytest.fixture(scope="session")
+def namespace(pytestconfig) -> str:
+    """Prefix for everything this worker creates, e.g. 'pt-3f9a2c-gw1'"""
+    return f"pt-{pytestconfig.igk_run_id}-{worker_id(pytestconfig)}"
+
+
+@pytest.fixture(scope="session")
+def api_base(pytestconfig) -> str:
+    base_url = pytestconfig.getoption("--base-url").replace("{worker}", str(worker_index(pytestconfig)))
+    return f"{base_url.rstrip('/')}/api"
+
+
+class DatabaseSnapshot:
+    """The app database on this worker, restorable to a db_snapshots dataset"""
+
+    def __init__(self, store, dataset: str, db_name: str, per_test: bool):
+        self.store = store
+        self.dataset = dataset
+        self.db_name = db_name
+        self.per_test = per_test
+        self.meta = store.ensure(dataset)
+        self.restore_ms = []
+        self.dirty = True
+
+    def restore(self):
+        self.restore_ms.append(self.store.restore(self.dataset, self.db_name, self.meta)["ms"])
+        self.dirty = False
+
+    def fixtures(self, collection: str, **match) -> list:
+        """Copies of the snapshot's fixture documents in `collection` whose fields equal `match`"""
+        return [dict(d) for d in self.meta["fixtures"].get(collection, [])
+                if all(d.get(key) == value for key, value in match.items())]
+
+    def check_server(self, api: ApiClient):
+        """Fail unless the server under test reads this database: it must serve the snapshot's published theme"""
+        themes = self.fixtures("gallery_themes", status="published")
+        if not themes:
+            return  # captured snapshots carry no fixture documents to look for
+        response = api.get(f"gallery/themes/{themes[0]['slug']}")
+        served = response.json().get("theme", {}).get("id") if response.status_code == 200 else None
+        if served != themes[0]["id"]:
+            pytest.fail(f"the server at {api.base_url} does not serve database {self.db_name} "
+                        f"(GET gallery/themes/{themes[0]['slug']} returned {response.status_code}); start it with "
+                        f"DB_NAME={self.db_name} and the same MONGO_URL, or pass the server's --db-name",
+                        pytrace=False)
+
+    def fixture(self, collection: str, **match) -> dict:
+        docs = self.fixtures(collection, **match)
+        if not docs:
+            pytest.skip(f"snapshot '{self.dataset}' has no {collection} fixture matching {match}")
+        return docs[0]
+
+
+@pytest.fixture(scope="session")
+def db_snapshot(pytestconfig, api):
+    """DatabaseSnapshot when --db-dataset is given, else None"""
+    store = open_snapshot_store(pytestconfig)
+    if store is None:
+        yield None
+        return
+    from db_seeder import DEFAULT_DB_NAME
+    db_name = (pytestconfig.getoption("--db-name") or DEFAULT_DB_NAME).replace(
+        "{worker}", str(worker_index(pytestconfig)))
+    per_test = pytestconfig.getoption("--db-restore") == "test"
+    if int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1")) > 1 and "{worker}" not in (
+            pytestconfig.getoption("--db-name") or ""):
+        store.close()
+        pytest.fail("with several xdist workers each needs its own database: put {worker} in --db-name "
+                    "(and run one server per database)", pytrace=False)
+    snapshot = DatabaseSnapshot(store, pytestconfig.getoption("--db-dataset"), db_name, per_test)
+    snapshot.restore()
+    try:
+        snapshot.check_server(api)
+    except BaseException:
+        store.close()
+        raise
+    pytestconfig.igk_db_snapshot = snapshot
+    yield snapshot
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def _restore_database(request):
+    """With --db-restore test, every test starts from the snapshot, whatever the previous one left behind.
+    Restoring before rather than after a test leaves a failed test's data in place for inspection."""
+    if not request.config.getoption("--db-dataset"):
+        yield
+        return
+    snapshot = request.getfixturevalue("db_snapshot")
+    if snapshot.per_test and snapshot.dirty:
+        snapshot.restore()
+    yield
+    snapshot.dirty = True
+
+
+@pytest.fixture(scope="session")
+def perf(pytestconfig) -> PerfRecorder:
+    pytestconfig.igk_perf = PerfRecorder(current_test)
+    return pytestconfig.igk_perf
+
+
+def _client(api_base, perf, headers=None) -> ApiClient:
+    client = ApiClient(api_base, timeout=30, headers=headers)
+    client.add_listener(perf.record)
+    return client
+
+
+@pytest.fixture(scope="session")
+def api(pytestconfig, api_base, perf):
+    """Pooled keep-alive client for public endpoints, shared by every test on this worker"""
+    client = _client(api_base, perf)
+    try:
+        client.get("health").raise_for_status()
+    except httpx.HTTPError as e:
+        client.close()
+        message = f"API at {api_base} is unreachable: {e}"
+        if pytestconfig.getoption("--require-server"):
+            pytest.fail(message, pytrace=False)
+        pytest.skip(message)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def admin_api(api, api_base, perf):
+    """Pooled client that sends the admin password header"""
+    client = _client(api_base, perf, ADMIN_HEADERS)
+    yield client
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def _current_test(request):
+    """Attribute every request a test makes to it in the shard timing report"""
+    token = current_test.set(request.node.nodeid)
+    yield
+    current_test.reset(token)
+
+
+@pytest.fixture
+def unique_name(namespace):
+    def make(kind: str) -> str:
+        return f"{namespace} {kind} {uuid.uuid4().hex[:8]}"
+    return make
+
+
+@pytest.fixture
+def theme_factory(admin_api, unique_name, db_snapshot):
+    """Create gallery themes on demand; all of them are deleted (with their photos) afterwards,
+    unless the next test's snapshot restore removes them anyway"""
+    created = []
+
+    def make(status: str = "published", **fields):
+        response = admin_api.post("admin/gallery/themes", json={
+            "name": unique_name("Theme"),
+            "description": "Created by the pytest suite",
+            "status": status,
+            **fields,
+        })
+        assert response.status_code == 201, response.text
+        theme = response.json()["theme"]
+        created.append(theme["id"])
+        return theme
+
+    yield make
+    if db_snapshot is not None and db_snapshot.per_test:
+        return
+    for theme_id in created:
+        admin_api.delete(f"admin/gallery/themes/{theme_id}")
+
+
+@pytest.fixture
+def theme(request, db_snapshot):
+    """A published theme: the snapshot's fixture theme when restoring per test, else a new one"""
+    if db_snapshot is not None and db_snapshot.per_test:
+        return db_snapshot.fixture("gallery_themes", status="published")
+    return request.getfixturevalue("theme_factory")()
+
+
+@pytest.fixture
+def photos(admin_api, theme, db_snapshot):
+    """Three photos in `theme`, in creation order"""
+    if db_snapshot is not None and db_snapshot.per_test:
+        return sorted(db_snapshot.fixtures("gallery_photos", themeId=theme["id"]), key=lambda p: p["order"])
+    response = admin_api.post(f"admin/gallery/themes/{theme['id']}/photos", json={"photos": [
+        {"imageUrl": f"https://example.com/pytest/{uuid.uuid4().hex}.jpg", "caption": f"Photo {i}"}
+        for i in range(3)
+    ]})
+    assert response.status_code == 201, response.text
+    return response.json()["photos"]
+
+
+@pytest.fixture
+def event(admin_api, unique_name, db_snapshot):
+    """A draft event without orders"""
+    if db_snapshot is not None and db_snapshot.per_test:
+        yield db_snapshot.fixture("events", slug="fixture-event")
+        return
+    response = admin_api.post("admin/events", json={
+        "title": unique_name("Event"),
+        "status": "draft",
+        "city": "Berlin",
+        "capacity": 50,
+        "date": "2030-01-01",
+    })
+    assert response.status_code == 201, response.text
+    event = response.json()["event"]
+    yield event
+    admin_api.delete(f"admin/events/{event['id']}")
+
+
+@pytest.fixture(scope="session")
+def jpeg_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (100, 100), color="red").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+# --- per-shard timing -------------------------------------------------------
+
+def pytest_sessionstart(session):
+    session.config.igk_outcomes = {}
+    session.config.igk_perf = None
+    session.config.igk_db_snapshot = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    entry = item.config.igk_outcomes.setdefault(item.nodeid, {
+        "test": item.nodeid, "test_func": item.nodeid, "duration_s": 0.0, "success": True, "message": ""})
+    entry["duration_s"] += report.duration
+    if report.failed:
+        entry["success"] = False
+        entry["message"] = str(report.longrepr).splitlines()[-1] if report.longrepr else "failed"
+    elif report.skipped and report.when != "teardown":
+        entry["skipped"] = True
+
+
+def pytest_sessionfinish(session):
+    """Write this worker's test durations and per-endpoint latencies to shard-<id>.json"""
+    config = session.config
+    if not config.igk_outcomes:
+        return
+    shard = worker_id(config)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    metadata = {
+        "shard": shard,
+        "wall_s": time.perf_counter() - config.igk_started,
+        "test_s": sum(r["duration_s"] for r in config.igk_outcomes.values()),
+    }
+    if config.igk_db_snapshot is not None:
+        restore_ms = config.igk_db_snapshot.restore_ms
+        metadata["db_restores"] = len(restore_ms)
+        metadata["db_restore_ms"] = sum(restore_ms) / len(restore_ms) if restore_ms else 0.0
+    results = [r for r in config.igk_outcomes.values() if not r.get("skipped")]
+    (config.igk_perf or PerfRecorder()).write_json(os.path.join(REPORT_DIR, f"shard-{shard}.json"), results, metadata)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not is_controller(config):
+        return
+    shards = []
+    for path in sorted(glob.glob(SHARD_REPORT_PATTERN)):
+        with open(path) as f:
+            report = json.load(f)
+        shards.append((report["metadata"], report["results"], report["endpoints"]))
+    if not shards:
+        return
+
+    wall_s = time.perf_counter() - config.igk_started
+    terminalreporter.section("per-shard timing")
+    for metadata, results, endpoints in shards:
+        requests = sum(e["count"] for e in endpoints.values())
+        slowest = max(results, key=lambda r: r["duration_s"], default=None)
+        terminalreporter.write_line(
+            f"{metadata['shard']:<12} {len(results):>4} tests  {metadata['test_s']:>7.2f}s in tests  "
+            f"{requests:>5} requests" + (f"  slowest {slowest['duration_s']:.2f}s {slowest['test']}" if slowest else "")
+            + (f"  {metadata['db_restores']} db restores, {metadata['db_restore_ms']:.1f} ms avg"
+               if metadata.get("db_restores") else ""))
+    if len(shards) < 2:
+        return
+    busy_s = sum(m["test_s"] for m, _, _ in shards)
+    terminalreporter.write_line(f"{'total':<12} {busy_s:.2f}s of test time in {wall_s:.2f}s wall "
+                                f"({busy_s / wall_s if wall_s else 0:.1f}× parallel speed-up)")
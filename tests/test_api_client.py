@@ -0,0 +1,203 @@
+"""ApiClient retry policy, redirects and HTTP cache, offline through httpx.MockTransport"""
+
+import httpx
+import pytest
+
+from api_client import ApiClient, HttpCache, RetryPolicy, freshness_lifetime
+
+BASE_URL = "http://api.test/api"
+FAST_RETRY = RetryPolicy(max_retries=2, backoff_base=0.0)
+
+
+def mock_client(handler, **kwargs) -> ApiClient:
+    return ApiClient(BASE_URL, transport=httpx.MockTransport(handler), **kwargs)
+
+
+def flaky(statuses):
+    """Handler answering with `statuses` in turn, recording every request it sees"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(statuses[min(len(seen), len(statuses)) - 1], json={"n": len(seen)})
+
+    return handler, seen
+
+
+def test_retry_delay_is_capped_exponential_backoff():
+    policy = RetryPolicy(backoff_base=0.25, backoff_max=1.0, jitter=0.0)
+
+    assert [policy.delay(attempt) for attempt in range(4)] == [0.25, 0.5, 1.0, 1.0]
+
+
+def test_retry_delay_jitter_only_shortens():
+    policy = RetryPolicy(backoff_base=1.0, jitter=0.5)
+
+    assert all(0.5 <= policy.delay(0) <= 1.0 for _ in range(100))
+
+
+def test_retry_rules_by_method_status_and_attempt():
+    policy = RetryPolicy(max_retries=2)
+
+    assert policy.should_retry_status("GET", 503, 0)
+    assert not policy.should_retry_status("GET", 503, 2)
+    assert not policy.should_retry_status("GET", 404, 0)
+    assert not policy.should_retry_status("POST", 503, 0)
+    assert policy.should_retry_error("GET", httpx.ReadTimeout("slow"), 0)
+    assert not RetryPolicy(retry_timeouts=False).should_retry_error("GET", httpx.ReadTimeout("slow"), 0)
+    assert policy.should_retry_error("DELETE", httpx.ConnectError("refused"), 1)
+    assert not policy.should_retry_error("POST", httpx.ConnectError("refused"), 0)
+
+
+def test_get_is_retried_until_success():
+    handler, seen = flaky([503, 502, 200])
+    with mock_client(handler, retry=FAST_RETRY) as client:
+        response = client.get("events")
+
+    assert response.status_code == 200
+    assert len(seen) == 3
+    assert response.extensions["timing"].attempts == 3
+    assert client.stats.retries == 2
+
+
+def test_last_response_is_returned_when_retries_run_out():
+    handler, seen = flaky([503])
+    with mock_client(handler, retry=FAST_RETRY) as client:
+        response = client.get("events")
+
+    assert response.status_code == 503
+    assert len(seen) == FAST_RETRY.max_retries + 1
+
+
+def test_post_is_never_retried():
+    handler, seen = flaky([503, 201])
+    with mock_client(handler, retry=FAST_RETRY) as client:
+        response = client.post("orders", json={"quantity": 1})
+
+    assert response.status_code == 503
+    assert len(seen) == 1
+
+
+def test_transport_errors_raise_once_retries_run_out():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    with mock_client(handler, retry=FAST_RETRY) as client, pytest.raises(httpx.ConnectError):
+        client.get("health")
+    assert len(attempts) == 3
+
+
+def test_redirects_are_followed():
+    def handler(request):
+        if request.url.path == "/api/events/":
+            return httpx.Response(308, headers={"Location": f"{BASE_URL}/events"})
+        return httpx.Response(200, json={"events": []})
+
+    with mock_client(handler) as client:
+        response = client.get("events/")
+
+    assert response.status_code == 200
+    assert response.json() == {"events": []}
+
+
+def headers(**values) -> httpx.Headers:
+    return httpx.Headers({name.replace("_", "-"): value for name, value in values.items()})
+
+
+@pytest.mark.parametrize("values, lifetime", [
+    ({"cache_control": "public, max-age=60"}, 60.0),
+    ({"cache_control": "max-age=60, no-cache"}, 0.0),
+    ({"cache_control": "max-age=abc"}, 0.0),
+    ({"expires": "Wed, 21 Oct 2026 07:28:30 GMT", "date": "Wed, 21 Oct 2026 07:28:00 GMT"}, 30.0),
+    ({"expires": "0"}, 0.0),
+    ({"cache_control": "max-age=10", "expires": "Wed, 21 Oct 2026 07:28:30 GMT"}, 10.0),
+    ({}, None),
+])
+def test_freshness_lifetime(values, lifetime):
+    assert freshness_lifetime(headers(**values)) == lifetime
+
+
+def test_fresh_response_is_served_from_cache():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, headers={"Cache-Control": "max-age=60"}, json={"themes": []})
+
+    with mock_client(handler, cache=HttpCache()) as client:
+        first, second = client.get("gallery/themes"), client.get("gallery/themes")
+
+    assert len(seen) == 1
+    assert second.json() == first.json()
+    assert second.extensions["timing"].cache == "hit"
+    assert client.cache.stats.hits == 1
+
+
+def test_stale_response_is_revalidated_with_its_etag():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "max-age=60"})
+        return httpx.Response(200, headers={"ETag": '"v1"', "Cache-Control": "no-cache"}, json={"events": [1]})
+
+    with mock_client(handler, cache=HttpCache()) as client:
+        client.get("events")
+        revalidated = client.get("events")
+        cached = client.get("events")
+
+    assert len(seen) == 2
+    assert seen[1].headers["if-none-match"] == '"v1"'
+    assert revalidated.status_code == 200
+    assert revalidated.json() == {"events": [1]}
+    assert revalidated.extensions["timing"].cache == "revalidated"
+    # The 304's max-age made the entry fresh again
+    assert cached.extensions["timing"].cache == "hit"
+
+
+def test_no_store_and_vary_star_are_not_cached():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        cache_control = "no-store" if request.url.path.endswith("settings") else "max-age=60"
+        vary = "*" if request.url.path.endswith("team") else ""
+        return httpx.Response(200, headers={"Cache-Control": cache_control, "Vary": vary}, json={})
+
+    with mock_client(handler, cache=HttpCache()) as client:
+        for endpoint in ("settings", "settings", "team", "team"):
+            client.get(endpoint)
+
+    assert len(seen) == 4
+    assert client.cache.stats.uncacheable == 4
+
+
+def test_vary_header_keys_the_entry():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"}, json={})
+
+    with mock_client(handler, cache=HttpCache()) as client:
+        client.get("events", headers={"Accept-Language": "de"})
+        client.get("events", headers={"Accept-Language": "de"})
+        client.get("events", headers={"Accept-Language": "en"})
+
+    assert len(seen) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    def handler(request):
+        return httpx.Response(200, headers={"Cache-Control": "max-age=60"}, json={})
+
+    with mock_client(handler, cache=HttpCache(max_entries=2)) as client:
+        for endpoint in ("a", "b", "a", "c"):
+            client.get(endpoint)
+        cached = {endpoint: client.get(endpoint).extensions["timing"].cache for endpoint in ("a", "c", "b")}
+
+    assert cached == {"a": "hit", "c": "hit", "b": "miss"}
@@ -0,0 +1,121 @@
+"""Scheduling in async_runner.py: dependency order, cycles and the concurrency limit"""
+
+import asyncio
+
+import pytest
+
+from async_runner import AsyncTestRunner, depends_on
+
+
+def make_test(name, log, deps=(), delay=0.0):
+    async def test():
+        log.append(f"start {name}")
+        await asyncio.sleep(delay)
+        log.append(f"end {name}")
+    test.__name__ = name
+    return depends_on(*deps)(test) if deps else test
+
+
+def test_execution_order_keeps_registration_order():
+    runner = AsyncTestRunner()
+    for name in ["create", "public", "photo", "slug"]:
+        runner.add(make_test(name, []))
+
+    assert runner.execution_order() == ["create", "public", "photo", "slug"]
+
+
+def test_execution_order_moves_a_test_after_later_dependencies():
+    runner = AsyncTestRunner()
+    runner.add(make_test("photo", [], deps=("create",)))
+    runner.add(make_test("public", []))
+    runner.add(make_test("create", []))
+
+    assert runner.execution_order() == ["public", "create", "photo"]
+
+
+def test_extra_dependencies_passed_to_add_are_honoured():
+    runner = AsyncTestRunner()
+    runner.add(make_test("second", []), depends_on=("first",))
+    runner.add(make_test("first", []))
+
+    assert runner.execution_order() == ["first", "second"]
+
+
+def test_cycle_is_rejected():
+    runner = AsyncTestRunner()
+    runner.add(make_test("a", [], deps=("b",)))
+    runner.add(make_test("b", [], deps=("a",)))
+
+    with pytest.raises(ValueError, match="cycle"):
+        runner.execution_order()
+
+
+def test_unregistered_dependency_is_rejected():
+    runner = AsyncTestRunner()
+    runner.add(make_test("photo", [], deps=("create",)))
+
+    with pytest.raises(ValueError, match="unregistered"):
+        runner.execution_order()
+
+
+def test_concurrency_one_runs_sequentially_in_order():
+    log = []
+    runner = AsyncTestRunner(max_concurrency=1)
+    for name in ["a", "b", "c"]:
+        runner.add(make_test(name, log, delay=0.01))
+
+    asyncio.run(runner.run())
+
+    assert log == ["start a", "end a", "start b", "end b", "start c", "end c"]
+
+
+def test_independent_tests_overlap():
+    log = []
+    runner = AsyncTestRunner(max_concurrency=4)
+    for name in ["a", "b"]:
+        runner.add(make_test(name, log, delay=0.05))
+
+    asyncio.run(runner.run())
+
+    assert log[:2] == ["start a", "start b"]
+
+
+def test_dependents_wait_for_their_dependencies():
+    log = []
+    runner = AsyncTestRunner(max_concurrency=4)
+    runner.add(make_test("slow", log, delay=0.05))
+    runner.add(make_test("after", log, deps=("slow",)))
+
+    asyncio.run(runner.run())
+
+    assert log.index("end slow") < log.index("start after")
+
+
+def test_sync_tests_run_in_a_thread():
+    calls = []
+
+    def plain():
+        calls.append("plain")
+
+    runner = AsyncTestRunner()
+    runner.add(plain)
+    durations = asyncio.run(runner.run())
+
+    assert calls == ["plain"]
+    assert set(durations) == {"plain"}
+
+
+def test_errors_are_recorded_and_dependents_still_run():
+    log = []
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    runner = AsyncTestRunner()
+    runner.add(broken)
+    runner.add(make_test("after", log, deps=("broken",)))
+    asyncio.run(runner.run())
+
+    assert str(runner.errors["broken"]) == "boom"
+    assert log == ["start after", "end after"]
+    assert set(runner.durations) == {"broken", "after"}
@@ -0,0 +1,133 @@
+"""Cassette record -> replay round trip through ShapingProxy and StandInServer, against a local upstream"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from cassette import Cassette, StandInServer, request_keys
+from shaping_proxy import ShapingProfile, ShapingProxy
+
+
+class Upstream(BaseHTTPRequestHandler):
+    """Counts calls per path so repeated requests get distinguishable answers"""
+
+    calls = {}
+
+    def _send(self, status, payload):
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", f'"{len(content)}"')
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        n = self.calls[self.path] = self.calls.get(self.path, 0) + 1
+        self._send(200, {"path": self.path, "call": n})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._send(201, {"created": body})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    Upstream.calls = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+REQUESTS = [
+    ("GET", "/api/events?b=2&a=1", None),
+    ("GET", "/api/events?b=2&a=1", None),
+    ("GET", "/api/events/abc123", None),
+    ("POST", "/api/admin/events", {"title": "Holi", "capacity": 10}),
+]
+
+
+async def exchange(base_url, requests):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        return [await client.request(method, path, json=body) for method, path, body in requests]
+
+
+async def record(upstream, path):
+    cassette = Cassette(path)
+    proxy = ShapingProxy(upstream, ShapingProfile("passthrough"), port=0, recorder=cassette)
+    await proxy.start()
+    try:
+        responses = await exchange(proxy.base_url, REQUESTS)
+    finally:
+        await proxy.stop()
+        cassette.close()
+    return responses
+
+
+async def replay(path, requests, match="loose"):
+    cassette = Cassette(path)
+    server = StandInServer(cassette, port=0, match=match)
+    await server.start()
+    try:
+        responses = await exchange(f"http://127.0.0.1:{server.port}", requests)
+    finally:
+        await server.stop()
+        cassette.close()
+    return responses, server
+
+
+def test_replay_reproduces_the_recording(upstream, tmp_path):
+    path = str(tmp_path / "run.cassette")
+    recorded = asyncio.run(record(upstream, path))
+    replayed, server = asyncio.run(replay(path, REQUESTS))
+
+    assert [r.status_code for r in replayed] == [200, 200, 200, 201]
+    assert [r.json() for r in replayed] == [r.json() for r in recorded]
+    assert replayed[0].json()["call"] == 1 and replayed[1].json()["call"] == 2
+    assert replayed[0].headers["etag"] == recorded[0].headers["etag"]
+    assert all(r.headers["x-cassette"] == "exact" for r in replayed)
+    assert server.misses == {}
+
+
+def test_replay_matches_loosely_and_repeats_the_last_answer(upstream, tmp_path):
+    path = str(tmp_path / "run.cassette")
+    asyncio.run(record(upstream, path))
+    replayed, server = asyncio.run(replay(path, [
+        ("GET", "/api/events/abc123", None),
+        ("GET", "/api/events/abc123", None),
+        ("POST", "/api/admin/events", {"title": "Diwali"}),
+        ("GET", "/api/events/zzz999", None),
+    ]))
+
+    assert replayed[1].json() == replayed[0].json()
+    assert replayed[2].headers["x-cassette"] == "loose"
+    assert replayed[2].json() == {"created": {"title": "Holi", "capacity": 10}}
+    assert replayed[3].status_code == 404
+    assert server.misses == {"GET /api/events/zzz999": 1}
+
+
+def test_template_matching_answers_other_ids(upstream, tmp_path):
+    path = str(tmp_path / "run.cassette")
+    asyncio.run(record(upstream, path))
+    replayed, server = asyncio.run(replay(path, [("GET", "/api/events/zzz999", None)], match="template"))
+
+    assert replayed[0].headers["x-cassette"] == "template"
+    assert replayed[0].json()["path"] == "/api/events/abc123"
+
+
+def test_request_keys_ignore_query_and_json_key_order():
+    a = request_keys("POST", "/api/x?b=2&a=1", b'{"b": 1, "a": 2}')
+    b = request_keys("POST", "/api/x?a=1&b=2", b'{"a":2,"b":1}')
+
+    assert a == b
+    assert a["loose"] == "POST /api/x?a=1&b=2"
+    assert request_keys("POST", "/api/x", b'{"a": 3}')["exact"] != a["exact"]
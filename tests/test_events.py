@@ -0,0 +1,19 @@
+"""Event endpoints: GET /api/events/[slug] and GET /api/admin/events/[id]/stats"""
+
+
+def test_event_by_slug(api, event):
+    response = api.get(f"events/{event['slug']}")
+
+    assert response.status_code == 200
+    body = response.json()["event"]
+    assert body["id"] == event["id"]
+    assert "classification" in body
+
+
+def test_new_event_has_empty_stats(admin_api, event):
+    response = admin_api.get(f"admin/events/{event['id']}/stats")
+
+    assert response.status_code == 200
+    stats = response.json()["stats"]
+    assert stats["totalOrders"] == 0
+    assert stats["tickets"]["total"] == 0
@@ -0,0 +1,84 @@
+"""Admin gallery endpoints: themes CRUD, bulk photos, reorder and photo delete"""
+
+import uuid
+
+from api_client import ApiClient
+
+
+def test_create_theme_derives_namespaced_slug(theme_factory, namespace):
+    theme = theme_factory()
+
+    assert theme["slug"].startswith(namespace.lower())
+    assert theme["photoCount"] == 0
+
+
+def test_create_theme_requires_name(admin_api):
+    response = admin_api.post("admin/gallery/themes", json={"description": "no name"})
+
+    assert response.status_code == 400
+
+
+def test_admin_list_includes_drafts(admin_api, theme_factory):
+    draft = theme_factory(status="draft")
+
+    response = admin_api.get("admin/gallery/themes")
+
+    assert response.status_code == 200
+    assert draft["id"] in [t["id"] for t in response.json()["themes"]]
+
+
+def test_admin_endpoints_reject_wrong_password(api, api_base):
+    with ApiClient(api_base, timeout=30, headers={"x-admin-password": f"wrong-{uuid.uuid4().hex}"}) as client:
+        response = client.get("admin/gallery/themes")
+
+    assert response.status_code == 401
+
+
+def test_update_theme(admin_api, theme):
+    response = admin_api.put(f"admin/gallery/themes/{theme['id']}",
+                             json={"description": "Updated by the pytest suite"})
+    assert response.status_code == 200
+
+    fetched = admin_api.get(f"admin/gallery/themes/{theme['id']}").json()["theme"]
+    assert fetched["description"] == "Updated by the pytest suite"
+
+
+def test_bulk_add_photos_updates_count(admin_api, theme, photos):
+    response = admin_api.get(f"admin/gallery/themes/{theme['id']}/photos")
+
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()["photos"]] == [p["id"] for p in photos]
+    assert admin_api.get(f"admin/gallery/themes/{theme['id']}").json()["theme"]["photoCount"] == len(photos)
+
+
+def test_bulk_add_requires_photo_array(admin_api, theme):
+    response = admin_api.post(f"admin/gallery/themes/{theme['id']}/photos", json={"photos": "not-a-list"})
+
+    assert response.status_code == 400
+
+
+def test_reorder_photos(admin_api, theme, photos):
+    new_order = [p["id"] for p in reversed(photos)]
+
+    response = admin_api.post(f"admin/gallery/themes/{theme['id']}/reorder", json={"photoIds": new_order})
+
+    assert response.status_code == 200
+    listed = admin_api.get(f"admin/gallery/themes/{theme['id']}/photos").json()["photos"]
+    assert [p["id"] for p in listed] == new_order
+
+
+def test_delete_photo(admin_api, theme, photos):
+    response = admin_api.delete(f"admin/gallery/photos/{photos[0]['id']}")
+
+    assert response.status_code == 200
+    remaining = admin_api.get(f"admin/gallery/themes/{theme['id']}/photos").json()["photos"]
+    assert photos[0]["id"] not in [p["id"] for p in remaining]
+
+
+def test_delete_theme_removes_it(admin_api, theme_factory):
+    theme = theme_factory()
+
+    response = admin_api.delete(f"admin/gallery/themes/{theme['id']}")
+
+    assert response.status_code == 200
+    assert admin_api.get(f"admin/gallery/themes/{theme['id']}").status_code == 404
@@ -0,0 +1,34 @@
+"""Public gallery endpoints: GET /api/gallery/themes and /api/gallery/themes/[slug]"""
+
+import uuid
+
+
+def test_published_theme_is_listed(api, theme):
+    response = api.get("gallery/themes")
+
+    assert response.status_code == 200
+    assert theme["id"] in [t["id"] for t in response.json()["themes"]]
+
+
+def test_draft_theme_is_not_listed(api, theme_factory):
+    draft = theme_factory(status="draft")
+
+    response = api.get("gallery/themes")
+
+    assert response.status_code == 200
+    assert draft["id"] not in [t["id"] for t in response.json()["themes"]]
+
+
+def test_theme_by_slug_includes_photos(api, theme, photos):
+    response = api.get(f"gallery/themes/{theme['slug']}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["theme"]["id"] == theme["id"]
+    assert {p["id"] for p in body["photos"]} == {p["id"] for p in photos}
+
+
+def test_unknown_slug_is_404(api, namespace):
+    response = api.get(f"gallery/themes/{namespace}-missing-{uuid.uuid4().hex[:8]}")
+
+    assert response.status_code == 404
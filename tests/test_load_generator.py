@@ -0,0 +1,105 @@
+"""Scenario parsing, weighting and report aggregation in load_generator.py"""
+
+import json
+import os
+import random
+from collections import Counter
+
+import pytest
+
+from load_generator import EndpointStats, LoadReport, LoadScenario, ScenarioRequest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_scenario(tmp_path, **raw) -> str:
+    path = tmp_path / "scenario.json"
+    path.write_text(json.dumps(raw))
+    return str(path)
+
+
+def test_shipped_scenario_parses():
+    scenario = LoadScenario.from_file(os.path.join(ROOT, "load_scenarios.json"))
+
+    assert scenario.name == "ticket-drop"
+    assert scenario.think_time_ms == 250
+    assert sum(r.weight for r in scenario.requests) == 100
+    slug = next(r for r in scenario.requests if "{theme_slug}" in r.path)
+    assert slug.expected_status == [200, 404]
+
+
+def test_request_defaults(tmp_path):
+    scenario = LoadScenario.from_file(write_scenario(tmp_path, requests=[{"name": "events", "path": "events"}]))
+
+    request = scenario.requests[0]
+    assert (request.method, request.weight, request.body, request.expected_status) == ("GET", 1, None, [200])
+    assert scenario.name == str(tmp_path / "scenario.json")
+    assert scenario.variables == {} and scenario.think_time_ms == 0
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"requests": []}, "defines no requests"),
+    ({}, "defines no requests"),
+    ({"requests": [{"name": "a", "path": "a", "weight": 0}]}, "non-positive weight"),
+])
+def test_invalid_scenarios_are_rejected(tmp_path, raw, message):
+    with pytest.raises(ValueError, match=message):
+        LoadScenario.from_file(write_scenario(tmp_path, **raw))
+
+
+def test_unknown_request_keys_are_rejected(tmp_path):
+    with pytest.raises(TypeError):
+        LoadScenario.from_file(write_scenario(tmp_path, requests=[{"name": "a", "path": "a", "weigth": 2}]))
+
+
+def test_pick_follows_the_weights():
+    random.seed(1)
+    scenario = LoadScenario("mix", [ScenarioRequest("heavy", "a", weight=3), ScenarioRequest("light", "b", weight=1)])
+
+    picks = Counter(scenario.pick().name for _ in range(20_000))
+
+    assert picks["heavy"] / 20_000 == pytest.approx(0.75, abs=0.02)
+
+
+def test_render_path_fills_every_placeholder():
+    random.seed(2)
+    request = ScenarioRequest("lookup", "orders/lookup?orderId={order_id}&email={email}")
+    variables = {"order_id": ["ORD-1", "ORD-2"], "email": ["a@example.com"]}
+
+    paths = {request.render_path(variables) for _ in range(50)}
+
+    assert paths == {"orders/lookup?orderId=ORD-1&email=a@example.com",
+                     "orders/lookup?orderId=ORD-2&email=a@example.com"}
+
+
+def test_render_path_without_the_variable_fails_loudly():
+    with pytest.raises(KeyError):
+        ScenarioRequest("theme", "gallery/themes/{theme_slug}").render_path({})
+
+
+def test_endpoint_stats_count_errors_and_statuses():
+    stats = EndpointStats()
+    for latency_s, status, ok in [(0.010, "200", True), (0.020, "200", True), (0.030, "500", False)]:
+        stats.record(latency_s, status, ok)
+
+    report = stats.as_dict(elapsed_s=2.0)
+
+    assert report["requests"] == 3 and report["errors"] == 1
+    assert report["error_rate"] == pytest.approx(1 / 3)
+    assert report["throughput_rps"] == 1.5
+    assert report["status_codes"] == {"200": 2, "500": 1}
+    assert report["latency_ms"]["min"] == pytest.approx(10, rel=1e-3)
+    assert report["latency_ms"]["max"] == pytest.approx(30, rel=1e-3)
+
+
+def test_report_totals_merge_every_endpoint():
+    report = LoadReport(LoadScenario("mix", [ScenarioRequest("a", "a")]), "open")
+    report.record("GET /api/events", 0.010, "200", True)
+    report.record("GET /api/events", 0.012, "200", True)
+    report.record("GET /api/testimonials", 0.050, "timeout", False)
+
+    totals = report.totals()
+
+    assert totals.count == 3 and totals.errors == 1
+    assert totals.status_codes == {"200": 2, "timeout": 1}
+    assert totals.histogram.get_max_value() / 1000 == pytest.approx(50, rel=1e-3)
@@ -0,0 +1,155 @@
+"""Log parsing, timestamp spreading, anonymisation and burst detection in log_replay.py"""
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from load_generator import LoadScenario, ScenarioRequest
+from log_replay import (Anonymiser, LogEntry, busiest_window, parse_clf, parse_ndjson, plan_replay, read_log,
+                        spread_within_seconds)
+from route_dispatch_benchmark import UNSAFE_ROUTES
+
+T0 = datetime(2024, 10, 20, 18, 0, 0, tzinfo=timezone.utc).timestamp()
+CLF = '203.0.113.9 - - [20/Oct/2024:18:00:00 +0000] "GET {target} HTTP/1.1" 200 2326 "-" "Mozilla/5.0"'
+
+
+def anonymiser() -> Anonymiser:
+    scenario = LoadScenario("replay", [
+        ScenarioRequest("GET /api/orders/lookup", "orders/lookup?orderId={order_id}&email={email}",
+                        expected_status=[200, 404]),
+        ScenarioRequest("GET /api/gallery/themes/[slug]", "gallery/themes/{theme_slug}"),
+    ], variables={"order_id": ["ORD-LOADTEST-0001", "ORD-LOADTEST-0002"], "email": ["loadtest@example.com"],
+                  "theme_slug": ["holi-2024", "diwali-2024"]})
+    return Anonymiser(scenario, salt=b"fixed-salt")
+
+
+def test_parse_clf_keeps_api_requests():
+    entry = parse_clf(CLF.format(target="/api/events/holi-2024?ref=ig"))
+
+    assert entry == LogEntry(T0, "GET", "events/holi-2024?ref=ig", 200)
+
+
+@pytest.mark.parametrize("line", [
+    CLF.format(target="/_next/static/chunk.js"),
+    CLF.format(target="/apis/events"),
+    "not a log line",
+])
+def test_parse_clf_drops_everything_else(line):
+    assert parse_clf(line) is None
+
+
+def test_parse_clf_without_a_status():
+    assert parse_clf(CLF.format(target="/api/health").replace(" 200 ", " - ")).status is None
+
+
+@pytest.mark.parametrize("record, expected", [
+    ({"timestamp": "2024-10-20T18:00:00Z", "method": "get", "path": "/api/events", "status": 200},
+     LogEntry(T0, "GET", "events", 200)),
+    ({"@timestamp": T0 * 1000, "method": "GET", "url": "https://igk.example/api/gallery?x=1"},
+     LogEntry(T0, "GET", "gallery?x=1", None)),
+    ({"ts": T0, "request": "POST /api/orders HTTP/1.1", "status_code": 201},
+     LogEntry(T0, "POST", "orders", 201)),
+    ({"time": "2024-10-20T18:00:00", "method": "GET", "uri": "/api/team"},
+     LogEntry(T0, "GET", "team", None)),
+])
+def test_parse_ndjson_field_variants(record, expected):
+    assert parse_ndjson(json.dumps(record)) == expected
+
+
+@pytest.mark.parametrize("record", [
+    {"method": "GET", "path": "/api/events"},
+    {"timestamp": T0, "path": "/api/events"},
+    {"timestamp": T0, "method": "GET", "path": "/events"},
+])
+def test_parse_ndjson_incomplete_records(record):
+    assert parse_ndjson(json.dumps(record)) is None
+
+
+def test_read_log_sorts_and_counts_skipped_lines(tmp_path):
+    path = tmp_path / "access.log.gz"
+    lines = [
+        json.dumps({"timestamp": T0 + 5, "method": "GET", "path": "/api/team"}),
+        CLF.format(target="/api/events"),
+        CLF.format(target="/index.html"),
+        "{broken json",
+        "",
+    ]
+    with gzip.open(path, "wt") as f:
+        f.write("\n".join(lines))
+
+    entries, skipped = read_log(str(path))
+
+    assert [e.path for e in entries] == ["events", "team"]
+    assert skipped == 2
+
+
+def test_spread_within_seconds():
+    entries = [LogEntry(T0, "GET", "a"), LogEntry(T0, "GET", "b"), LogEntry(T0, "GET", "c"),
+               LogEntry(T0 + 1, "GET", "d"), LogEntry(T0 + 2.5, "GET", "e"), LogEntry(T0 + 2.5, "GET", "f")]
+
+    spread_within_seconds(entries)
+
+    assert [e.timestamp - T0 for e in entries] == pytest.approx([0, 1 / 3, 2 / 3, 1, 2.5, 2.5])
+
+
+def test_plan_skips_admin_unsafe_and_unmatched_writes():
+    anon = anonymiser()
+    entries = [LogEntry(T0, "GET", "admin/orders"), LogEntry(T0, "POST", "contacts")]
+    entries += [LogEntry(T0, "GET", route) for route in sorted(UNSAFE_ROUTES)]
+    entries.append(LogEntry(T0, "GET", "seed-events/"))
+
+    assert [anon.plan(e, 0.0) for e in entries] == [None] * len(entries)
+    assert anon.counts == {"scenario": 0, "pseudonymised": 0, "admin": 1, "unsafe": len(UNSAFE_ROUTES) + 1,
+                           "unmatched_write": 1}
+
+
+def test_plan_rerenders_scenario_requests_consistently():
+    anon = anonymiser()
+    first = anon.plan(LogEntry(T0, "GET", "orders/lookup?email=real@person.de&orderId=ORD-987"), 1.5)
+    again = anon.plan(LogEntry(T0, "GET", "orders/lookup?orderId=ORD-987&email=real@person.de"), 2.0)
+
+    assert first.name == "GET /api/orders/lookup"
+    assert first.offset_s == 1.5 and first.expected_status == (200, 404)
+    assert first.path.startswith("orders/lookup?orderId=ORD-LOADTEST-000")
+    assert first.path.endswith("&email=loadtest@example.com")
+    assert again.path == first.path
+    assert "real@person.de" not in first.path and "ORD-987" not in first.path
+    assert anon.counts["scenario"] == 2
+
+
+def test_plan_pseudonymises_other_gets():
+    anon = anonymiser()
+    planned = anon.plan(LogEntry(T0, "GET", "events?email=real@person.de&code=ABC&page=2"), 0.0)
+
+    assert planned.name == "GET /api/events?code=[code]&email=[email]&page=[page]"
+    assert "real" not in planned.path and "ABC" not in planned.path
+    assert "page=2" in planned.path
+    assert "%40example.com" in planned.path
+    assert anon.counts["pseudonymised"] == 1
+
+
+def test_pseudonyms_depend_on_the_salt():
+    other = Anonymiser(anonymiser().scenario, salt=b"other-salt")
+
+    assert anonymiser().pseudonym("ORD-987") == anonymiser().pseudonym("ORD-987")
+    assert other.pseudonym("ORD-987") != anonymiser().pseudonym("ORD-987")
+
+
+def test_plan_replay_scales_offsets_by_speed():
+    entries = [LogEntry(T0, "GET", "events"), LogEntry(T0 + 4, "GET", "admin/orders"), LogEntry(T0 + 10, "GET", "team")]
+
+    planned = plan_replay(entries, anonymiser(), speed=2)
+
+    assert [(p.offset_s, p.path) for p in planned] == [(0.0, "events"), (5.0, "team")]
+
+
+@pytest.mark.parametrize("offsets, window_s, expected", [
+    ([0, 1, 2, 30, 30.5, 31, 31.5, 100], 2, (30, 4)),
+    ([0, 60, 120], 60, (0, 2)),
+    ([5.0], 60, (5.0, 1)),
+    ([], 60, (0.0, 0)),
+])
+def test_busiest_window(offsets, window_s, expected):
+    assert busiest_window(offsets, window_s) == expected
@@ -0,0 +1,121 @@
+"""Field sizing, pagination detection and size history in payload_audit.py"""
+
+import httpx
+import pytest
+
+from api_client import ApiClient
+from payload_audit import (PAGE_PROBE, PayloadAuditor, append_history, field_sizes, growth_against_history,
+                           load_history, top_level_lists)
+
+BASE_URL = "http://api.test/api"
+
+
+def auditor(handler) -> PayloadAuditor:
+    return PayloadAuditor(ApiClient(BASE_URL, transport=httpx.MockTransport(handler)), brotli=False)
+
+
+def listing(paginates: bool, total: int = 5):
+    """Handler for GET /events that honours ?limit only when `paginates`"""
+    def handler(request):
+        limit = int(request.url.params.get("limit", total)) if paginates else total
+        return httpx.Response(200, json={"events": [{"id": i, "title": "x" * 10} for i in range(limit)], "total": total})
+    return handler
+
+
+def test_field_sizes_fold_list_items():
+    body = {"theme": {"name": "Holi"}, "photos": [{"url": "/a.jpg", "caption": ""}, {"url": "/bb.jpg", "caption": ""}]}
+
+    assert field_sizes(body) == {
+        "$.theme.name": len('"Holi"'),
+        "$.photos[].url": len('"/a.jpg"') + len('"/bb.jpg"'),
+        "$.photos[].caption": 2 * len('""'),
+    }
+
+
+def test_field_sizes_count_non_ascii_as_utf8_bytes():
+    assert field_sizes({"title": "Düsseldorf"}) == {"$.title": len('"Düsseldorf"'.encode())}
+
+
+@pytest.mark.parametrize("body, lists", [
+    ({"events": [1, 2, 3], "total": 3, "tags": []}, {"$.events": 3, "$.tags": 0}),
+    ([1, 2], {"$": 2}),
+    ("ok", {}),
+])
+def test_top_level_lists(body, lists):
+    assert top_level_lists(body) == lists
+
+
+def test_lists_that_ignore_the_page_probe_are_flagged():
+    flagged = auditor(listing(paginates=False)).unpaginated("events", {"$.events": 5})
+
+    assert flagged == [{"field": "$.events", "items": 5}]
+
+
+def test_paginated_lists_are_not_flagged():
+    assert auditor(listing(paginates=True)).unpaginated("events", {"$.events": 5}) == []
+
+
+def test_lists_no_longer_than_a_page_are_not_flagged():
+    total = PAGE_PROBE["limit"]
+
+    assert auditor(listing(paginates=False, total=total)).unpaginated("events", {"$.events": total}) == []
+
+
+def test_audit_reports_sizes_and_unpaginated_lists():
+    result = auditor(listing(paginates=False)).audit("events")
+
+    assert result["lists"] == {"$.events": 5}
+    assert result["unpaginated"] == [{"field": "$.events", "items": 5}]
+    assert result["sizes"]["gzip"] < result["sizes"]["raw"] == result["sizes"]["served_raw"]
+    assert result["largest_fields"][0]["field"] == "$.events[].title"
+
+
+def test_resolve_fills_the_slug_from_the_first_listed_item():
+    def handler(request):
+        return httpx.Response(200, json={"themes": [{"slug": "holi-2024"}, {"slug": "diwali-2024"}]})
+
+    assert auditor(handler).resolve("gallery/themes/{theme_slug}") == "gallery/themes/holi-2024"
+    assert auditor(lambda r: httpx.Response(200, json={"events": []})).resolve("events/{event_slug}") is None
+
+
+def result(raw: int, items: int):
+    return {"sizes": {"raw": raw, "gzip": raw // 4}, "lists": {"$.events": items}}
+
+
+def test_history_round_trip_is_per_base_url(tmp_path):
+    path = str(tmp_path / "reports" / "history.jsonl")
+    append_history(path, "http://a/api", {"GET /api/events": result(1000, 10), "GET /api/team": {"error": "500"}})
+    append_history(path, "http://b/api", {"GET /api/events": result(5, 1)})
+
+    history = load_history(path, "http://a/api")
+
+    assert len(history) == 1
+    assert history[0]["endpoints"] == {"GET /api/events": {"raw": 1000, "gzip": 250, "items": 10}}
+    assert load_history(str(tmp_path / "missing.jsonl"), "http://a/api") == []
+
+
+def test_growth_reports_the_change_since_the_previous_run():
+    history = [{"endpoints": {"GET /api/events": {"raw": 1000, "gzip": 250, "items": 10}}}]
+
+    trend = growth_against_history(history, {"GET /api/events": result(1500, 15), "GET /api/new": result(10, 1)})
+
+    assert trend == {"GET /api/events": {"runs": 2, "previous_raw": 1000, "raw_change": 500,
+                                         "previous_items": 10, "items_change": 5}}
+
+
+def test_growth_fits_size_against_items_over_three_runs():
+    # raw = 100 * items^2: payload grows quadratically with the item count
+    history = [{"endpoints": {"GET /api/events": {"raw": 100 * n * n, "gzip": 0, "items": n}}} for n in (1, 2)]
+
+    trend = growth_against_history(history, {"GET /api/events": result(900, 3)})["GET /api/events"]
+
+    assert trend["runs"] == 3
+    assert trend["size_vs_items_exponent"] == pytest.approx(2.0)
+    assert trend["r_squared"] == pytest.approx(1.0)
+
+
+def test_growth_skips_errors_and_endpoints_without_history():
+    history = [{"endpoints": {"GET /api/events": {"raw": 1, "gzip": 1, "items": 1}}}]
+
+    assert growth_against_history(history, {"GET /api/events": {"error": "timeout"}}) == {}
+    assert growth_against_history([], {"GET /api/events": result(10, 1)}) == {}
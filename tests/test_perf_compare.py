@@ -0,0 +1,75 @@
+"""Regression gate statistics in perf_compare.py, against values worked out by hand"""
+
+import random
+
+import pytest
+
+from perf_compare import bootstrap_p95_change, compare_endpoint, mann_whitney_greater
+
+LOW = [1, 2, 3, 4, 5]
+HIGH = [6, 7, 8, 9, 10]
+
+
+def latencies(scale: float = 1.0, n: int = 60, seed: int = 7):
+    rng = random.Random(seed)
+    return [scale * rng.uniform(90, 110) for _ in range(n)]
+
+
+@pytest.mark.parametrize("baseline, candidate, p_value", [
+    # U = 25, mean 12.5, variance 22.917: z = (25 - 12.5 - 0.5) / 4.787 = 2.507
+    (LOW, HIGH, 0.0060929),
+    (HIGH, LOW, 0.9966923),
+    # Every value tied once across the samples: variance 22.222 with the tie correction
+    (LOW, LOW, 0.5422350),
+    # Ranks 1, 3, 3, 3, 6, 6, 6, 8: U = 13, mean 8, variance 10.857
+    ([1, 2, 2, 3], [2, 3, 3, 4], 0.0860169),
+])
+def test_mann_whitney_greater_known_values(baseline, candidate, p_value):
+    assert mann_whitney_greater(baseline, candidate) == pytest.approx(p_value, abs=1e-6)
+
+
+def test_mann_whitney_all_ties_is_not_significant():
+    assert mann_whitney_greater([5, 5, 5], [5, 5, 5]) == 1.0
+
+
+def test_bootstrap_ci_brackets_the_true_change():
+    low, high = bootstrap_p95_change(latencies(), latencies(1.5, seed=8), alpha=0.05)
+
+    assert 0.3 < low < 0.5 < high < 0.7
+
+
+def test_bootstrap_ci_straddles_zero_without_a_change():
+    low, high = bootstrap_p95_change(latencies(), latencies(seed=8), alpha=0.05)
+
+    assert low < 0 < high
+
+
+def test_bootstrap_is_deterministic_for_a_seed():
+    baseline, candidate = latencies(), latencies(1.2, seed=8)
+
+    assert bootstrap_p95_change(baseline, candidate, 0.05) == bootstrap_p95_change(baseline, candidate, 0.05)
+
+
+@pytest.mark.parametrize("method", ["mannwhitney", "bootstrap"])
+@pytest.mark.parametrize("scale, verdict", [(1.5, "regression"), (1.0, "ok"), (0.6, "improvement")])
+def test_compare_endpoint_verdicts(method, scale, verdict):
+    result = compare_endpoint("GET /api/events", latencies(), latencies(scale, seed=8), threshold=0.10,
+                              alpha=0.05, method=method, min_samples=5)
+
+    assert result.verdict == verdict
+    assert result.regressed == (verdict == "regression")
+
+
+def test_small_change_is_not_a_regression_even_when_significant():
+    result = compare_endpoint("GET /api/events", latencies(), latencies(1.05, seed=8), threshold=0.10,
+                              alpha=0.05, method="mannwhitney", min_samples=5)
+
+    assert result.verdict == "ok"
+
+
+def test_too_few_samples_are_not_gated():
+    result = compare_endpoint("GET /api/events", LOW, [x * 10 for x in LOW], threshold=0.10, alpha=0.05,
+                              method="mannwhitney", min_samples=10)
+
+    assert result.verdict == "insufficient data"
+    assert result.p_value is None
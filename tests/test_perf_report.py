@@ -0,0 +1,54 @@
+"""Endpoint templating in perf_report.py: ROUTE_TEMPLATES against the real route table"""
+
+import pytest
+
+from perf_report import endpoint_template, percentile
+from route_dispatch_benchmark import PLACEHOLDER, parse_routes
+
+
+@pytest.mark.parametrize("method, url, template", [
+    ("GET", "https://host/api/gallery/themes/holi-2024", "GET /api/gallery/themes/[slug]"),
+    ("GET", "/api/events/holi-2025?x=1&y=2", "GET /api/events/[slug]?x=[x]&y=[y]"),
+    ("GET", "/api/admin/events/e1/stats", "GET /api/admin/events/[id]/stats"),
+    ("PUT", "/api/admin/contacts/c1", "PUT /api/admin/contacts/[id]"),
+    ("POST", "/api/admin/gallery/themes/t1/photos", "POST /api/admin/gallery/themes/[id]/photos"),
+    ("DELETE", "/api/admin/gallery/photos/p1", "DELETE /api/admin/gallery/photos/[id]"),
+    ("GET", "/api/admin/gallery/g1", "GET /api/admin/gallery/[id]"),
+    ("GET", "/api/health/", "GET /api/health"),
+    ("GET", "http://host/api", "GET /api/"),
+])
+def test_dynamic_segments_are_templated(method, url, template):
+    assert endpoint_template(method, url) == template
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "events/migrate"),
+    ("POST", "admin/partners/reply"),
+    ("POST", "admin/contacts/read"),
+    ("PUT", "admin/gallery/photos/set-cover"),
+    ("GET", "admin/gallery/themes"),
+    ("GET", "admin/gallery/photos"),
+])
+def test_fixed_routes_next_to_dynamic_ones_are_kept(method, path):
+    assert endpoint_template(method, f"/api/{path}") == f"{method} /api/{path}"
+
+
+def test_query_values_are_templated_in_order():
+    assert endpoint_template("GET", "/api/orders/lookup?orderId=ORD-1&email=a%40b.c") == \
+        "GET /api/orders/lookup?orderId=[orderId]&email=[email]"
+
+
+def test_every_route_in_route_js_templates_its_ids():
+    for method, routes in parse_routes().items():
+        for route in routes:
+            template = endpoint_template(method, f"/api/{route.sample_path}")
+            assert PLACEHOLDER not in template, f"{route.condition} (route.js:{route.line}) has no ROUTE_TEMPLATES entry"
+
+
+@pytest.mark.parametrize("p, expected", [(0, 1.0), (50, 2.5), (100, 4.0), (90, 3.7)])
+def test_percentile_interpolates_like_numpy(p, expected):
+    assert percentile([4, 1, 3, 2], p) == pytest.approx(expected)
+
+
+def test_percentile_of_nothing_is_zero():
+    assert percentile([], 95) == 0.0
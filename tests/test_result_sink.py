@@ -0,0 +1,101 @@
+"""Chunk rotation and streamed summaries in result_sink.py"""
+
+import os
+
+import pytest
+
+from perf_report import REPORT_PHASES
+from result_sink import EndpointSketches, ResultSink, open_sink, read_records, summarize_directory
+
+
+def request(endpoint, total_ms, n=0):
+    return {
+        "endpoint": endpoint, "method": "GET", "url": f"http://test{endpoint}?n={n}", "test": "t",
+        "status_code": 200, "started_at": float(n),
+        **{phase: total_ms / 2 for phase in REPORT_PHASES}, "total_ms": total_ms,
+        "request_bytes": 10, "response_bytes": 100, "response_headers": {"etag": '"x"'},
+    }
+
+
+def test_base_sink_is_abstract():
+    with pytest.raises(TypeError):
+        ResultSink("unused")
+
+
+@pytest.mark.parametrize("fmt, extension", [("ndjson", ".ndjson"), ("ndjson.gz", ".ndjson.gz")])
+def test_requests_rotate_into_chunks(tmp_path, fmt, extension):
+    sink = open_sink(fmt, str(tmp_path), prefix="run", rotate_records=3)
+    for n in range(7):
+        sink.write_request(request("GET /api/events", 10.0 + n, n))
+    sink.write_result({"test": "t", "test_func": "t", "success": True, "message": "ok"})
+    sink.close()
+
+    described = sink.describe()
+    assert described["records"] == {"requests": 7, "results": 1}
+    assert [os.path.basename(p) for p in described["paths"]] == [
+        f"run-requests-00001{extension}", f"run-requests-00002{extension}",
+        f"run-requests-00003{extension}", f"run-results-00001{extension}",
+    ]
+
+
+def test_chunks_stream_back_without_response_headers(tmp_path):
+    sink = open_sink("ndjson.gz", str(tmp_path), rotate_records=3)
+    for n in range(7):
+        sink.write_request(request("GET /api/events", 10.0 + n, n))
+    sink.close()
+
+    records = list(read_records([p for p in sink.paths if "-requests-" in p]))
+
+    assert [r["started_at"] for r in records] == [float(n) for n in range(7)]
+    assert all("response_headers" not in r for r in records)
+
+
+def test_endpoint_sketches_match_the_samples():
+    sketches = EndpointSketches()
+    for n in range(1, 101):
+        sketches.add(request("GET /api/events", float(n), n))
+    sketches.add(request("GET /api/health", 5.0))
+
+    stats = sketches.endpoint_stats()
+
+    assert list(stats) == ["GET /api/events", "GET /api/health"]
+    events = stats["GET /api/events"]
+    assert events["count"] == 100
+    assert events["min"] == pytest.approx(1.0, rel=1e-3)
+    assert events["max"] == pytest.approx(100.0, rel=1e-3)
+    assert events["p50"] == pytest.approx(50.0, rel=1e-2)
+    assert events["p95"] == pytest.approx(95.0, rel=1e-2)
+    assert events["phases_p50_ms"]["ttfb_ms"] == pytest.approx(25.0, rel=1e-2)
+    assert events["request_bytes"] == 1000 and events["response_bytes"] == 10000
+    assert sorted(events["samples_ms"]) == [float(n) for n in range(1, 101)]
+
+
+def test_reservoir_stays_bounded():
+    sketches = EndpointSketches()
+    for n in range(5000):
+        sketches.add(request("GET /api/events", 1.0 + n % 50, n))
+
+    stats = sketches.endpoint_stats()["GET /api/events"]
+
+    assert stats["count"] == 5000
+    assert len(stats["samples_ms"]) == 2000
+
+
+def test_summarize_directory_matches_the_live_sketches(tmp_path):
+    sink = open_sink("ndjson", str(tmp_path), prefix="a", rotate_records=4)
+    for n in range(10):
+        sink.write_request(request("GET /api/events", 10.0 + n, n))
+        sink.write_request(request("POST /api/admin/events", 40.0 + n, n))
+    sink.close()
+    other = open_sink("ndjson", str(tmp_path), prefix="b")
+    other.write_request(request("GET /api/health", 3.0))
+    other.close()
+
+    live = sink.endpoints.endpoint_stats()
+    summarized = summarize_directory(str(tmp_path), prefix="a")
+
+    assert summarized.keys() == live.keys()
+    for endpoint in live:
+        for key in ("count", "p50", "p95", "max"):
+            assert summarized[endpoint][key] == live[endpoint][key]
+    assert "GET /api/health" in summarize_directory(str(tmp_path))
@@ -0,0 +1,132 @@
+"""Route-table parsing, probe paths and shadowing in route_dispatch_benchmark.py"""
+
+import pytest
+
+from route_dispatch_benchmark import (PLACEHOLDER, UNSAFE_ROUTES, DispatchBenchmark, Route, analyze, parse_routes,
+                                      sample_path)
+
+ROUTE_JS = """\
+export async function GET(request) {
+  try {
+    if (path === 'health') {
+      return corsResponse({ status: 'ok' });
+    }
+
+    if (path === 'seed-events') {
+      await db.collection('events').deleteMany({});
+    }
+
+    if (path.startsWith('admin/items/') && path.endsWith('/stats')) {
+      const password = request.headers.get('x-admin-password');
+    }
+
+    if (path.match(/^items\\/[^/]+$/)) {
+      return corsResponse({ error: 'Item id required' }, 400);
+    }
+
+    if (path.startsWith('items/') && !path.includes('/photos')) {
+      return corsResponse({ item });
+    }
+  } catch (error) {}
+}
+
+export async function PUT(request) {
+  try {
+    const password = request.headers.get('x-admin-password');
+    if (password !== process.env.ADMIN_PASSWORD) {
+      return corsResponse({ error: 'Unauthorized' }, 401);
+    }
+
+    if (path.startsWith('admin/items/')) {
+      return corsResponse({ item });
+    }
+  } catch (error) {}
+}
+"""
+
+
+@pytest.fixture
+def routes(tmp_path):
+    path = tmp_path / "route.js"
+    path.write_text(ROUTE_JS)
+    return parse_routes(str(path))
+
+
+@pytest.mark.parametrize("clauses, path", [
+    ([("equals", "health")], "health"),
+    ([("startswith", "admin/events/")], f"admin/events/{PLACEHOLDER}"),
+    ([("startswith", "admin/events/"), ("endswith", "/stats")], f"admin/events/{PLACEHOLDER}/stats"),
+    ([("match", "^gallery\\/themes\\/[^/]+$")], f"gallery/themes/{PLACEHOLDER}"),
+    ([("startswith", "admin/gallery/"), ("not_includes", "themes")], f"admin/gallery/{PLACEHOLDER}"),
+])
+def test_sample_path_satisfies_the_clauses(clauses, path):
+    assert sample_path(clauses) == path
+    assert Route("GET", 0, "", 0, clauses, "").matches(path)
+
+
+def test_parse_keeps_dispatch_order_and_clauses(routes):
+    assert list(routes) == ["GET", "PUT"]
+    assert [r.sample_path for r in routes["GET"]] == [
+        "health", "seed-events", f"admin/items/{PLACEHOLDER}/stats", f"items/{PLACEHOLDER}", f"items/{PLACEHOLDER}"]
+    assert [r.position for r in routes["GET"]] == [0, 1, 2, 3, 4]
+    assert routes["GET"][4].clauses == [("startswith", "items/"), ("not_includes", "/photos")]
+    assert routes["GET"][0].line == 3
+
+
+def test_password_gate_before_the_first_route_marks_every_route(routes):
+    assert not any(r.auth_gate for r in routes["GET"])
+    assert all(r.auth_gate for r in routes["PUT"])
+
+
+def test_shadowed_routes_point_at_the_route_that_captures_them(routes):
+    assert routes["GET"][4].shadowed_by == 3
+    assert all(r.shadowed_by is None for r in routes["GET"][:4])
+
+
+def test_probes_exit_early_where_possible(routes):
+    assert [r.probe for r in routes["GET"]] == ["handler", "skip", "unauthorized", "invalid", "handler"]
+    assert routes["PUT"][0].probe == "handler"
+
+
+def test_unrecognised_conditions_are_reported(tmp_path):
+    path = tmp_path / "route.js"
+    path.write_text("export async function GET(request) {\n    if (path.length > 3) {\n    }\n}\n")
+
+    with pytest.raises(ValueError, match="route.js:2: unrecognised route condition"):
+        parse_routes(str(path))
+
+
+def test_real_route_table_parses_and_skips_unsafe_routes():
+    routes = parse_routes()
+
+    assert set(routes) == {"GET", "POST", "PUT", "DELETE"}
+    assert routes["GET"][0].sample_path == "health"
+    skipped = {r.sample_path for rs in routes.values() for r in rs if r.probe == "skip"}
+    assert skipped == UNSAFE_ROUTES
+
+
+def test_real_route_table_shadowing():
+    # PUT admin/gallery/photos/[id] sits after startsWith('admin/gallery/') && !includes('themes'), which takes it
+    put = {r.sample_path: r for r in parse_routes()["PUT"]}
+
+    photo = put[f"admin/gallery/photos/{PLACEHOLDER}"]
+    assert photo.shadowed_by == put[f"admin/gallery/{PLACEHOLDER}"].position
+
+
+def test_analyze_fits_the_per_check_cost(routes):
+    benchmark = DispatchBenchmark(client=None, routes=routes)
+    health = routes["GET"][0]
+    health.samples_ms = [1.0] * 5
+    probes = []
+    for position in range(1, 6):
+        probe = Route("GET", position, "", 0, [], "", sample_path=f"p{position}", probe="unauthorized",
+                      samples_ms=[1.0 + 0.1 * position] * 5)
+        benchmark.statuses[("GET", probe.sample_path)] = {401: 5}
+        probes.append(probe)
+
+    result = analyze(benchmark, health, [health, *probes])
+
+    assert result["fitted_on"] == 5
+    assert result["per_check_ms"] == pytest.approx(0.1)
+    assert result["intercept_ms"] == pytest.approx(0.0, abs=1e-9)
+    assert result["routes"][-1]["position_cost_ms"] == pytest.approx(0.5)
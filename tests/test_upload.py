@@ -0,0 +1,14 @@
+"""POST /api/upload"""
+
+from api_client import ADMIN_PASSWORD
+
+
+def test_upload_jpeg(api, jpeg_bytes, namespace):
+    response = api.post("upload", data={"type": "gallery"},
+                        headers={"x-admin-password": ADMIN_PASSWORD},
+                        files={"file": (f"{namespace}.jpg", jpeg_bytes, "image/jpeg")})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"]
+    assert body["path"]
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Concurrent multipart upload benchmark for POST /api/upload.
+Generates a cached on-disk corpus of photo-like images in several sizes and
+formats (JPEG, PNG, WebP, GIF), streams them from disk without loading whole
+files into memory, and reports per-size latency and aggregate MB/s at each
+concurrency level.
+
+Uploaded files are not deleted: the route has no delete counterpart, so run
+this against a local or preview deployment. Callers uploading to a server
+started from this checkout can remove their files with remove_uploaded_files.
+
+Usage:
+    python upload_benchmark.py [--concurrency 1,4,8] [--uploads 24] [--profiles thumb,web,camera]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+import httpx
+from PIL import Image
+
+from api_client import ADMIN_PASSWORD, AsyncApiClient, DEFAULT_API_BASE, NO_RETRY
+from perf_report import summarize
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_UPLOAD_DIR = os.path.join(ROOT, "public", "uploads")
+DEFAULT_CORPUS_DIR = os.environ.get(
+    "IGK_CORPUS_DIR", os.path.join(os.path.expanduser("~"), ".cache", "igk", "upload_corpus"))
+MAX_UPLOAD_BYTES = 30 * 1024 * 1024  # limit enforced by app/api/upload/route.js
+
+SIZE_PROFILES = {
+    "thumb": (320, 240),
+    "web": (1600, 1200),
+    "camera": (4000, 3000),
+    "large": (6000, 4000),
+}
+FORMATS = {
+    "jpeg": ("JPEG", "jpg", "image/jpeg", {"quality": 90}),
+    "png": ("PNG", "png", "image/png", {}),
+    "webp": ("WEBP", "webp", "image/webp", {"quality": 85}),
+    "gif": ("GIF", "gif", "image/gif", {}),
+}
+
+
+def remove_uploaded_files(public_paths: List[str], upload_dir: str = DEFAULT_UPLOAD_DIR) -> int:
+    """Delete files POST /api/upload stored for `public_paths`; only paths inside `upload_dir` are touched"""
+    removed = 0
+    for public_path in public_paths:
+        path = os.path.realpath(os.path.join(ROOT, "public", public_path.lstrip("/")))
+        if path.startswith(os.path.realpath(upload_dir) + os.sep) and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+@dataclass
+class CorpusImage:
+    name: str
+    path: str
+    profile: str
+    format: str
+    content_type: str
+    width: int
+    height: int
+    bytes: int
+
+
+class ImageCorpus:
+    """Photo-like test images generated once and reused across runs"""
+
+    def __init__(self, corpus_dir: str = DEFAULT_CORPUS_DIR):
+        self.corpus_dir = corpus_dir
+        self.manifest_path = os.path.join(corpus_dir, "manifest.json")
+        self.generated = 0
+
+    def _load_manifest(self) -> Dict[str, CorpusImage]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return {name: CorpusImage(**entry) for name, entry in json.load(f).items()}
+
+    def _save_manifest(self, images: Dict[str, CorpusImage]):
+        with open(self.manifest_path, "w") as f:
+            json.dump({name: asdict(image) for name, image in images.items()}, f, indent=2)
+
+    @staticmethod
+    def render(width: int, height: int, seed: int) -> Image.Image:
+        """Noise over colour gradients: compresses like a real photo rather than a flat fill"""
+        rng = random.Random(seed)
+        gradient = Image.linear_gradient("L").resize((width, height))
+        channels = [
+            Image.blend(gradient.rotate(rng.choice((0, 90, 180, 270))).resize((width, height)),
+                        Image.effect_noise((width, height), rng.uniform(30, 70)), 0.45)
+            for _ in range(3)
+        ]
+        return Image.merge("RGB", channels)
+
+    def ensure(self, profiles: List[str], formats: List[str]) -> List[CorpusImage]:
+        """Return the requested images, generating any that are missing on disk"""
+        os.makedirs(self.corpus_dir, exist_ok=True)
+        images = self._load_manifest()
+        wanted = []
+        for profile in profiles:
+            width, height = SIZE_PROFILES[profile]
+            for fmt in formats:
+                pil_format, ext, content_type, options = FORMATS[fmt]
+                name = f"{profile}-{width}x{height}.{ext}"
+                path = os.path.join(self.corpus_dir, name)
+                if name not in images or not os.path.exists(path):
+                    print(f"🖼️  Generating {name}...")
+                    image = self.render(width, height, seed=zlib.crc32(name.encode()))
+                    if pil_format == "GIF":
+                        image = image.quantize(256)
+                    image.save(path, pil_format, **options)
+                    images[name] = CorpusImage(name, path, profile, fmt, content_type,
+                                               width, height, os.path.getsize(path))
+                    self.generated += 1
+                wanted.append(images[name])
+        self._save_manifest(images)
+        return wanted
+
+
+class UploadBenchmark:
+    def __init__(self, base_url: str, timeout: float = 120):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    async def _upload(self, client: AsyncApiClient, image: CorpusImage) -> Dict:
+        with open(image.path, "rb") as f:
+            # httpx streams the open file in 64KB chunks, so memory stays flat for 30MB uploads
+            files = {"file": (image.name, f, image.content_type)}
+            start = time.perf_counter()
+            try:
+                response = await client.post("upload", data={"type": "gallery"}, files=files)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+        return {"image": image, "status": status, "latency_ms": (time.perf_counter() - start) * 1000}
+
+    async def run_level(self, images: List[CorpusImage], concurrency: int, uploads: int) -> Dict:
+        client = AsyncApiClient(self.base_url, timeout=self.timeout, retry=NO_RETRY,
+                                headers={"x-admin-password": ADMIN_PASSWORD}, max_connections=concurrency)
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(uploads):
+            queue.put_nowait(images[i % len(images)])
+        results = []
+
+        async def uploader():
+            while not queue.empty():
+                results.append(await self._upload(client, queue.get_nowait()))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(uploader() for _ in range(concurrency)))
+        wall_s = time.perf_counter() - start
+        await client.aclose()
+
+        ok = [r for r in results if r["status"] == 200]
+        uploaded_bytes = sum(r["image"].bytes for r in ok)
+        by_profile = {}
+        for profile in sorted({r["image"].profile for r in results}):
+            latencies = [r["latency_ms"] for r in ok if r["image"].profile == profile]
+            by_profile[profile] = summarize(latencies)
+        return {
+            "concurrency": concurrency,
+            "uploads": len(results),
+            "failed": len(results) - len(ok),
+            "wall_s": wall_s,
+            "mb_per_s": uploaded_bytes / (1024 * 1024) / wall_s if wall_s else 0.0,
+            "uploads_per_s": len(ok) / wall_s if wall_s else 0.0,
+            "latency_by_profile_ms": by_profile,
+            "status_codes": {str(s): sum(1 for r in results if r["status"] == s)
+                             for s in {r["status"] for r in results}},
+        }
+
+
+def print_level(result: Dict):
+    print(f"\n⚡ Concurrency {result['concurrency']}: {result['uploads']} uploads in {result['wall_s']:.1f}s — "
+          f"{result['mb_per_s']:.2f} MB/s, {result['uploads_per_s']:.1f} uploads/s, {result['failed']} failed")
+    for profile, s in result["latency_by_profile_ms"].items():
+        print(f"    {profile:<8} n={s['count']:<4} p50={s['p50']:>8.0f} ms  p95={s['p95']:>8.0f} ms  max={s['max']:>8.0f} ms")
+    if result["failed"]:
+        print(f"    status codes: {result['status_codes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /api/upload throughput benchmark")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--profiles", default="thumb,web,camera",
+                        help=f"Comma-separated size profiles ({', '.join(SIZE_PROFILES)})")
+    parser.add_argument("--formats", default="jpeg,png,webp,gif",
+                        help=f"Comma-separated formats ({', '.join(FORMATS)})")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--uploads", type=int, default=24, help="Uploads per concurrency level")
+    parser.add_argument("--include-oversize", action="store_true",
+                        help="Also send corpus files above the route's 30MB limit (expect 400s)")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    corpus = ImageCorpus(args.corpus_dir)
+    images = corpus.ensure(args.profiles.split(","), args.formats.split(","))
+    if not args.include_oversize:
+        skipped = [i.name for i in images if i.bytes > MAX_UPLOAD_BYTES]
+        images = [i for i in images if i.bytes <= MAX_UPLOAD_BYTES]
+        if skipped:
+            print(f"⏭️  Skipping files over 30MB: {', '.join(skipped)}")
+    if not images:
+        print("❌ No corpus images to upload")
+        return 1
+
+    print("📤 UPLOAD BENCHMARK")
+    print("=" * 70)
+    for image in images:
+        print(f"  {image.name:<28} {image.bytes / (1024 * 1024):>7.2f} MB  {image.content_type}")
+
+    benchmark = UploadBenchmark(args.base_url)
+    results = []
+    for level in (int(c) for c in args.concurrency.split(",")):
+        result = asyncio.run(benchmark.run_level(images, level, args.uploads))
+        print_level(result)
+        results.append(result)
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n🧠 Client peak RSS: {peak_rss_mb:.0f} MB (largest file {max(i.bytes for i in images) / 2**20:.1f} MB)"
+          + (" — includes generating the corpus; rerun for the upload-only figure" if corpus.generated else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"images": [asdict(i) for i in images], "levels": results,
+                       "client_peak_rss_mb": peak_rss_mb}, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    return 1 if any(r["failed"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
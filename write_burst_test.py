@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Concurrent write-path burst test for the public form and checkout endpoints.
+Seeds a throwaway event with a small capacity, then fires thousands of
+submissions at POST /api/orders, /api/newsletter, /api/contacts and
+/api/partners at once, the way a ticket drop or a campaign email does. A
+fraction of the submissions is sent two or three times back to back (double
+clicks, client retries), so identical requests race each other.
+
+Reports write latency percentiles, status codes and acknowledged writes per
+second for every endpoint, then checks what actually reached the database:
+
+- duplicate newsletter subscribers (Newsletter.subscribe is findOne + insertOne),
+- lost orders (acknowledged with a 201 but not stored) and orders stored with
+  fewer tickets than they asked for,
+- tickets sold past the event's capacity (POST /api/orders never checks it),
+- acknowledged contact and partner submissions that were not stored.
+
+With --verify db the checks read MongoDB directly (needs pymongo and the
+server's MONGO_URL / DB_NAME); --verify api uses the admin listings instead,
+which works against a deployment but cannot see per-order ticket counts.
+Everything the run created is deleted afterwards unless --keep-data is set;
+in api mode the burst's orders and tickets stay behind, as the API has no
+endpoint that deletes them.
+
+Exits non-zero when any check finds a violation.
+
+Usage:
+    python write_burst_test.py --base-url http://localhost:3000/api [--submissions 4000] [--concurrency 200]
+    python write_burst_test.py --verify api --capacity 100 --output write_burst.json
+    python backend_test.py --write-burst
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from api_client import ADMIN_HEADERS, AsyncApiClient, DEFAULT_API_BASE, NO_RETRY
+from db_seeder import DEFAULT_DB_NAME, DEFAULT_MONGO_URL
+from perf_report import summarize
+
+ENDPOINTS = ("orders", "newsletter", "contacts", "partners")
+# Share of the submissions each endpoint gets: checkout and sign-ups dominate a drop
+MIX = {"orders": 0.4, "newsletter": 0.4, "contacts": 0.1, "partners": 0.1}
+SUCCESS_STATUS = {"orders": 201, "newsletter": 200, "contacts": 201, "partners": 201}
+RESPONSE_KEY = {"orders": "order", "contacts": "contact", "partners": "partner"}
+
+
+def split_submissions(total: int) -> Dict[str, int]:
+    counts = {endpoint: int(total * share) for endpoint, share in MIX.items()}
+    counts["orders"] += total - sum(counts.values())
+    return counts
+
+
+class WriteBurst:
+    def __init__(self, client: AsyncApiClient, counts: Dict[str, int], duplicate_rate: float,
+                 tickets_per_order: int, concurrency: int, seed: Optional[int] = None):
+        self.client = client
+        self.counts = counts
+        self.duplicate_rate = duplicate_rate
+        self.tickets_per_order = tickets_per_order
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.email_prefix = f"burst-{self.run_id}-"
+        self.event_id: Optional[str] = None
+        self.capacity = 0
+        self.latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in ENDPOINTS}
+        self.statuses: Dict[str, Counter] = {endpoint: Counter() for endpoint in ENDPOINTS}
+        self.spans: Dict[str, List[float]] = {}
+        # Acknowledged writes: endpoint -> [(submission key, stored id)]
+        self.acked: Dict[str, List[Tuple[str, Optional[str]]]] = defaultdict(list)
+
+    def email(self, kind: str, n: int) -> str:
+        return f"{self.email_prefix}{kind}{n}@example.com"
+
+    async def seed_event(self, capacity: int):
+        response = await self.client.post("admin/events", json={
+            "title": f"Write Burst {self.run_id}",
+            "status": "draft",
+            "capacity": capacity,
+            "startDateTime": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        })
+        if response.status_code != 201:
+            raise RuntimeError(f"Creating the event failed with status {response.status_code}: {response.text}")
+        self.event_id = response.json()["event"]["id"]
+        self.capacity = capacity
+        print(f"🎟️  Seeded event {self.event_id} with capacity {capacity}")
+
+    def payload(self, endpoint: str, n: int) -> Dict:
+        name = f"Burst {self.run_id} #{n}"
+        if endpoint == "orders":
+            return {"eventId": self.event_id, "email": self.email("o", n), "name": name, "ticketType": "General",
+                    "quantity": self.tickets_per_order, "totalAmount": 0}
+        if endpoint == "newsletter":
+            return {"email": self.email("n", n)}
+        if endpoint == "contacts":
+            return {"name": name, "email": self.email("c", n), "subject": "Write burst",
+                    "message": f"Contact submission {n} of burst {self.run_id}"}
+        return {"name": name, "email": self.email("p", n), "company": f"Burst Co {n}",
+                "partnershipType": "sponsor", "message": f"Partner inquiry {n} of burst {self.run_id}"}
+
+    def submissions(self) -> List[Tuple[str, str, Dict, bool]]:
+        """(endpoint, key, payload, is_duplicate), duplicates right behind their original so they race it"""
+        groups = []
+        for endpoint, count in self.counts.items():
+            for n in range(count):
+                key, payload = f"{endpoint}:{n}", self.payload(endpoint, n)
+                copies = self.rng.randint(1, 2) if self.rng.random() < self.duplicate_rate else 0
+                groups.append([(endpoint, key, payload, False)] + [(endpoint, key, payload, True)] * copies)
+        self.rng.shuffle(groups)
+        return [submission for group in groups for submission in group]
+
+    async def submit(self, semaphore: asyncio.Semaphore, endpoint: str, key: str, payload: Dict):
+        async with semaphore:
+            start = time.perf_counter()
+            span = self.spans.setdefault(endpoint, [start, start])
+            try:
+                response = await self.client.post(endpoint, json=payload)
+            except httpx.HTTPError:
+                self.statuses[endpoint]["transport_error"] += 1
+                return
+            end = time.perf_counter()
+            span[1] = max(span[1], end)
+            self.latencies[endpoint].append((end - start) * 1000)
+            self.statuses[endpoint][response.status_code] += 1
+            if response.status_code != SUCCESS_STATUS[endpoint]:
+                return
+            stored_id = response.json()[RESPONSE_KEY[endpoint]]["id"] if endpoint in RESPONSE_KEY else None
+            self.acked[endpoint].append((key, stored_id))
+
+    async def run(self) -> Dict:
+        submissions = self.submissions()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        print(f"💥 Firing {len(submissions)} submissions "
+              f"({sum(dup for *_, dup in submissions)} duplicates) with {self.concurrency} in flight")
+        start = time.perf_counter()
+        await asyncio.gather(*(self.submit(semaphore, endpoint, key, payload)
+                               for endpoint, key, payload, _ in submissions))
+        wall_s = time.perf_counter() - start
+
+        endpoints = {}
+        for endpoint in ENDPOINTS:
+            sent = sum(1 for e, *_ in submissions if e == endpoint)
+            if not sent:
+                continue
+            acked = len(self.acked[endpoint])
+            span_s = (self.spans[endpoint][1] - self.spans[endpoint][0]) if endpoint in self.spans else 0.0
+            keys = Counter(key for key, _ in self.acked[endpoint])
+            endpoints[endpoint] = {
+                "sent": sent,
+                "unique": len({key for e, key, *_ in submissions if e == endpoint}),
+                "acknowledged": acked,
+                "acknowledged_twice": sum(1 for n in keys.values() if n > 1),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[endpoint].items(), key=str)},
+                "latency_ms": summarize(self.latencies[endpoint]),
+                "writes_per_s": acked / span_s if span_s else 0.0,
+            }
+        return {
+            "run_id": self.run_id,
+            "event_id": self.event_id,
+            "capacity": self.capacity,
+            "submissions": len(submissions),
+            "wall_s": wall_s,
+            "writes_per_s": sum(e["acknowledged"] for e in endpoints.values()) / wall_s if wall_s else 0.0,
+            "endpoints": endpoints,
+        }
+
+    def acked_ids(self, endpoint: str) -> List[str]:
+        return [stored_id for _, stored_id in self.acked[endpoint]]
+
+
+def _violations(check: Dict) -> List[str]:
+    found = []
+    if check["duplicate_subscribers"]:
+        found.append(f"{len(check['duplicate_subscribers'])} newsletter email(s) stored more than once")
+    orders = check["orders"]
+    if orders["lost"]:
+        found.append(f"{len(orders['lost'])} acknowledged order(s) missing from the database")
+    if orders["short_tickets"]:
+        found.append(f"{len(orders['short_tickets'])} order(s) stored with fewer tickets than ordered")
+    if check["tickets"]["oversold"]:
+        found.append(f"{check['tickets']['oversold']} ticket(s) sold past capacity "
+                     f"({check['tickets']['sold']} for {check['tickets']['capacity']} places)")
+    for endpoint, lost in check["lost_writes"].items():
+        if lost:
+            found.append(f"{len(lost)} acknowledged {endpoint} submission(s) missing from the database")
+    return found
+
+
+def _orders_check(burst: WriteBurst, stored: Dict[str, int], ticket_counts: Optional[Dict[str, int]],
+                  sold: int) -> Tuple[Dict, Dict]:
+    acked = set(burst.acked_ids("orders"))
+    short = {}
+    if ticket_counts is not None:
+        short = {order_id: {"tickets": ticket_counts.get(order_id, 0), "quantity": quantity}
+                 for order_id, quantity in stored.items() if ticket_counts.get(order_id, 0) < quantity}
+    orders = {
+        "acknowledged": len(acked),
+        "stored": len(stored),
+        "lost": sorted(acked - set(stored)),
+        # Stored although the client saw an error or a timeout: a retry would have bought them twice
+        "stored_unacknowledged": len(set(stored) - acked),
+        "short_tickets": short,
+    }
+    tickets = {"capacity": burst.capacity, "sold": sold, "expected": sum(stored.values()),
+               "oversold": max(0, sold - burst.capacity)}
+    return orders, tickets
+
+
+class DatabaseCheck:
+    """Reads the burst's documents straight from MongoDB"""
+
+    def __init__(self, mongo_url: str, db_name: str):
+        from pymongo import MongoClient
+        from pymongo.errors import PyMongoError
+
+        self.client = MongoClient(mongo_url, serverSelectionTimeoutMS=5000)
+        self.db = self.client[db_name]
+        try:
+            self.client.admin.command("ping")
+        except PyMongoError as e:
+            self.client.close()
+            raise RuntimeError(f"cannot reach MongoDB at {mongo_url}; pass --mongo-url or use --verify api") from e
+
+    def check(self, burst: WriteBurst) -> Dict:
+        pattern = {"$regex": f"^{burst.email_prefix}"}
+        duplicates = {doc["_id"]: doc["count"] for doc in self.db.newsletter_subscribers.aggregate([
+            {"$match": {"email": pattern}},
+            {"$group": {"_id": "$email", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ])}
+        stored = {doc["id"]: doc.get("quantity", 0)
+                  for doc in self.db.orders.find({"eventId": burst.event_id}, {"id": 1, "quantity": 1})}
+        ticket_counts = {doc["_id"]: doc["count"] for doc in self.db.tickets.aggregate([
+            {"$match": {"eventId": burst.event_id}},
+            {"$group": {"_id": "$orderId", "count": {"$sum": 1}}},
+        ])}
+        orders, tickets = _orders_check(burst, stored, ticket_counts, sum(ticket_counts.values()))
+        lost_writes = {}
+        for endpoint in ("contacts", "partners"):
+            acked = burst.acked_ids(endpoint)
+            found = {doc["id"] for doc in self.db[endpoint].find({"id": {"$in": acked}}, {"id": 1})}
+            lost_writes[endpoint] = sorted(set(acked) - found)
+        return {"source": "db", "duplicate_subscribers": duplicates, "orders": orders, "tickets": tickets,
+                "lost_writes": lost_writes}
+
+    def cleanup(self, burst: WriteBurst):
+        pattern = {"$regex": f"^{burst.email_prefix}"}
+        for collection in ("newsletter_subscribers", "contacts", "partners"):
+            self.db[collection].delete_many({"email": pattern})
+        self.db.tickets.delete_many({"eventId": burst.event_id})
+        self.db.orders.delete_many({"eventId": burst.event_id})
+
+    def close(self):
+        self.client.close()
+
+
+class ApiCheck:
+    """Reads the burst's documents back through the admin endpoints"""
+
+    def __init__(self, client: AsyncApiClient):
+        self.client = client
+        self.subscriber_ids: List[str] = []
+        self.submission_ids: Dict[str, List[str]] = {}
+
+    async def _list(self, endpoint: str, key: str) -> List[Dict]:
+        response = await self.client.get(endpoint)
+        response.raise_for_status()
+        return response.json()[key]
+
+    async def check(self, burst: WriteBurst) -> Dict:
+        subscribers = [s for s in await self._list("admin/newsletter", "subscribers")
+                       if s.get("email", "").startswith(burst.email_prefix)]
+        self.subscriber_ids = [s["id"] for s in subscribers]
+        emails = Counter(s["email"] for s in subscribers)
+        stored = {o["id"]: o.get("quantity", 0) for o in await self._list("admin/orders", "orders")
+                  if o.get("eventId") == burst.event_id}
+        response = await self.client.get(f"admin/events/{burst.event_id}/stats")
+        response.raise_for_status()
+        orders, tickets = _orders_check(burst, stored, None, response.json()["stats"]["tickets"]["total"])
+        lost_writes = {}
+        for endpoint in ("contacts", "partners"):
+            found = {s["id"] for s in await self._list(f"admin/{endpoint}", endpoint)
+                     if s.get("email", "").startswith(burst.email_prefix)}
+            self.submission_ids[endpoint] = sorted(found)
+            lost_writes[endpoint] = sorted(set(burst.acked_ids(endpoint)) - found)
+        return {"source": "api", "duplicate_subscribers": {e: n for e, n in emails.items() if n > 1},
+                "orders": orders, "tickets": tickets, "lost_writes": lost_writes}
+
+    async def cleanup(self):
+        deletes = [f"admin/newsletter/{i}" for i in self.subscriber_ids]
+        deletes += [f"admin/{endpoint}/{i}" for endpoint, ids in self.submission_ids.items() for i in ids]
+        semaphore = asyncio.Semaphore(20)
+
+        async def delete(endpoint: str):
+            async with semaphore:
+                await self.client.delete(endpoint)
+
+        await asyncio.gather(*(delete(endpoint) for endpoint in deletes))
+
+
+def print_report(report: Dict):
+    burst, check = report["burst"], report["check"]
+    print("\n" + "=" * 70)
+    print(f"💥 WRITE BURST — {burst['submissions']} submissions in {burst['wall_s']:.1f}s "
+          f"({burst['writes_per_s']:.0f} acknowledged writes/s)")
+    print("=" * 70)
+    print(f"{'Endpoint':<12}{'sent':>7}{'acked':>7}{'w/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  statuses")
+    for endpoint, e in burst["endpoints"].items():
+        s = e["latency_ms"]
+        print(f"{endpoint:<12}{e['sent']:>7}{e['acknowledged']:>7}{e['writes_per_s']:>8.0f}{s['p50']:>8.0f}"
+              f"{s['p95']:>8.0f}{s['p99']:>8.0f}{s['max']:>8.0f}  {json.dumps(e['statuses'])}")
+
+    orders, tickets = check["orders"], check["tickets"]
+    print(f"\nChecked via {check['source']}: {orders['stored']} order(s) stored for "
+          f"{orders['acknowledged']} acknowledged, {tickets['sold']} ticket(s) for {tickets['capacity']} places")
+    double_orders = burst["endpoints"].get("orders", {}).get("acknowledged_twice", 0)
+    if double_orders:
+        print(f"⚠️  {double_orders} resubmitted order(s) were bought twice; POST /api/orders has no idempotency key")
+    double_subscribes = burst["endpoints"].get("newsletter", {}).get("acknowledged_twice", 0)
+    if double_subscribes:
+        print(f"⚠️  {double_subscribes} newsletter email(s) were accepted more than once")
+    if orders["stored_unacknowledged"]:
+        print(f"⚠️  {orders['stored_unacknowledged']} order(s) were stored although the client saw an error")
+
+    if report["violations"]:
+        print()
+        for violation in report["violations"]:
+            print(f"🚨 {violation}")
+    else:
+        print("\n✅ No duplicate subscribers, lost writes or overselling")
+
+
+async def _run_burst(base_url: str, counts: Dict[str, int], capacity: int, duplicate_rate: float,
+                     tickets_per_order: int, concurrency: int, verify: str, mongo_url: str, db_name: str,
+                     keep_data: bool, seed: Optional[int]) -> Dict:
+    async with AsyncApiClient(base_url, timeout=60, headers=ADMIN_HEADERS, retry=NO_RETRY,
+                              max_connections=concurrency) as client:
+        burst = WriteBurst(client, counts, duplicate_rate, tickets_per_order, concurrency, seed)
+        database = DatabaseCheck(mongo_url, db_name) if verify == "db" else None
+        api = ApiCheck(client) if verify == "api" else None
+        await burst.seed_event(capacity)
+        try:
+            result = await burst.run()
+            check = database.check(burst) if database else await api.check(burst)
+        finally:
+            if not keep_data:
+                if database:
+                    database.cleanup(burst)
+                elif api.submission_ids or api.subscriber_ids:
+                    await api.cleanup()
+                await client.delete(f"admin/events/{burst.event_id}")
+            if database:
+                database.close()
+    return {"burst": result, "check": check, "violations": _violations(check)}
+
+
+def run_write_burst(base_url: str = DEFAULT_API_BASE, submissions: int = 4000, capacity: int = 500,
+                    duplicate_rate: float = 0.2, tickets_per_order: int = 2, concurrency: int = 200,
+                    verify: str = "db", mongo_url: str = DEFAULT_MONGO_URL, db_name: str = DEFAULT_DB_NAME,
+                    keep_data: bool = False, seed: Optional[int] = None,
+                    report_path: Optional[str] = None) -> Dict:
+    """Run one burst, print the report and return it; `violations` lists every failed check"""
+    print("💥 WRITE BURST TEST")
+    print("=" * 70)
+    report = asyncio.run(_run_burst(base_url, split_submissions(submissions), capacity, duplicate_rate,
+                                    tickets_per_order, concurrency, verify, mongo_url, db_name, keep_data, seed))
+    print_report(report)
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Burst concurrent, partly duplicate writes at the form endpoints")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE, help="API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--submissions", type=int, default=4000,
+                        help="Unique submissions, split 40/40/10/10 over orders/newsletter/contacts/partners")
+    parser.add_argument("--duplicate-rate", type=float, default=0.2,
+                        help="Fraction of submissions sent again (once or twice) right behind the original")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at once")
+    parser.add_argument("--capacity", type=int, default=500, help="Capacity of the seeded event")
+    parser.add_argument("--tickets-per-order", type=int, default=2)
+    parser.add_argument("--verify", choices=("db", "api"), default="db",
+                        help="Check the results in MongoDB directly or through the admin endpoints")
+    parser.add_argument("--mongo-url", default=DEFAULT_MONGO_URL, help="Defaults to $MONGO_URL")
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Defaults to $DB_NAME or igk_events_db")
+    parser.add_argument("--keep-data", action="store_true", help="Leave the burst's documents in the database")
+    parser.add_argument("--seed", type=int, help="Seed for the duplicate selection and submission order")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    if args.verify == "db" and importlib.util.find_spec("pymongo") is None:
+        parser.error("--verify db needs pymongo (pip install pymongo); use --verify api instead")
+    try:
+        report = run_write_burst(args.base_url, args.submissions, args.capacity, args.duplicate_rate,
+                                 args.tickets_per_order, args.concurrency, args.verify, args.mongo_url,
+                                 args.db_name, args.keep_data, args.seed, args.output)
+    except (RuntimeError, httpx.HTTPError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 1 if report["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())